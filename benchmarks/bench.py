@@ -0,0 +1,321 @@
+"""Benchmarks for the task-tools CLI against the in-memory fake Tasks service.
+
+Usage:
+
+    python benchmarks/bench.py run -o results.json
+    python benchmarks/bench.py compare baseline.json results.json
+"""
+
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import click
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_tools.cli import cli
+from task_tools.fake import DEFAULT_TASK_LIST, FakeTasksService
+from task_tools.manage import TaskManager
+from task_tools.ratelimit import TokenBucketLimiter
+
+DEFAULT_SIZES = "1000,10000"
+PRIORITIES = ("P0: [T]", "P0:", "P1:", "P2:", "P3:", "")
+
+
+def _due(day):
+    return f"{day.strftime('%Y-%m-%d')}T00:00:00.000Z"
+
+
+def _seed(service, size, first_day, num_days, title, rng):
+    service.addTasks(
+        {
+            "title": title(i),
+            "due": _due(first_day + timedelta(days=rng.randrange(num_days))),
+        }
+        for i in range(size)
+    )
+
+
+def _prioritized(i):
+    return f"{PRIORITIES[i % len(PRIORITIES)]} Task {i}".strip()
+
+
+def setupListRanked(service, size, workdir, rng):
+    _seed(service, size, date.today() - timedelta(days=120), 121, _prioritized, rng)
+    return ["list", "ranked"]
+
+
+def setupGrader(service, size, workdir, rng):
+    _seed(service, size, date.today() - timedelta(days=8), 9, _prioritized, rng)
+    return ["grader", "--grades-file", os.path.join(workdir, "grades.db")]
+
+
+def setupClean(service, size, workdir, rng):
+    _seed(service, size, date.today() - timedelta(days=8), 9, _prioritized, rng)
+    return ["clean"]
+
+
+def setupPutSpec(service, size, workdir, rng):
+    start = date.today()
+    end = start + timedelta(days=90)
+    _seed(service, size, start, 91, _prioritized, rng)
+    spec_csv = os.path.join(workdir, "spec.csv")
+    with open(spec_csv, "w") as specfile:
+        for i in range(3):
+            specfile.write(f"d|P0: [T] Daily {i}|\n")
+        for i in range(2):
+            specfile.write(f"w|P1: [T] Weekly {i}|\n")
+        specfile.write("m|P2: [T] Monthly|\n")
+        specfile.write("q|P3: [T] Quarterly|\n")
+    return [
+        "put-spec",
+        "--spec-csv",
+        spec_csv,
+        "--start-date",
+        str(start),
+        "--end-date",
+        str(end),
+    ]
+
+
+def setupDeleteByName(service, size, workdir, rng):
+    start = date(date.today().year, 1, 1)
+    end = date(date.today().year, 12, 31)
+
+    def title(i):
+        return f"Cleanup {i}" if i % 10 == 0 else _prioritized(i)
+
+    _seed(service, size, start, (end - start).days + 1, title, rng)
+    return [
+        "delete-by-name",
+        "Cleanup",
+        "--start-date",
+        str(start),
+        "--end-date",
+        str(end),
+    ]
+
+
+SCENARIOS = {
+    "list_ranked": setupListRanked,
+    "grader": setupGrader,
+    "clean": setupClean,
+    "put_spec_quarter": setupPutSpec,
+    "delete_by_name_year": setupDeleteByName,
+}
+
+
+def _invoke(scenario, size, latency, cli_args, measure_memory, rate_limit, shard_fetch):
+    """Run one scenario on a freshly seeded fake service; returns (service, wall, peak).
+
+    rate_limit None means no rate limiting; otherwise the TaskManager gets the
+    limiter it would by default, starting at that rate.
+    """
+    rng = random.Random(size)
+    service = FakeTasksService(latency=latency)
+    with tempfile.TemporaryDirectory() as workdir:
+        args = SCENARIOS[scenario](service, size, workdir, rng)
+        service.resetStats()
+        task_manager = TaskManager(
+            service=service,
+            task_list_id=DEFAULT_TASK_LIST,
+            use_mirror=False,
+            use_page_cache=False,
+            use_journal=False,
+            shard_fetch=shard_fetch,
+            rate_limit=rate_limit,
+            limiter=(
+                TokenBucketLimiter(rate=1e9, burst=1e9) if rate_limit is None else None
+            ),
+        )
+        if measure_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = CliRunner().invoke(cli, cli_args + args, obj=task_manager)
+        wall = time.perf_counter() - start
+        peak = None
+        if measure_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    if result.exit_code != 0:
+        raise click.ClickException(
+            f"{scenario} ({size}) exited with {result.exit_code}: {result.output[-500:]}"
+        )
+    return service, wall, peak
+
+
+def runScenario(scenario, size, latency, cli_args, rate_limit=None, shard_fetch=False):
+    options = (rate_limit, shard_fetch)
+    service, wall, _ = _invoke(scenario, size, latency, cli_args, False, *options)
+    _, _, peak = _invoke(scenario, size, latency, cli_args, True, *options)
+    return {
+        "scenario": scenario,
+        "size": size,
+        "wall_s": round(wall, 4),
+        "http_calls": service.stats["http_calls"],
+        "api_requests": service.stats["requests"],
+        "bytes": service.stats["bytes_sent"] + service.stats["bytes_received"],
+        "peak_mem_bytes": peak,
+        "methods": dict(service.stats["methods"]),
+    }
+
+
+def _gitRevision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+@click.group()
+def bench():
+    """Benchmark task-tools commands against a local fake Tasks service."""
+
+
+@bench.command()
+@click.option(
+    "--sizes",
+    "sizes",
+    type=str,
+    default=DEFAULT_SIZES,
+    show_default=True,
+    help="Comma-separated task list sizes.",
+)
+@click.option(
+    "--scenario",
+    "scenarios",
+    type=click.Choice(sorted(SCENARIOS)),
+    multiple=True,
+    help="Scenario to run (repeatable); all by default.",
+)
+@click.option(
+    "--latency",
+    "latency",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Simulated seconds per HTTP round trip.",
+)
+@click.option(
+    "--rate-limit",
+    "rate_limit",
+    type=float,
+    default=None,
+    help="Initial API request rate, as with task-tools --rate-limit; unlimited "
+    "by default.",
+)
+@click.option(
+    "--shard-fetch",
+    "shard_fetch",
+    is_flag=True,
+    help="Fetch long live listings as parallel date shards.",
+)
+@click.option(
+    "--cli-args",
+    "cli_args",
+    type=str,
+    default="",
+    help="Extra task-tools group options such as '--profile'; options that "
+    "configure the TaskManager (mirror, caches, rate limits) have no effect here.",
+)
+@click.option(
+    "-o",
+    "--out",
+    "out_file",
+    type=click.Path(),
+    default=None,
+    help="Write the JSON results here instead of stdout.",
+)
+def run(sizes, scenarios, latency, rate_limit, shard_fetch, cli_args, out_file):
+    """Run the benchmark scenarios and emit JSON results."""
+    results = []
+    for scenario in scenarios or sorted(SCENARIOS):
+        for size in [int(size) for size in sizes.split(",")]:
+            result = runScenario(
+                scenario, size, latency, cli_args.split(), rate_limit, shard_fetch
+            )
+            click.echo(
+                f"{scenario:>20} {size:>7}: {result['wall_s']:8.3f} s "
+                f"{result['api_requests']:>7} requests {result['http_calls']:>6} calls",
+                err=True,
+            )
+            results.append(result)
+    report = {
+        "revision": _gitRevision(),
+        "python": platform.python_version(),
+        "latency": latency,
+        "rate_limit": rate_limit,
+        "shard_fetch": shard_fetch,
+        "results": results,
+    }
+    if out_file is None:
+        click.echo(json.dumps(report, indent=2))
+    else:
+        with open(out_file, "w") as outfile:
+            json.dump(report, outfile, indent=2)
+
+
+@bench.command()
+@click.argument("baseline", type=click.Path(exists=True))
+@click.argument("candidate", type=click.Path(exists=True))
+@click.option(
+    "--max-call-increase",
+    "max_call_increase",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Allowed relative increase in API requests before failing.",
+)
+@click.option(
+    "--max-time-increase",
+    "max_time_increase",
+    type=float,
+    default=0.25,
+    show_default=True,
+    help="Allowed relative increase in wall time before failing.",
+)
+def compare(baseline, candidate, max_call_increase, max_time_increase):
+    """Compare two result files; exits non-zero on call count or time regressions."""
+    with open(baseline) as basefile, open(candidate) as candfile:
+        base_results = {
+            (r["scenario"], r["size"]): r for r in json.load(basefile)["results"]
+        }
+        cand_results = json.load(candfile)["results"]
+    regressions = 0
+    for cand in cand_results:
+        base = base_results.get((cand["scenario"], cand["size"]))
+        if base is None:
+            continue
+        line = f"{cand['scenario']:>20} {cand['size']:>7}:"
+        for key, limit in (
+            ("api_requests", max_call_increase),
+            ("wall_s", max_time_increase),
+        ):
+            change = (cand[key] - base[key]) / max(base[key], 1e-9)
+            flag = ""
+            if change > limit:
+                flag = " REGRESSION"
+                regressions += 1
+            line += f" {key} {base[key]} -> {cand[key]} ({change:+.1%}){flag}"
+        click.echo(line)
+    if regressions > 0:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    bench()
@@ -14,5 +14,5 @@ setup(
     author_email=about["__author_email__"],
     packages=find_packages(),
     include_package_data=True,
-    entry_points={"console_scripts": ["task-tools=task_tools.cli:main"]},
+    entry_points={"console_scripts": ["task-tools=task_tools.client:main"]},
 )
@@ -0,0 +1,80 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from task_tools.defaults import TaskToolsDefaults as TTD
+from task_tools.manage import MutationResult
+
+
+class AsyncTaskManager(object):
+    """Coroutine front end to a TaskManager that keeps up to `concurrency` calls in flight.
+
+    Calls run on a worker thread pool and share the TaskManager's service
+    credentials, rate limiter and mirror, so the quota is still respected.
+    """
+
+    def __init__(self, task_manager, concurrency=None):
+        self.task_manager = task_manager
+        self.concurrency = concurrency if concurrency is not None else TTD.CONCURRENCY
+        self.semaphore = None
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+    async def _call(self, func, *args):
+        if self.semaphore is None:
+            # Created here so it binds to the running event loop
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, functools.partial(func, *args)
+            )
+
+    async def _gather(self, func, items, progress=None):
+        items = [item for item in items]
+        done = [0]
+
+        async def run(item):
+            try:
+                args = item if isinstance(item, tuple) else (item,)
+                result = MutationResult(item, await self._call(func, *args), None)
+            except Exception as e:
+                result = MutationResult(item, None, e)
+            done[0] += 1
+            if progress is not None and (
+                done[0] % self.task_manager.batch_size == 0 or done[0] == len(items)
+            ):
+                progress(done[0])
+            return result
+
+        return [
+            result for result in await asyncio.gather(*(run(item) for item in items))
+        ]
+
+    async def getTasks(self, date=None, start_date=None):
+        return await self._call(self.task_manager.getTasks, date, start_date)
+
+    async def putTask(self, name, notes, date=None):
+        return await self._call(self.task_manager.putTask, name, notes, date)
+
+    async def putTasks(self, tasks, progress=None):
+        """Insert (name, notes, date) tuples concurrently; returns a MutationResult per tuple."""
+        return await self._gather(self.task_manager.putTask, tasks, progress)
+
+    async def patchTask(self, task_id, body):
+        return await self._call(self.task_manager.patchTask, task_id, body)
+
+    async def moveTask(self, task_id, name, date=None):
+        return await self._call(self.task_manager.moveTask, task_id, name, date)
+
+    async def moveTasks(self, moves, progress=None):
+        """Apply (task_id, name, date) moves concurrently; returns a MutationResult per move."""
+        return await self._gather(self.task_manager.moveTask, moves, progress)
+
+    async def deleteTask(self, task_id):
+        return await self._call(self.task_manager.deleteTask, task_id)
+
+    async def deleteTasks(self, task_ids, progress=None):
+        """Delete task ids concurrently; returns a MutationResult per id."""
+        return await self._gather(self.task_manager.deleteTask, task_ids, progress)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
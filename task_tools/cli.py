@@ -1,10 +1,34 @@
 import click
 import datetime
+import heapq
+import itertools
 import os
+import re
 import time
 
 from task_tools.defaults import TaskToolsDefaults as TTD
-from task_tools.manage import TaskManager
+from task_tools.journal import MutationJournal, isDone, isRetryable
+from task_tools.manage import BRIEF_FIELDS, TaskManager
+from task_tools.output import (
+    OUTPUT_FORMATS,
+    PLAN_FIELDS,
+    REPORT_FIELDS,
+    SPEC_FIELDS,
+    TASK_FIELDS,
+    RecordWriter,
+)
+from task_tools.plan import (
+    FAIL,
+    LATE,
+    MIGRATE,
+    MIGRATE_P1,
+    MIGRATE_P2,
+    PENDING,
+    TaskPlan,
+    classifyTasks,
+)
+from task_tools.spec import planSpecInserts, readSpecFile
+from task_tools.trace import ApiTracer
 
 def _get_next_sunday(include_today = False):
     today = datetime.date.today()
@@ -54,6 +78,331 @@ def _first_sunday_of_quarter_after_next(ref_date=None):
     first_day = _first_day_of_quarter(ref_date, offset_quarters=2)
     return _first_sunday_on_or_after(first_day)
 
+def _rank_due_ordered(tasks):
+    """Yield timed tasks most overdue first, given them in due date order.
+
+    Leeways are never negative, so a task is final once its graded due date is no
+    later than the creation date of the task being read.
+    """
+    heap = []
+    for seq, task in enumerate(tasks):
+        while len(heap) > 0 and heap[0][0] <= task.created:
+            yield heapq.heappop(heap)[2]
+        heapq.heappush(heap, (task.created + task.leeway, seq, task))
+    while len(heap) > 0:
+        yield heapq.heappop(heap)[2]
+
+def _bulk(task_manager, method, items, concurrency=1, progress=None):
+    """Run a bulk mutation (putTasks / moveTasks / deleteTasks) in batches.
+
+    With concurrency > 1 it runs on an AsyncTaskManager with that many requests in flight.
+    """
+    if concurrency > 1:
+        import asyncio
+        from task_tools.async_manage import AsyncTaskManager
+
+        async_manager = AsyncTaskManager(task_manager, concurrency)
+        try:
+            return asyncio.run(getattr(async_manager, method)(items, progress))
+        finally:
+            async_manager.close()
+    return getattr(task_manager, method)(items, progress)
+
+def _name_pattern_terms(name_pattern, match):
+    """Search terms every task name matched by a delete-by-name pattern contains.
+
+    A substring pattern may begin or end mid-word, so its first word is left out
+    unless something precedes it in the pattern, and its last word is only a prefix.
+    """
+    if match == "regex":
+        return []
+    words = [word for word in re.finditer(r"\w+", name_pattern.lower())]
+    if match == "exact":
+        return [word.group(0) for word in words]
+    terms = []
+    for word in words:
+        if word.start() == 0:
+            continue
+        terms.append(word.group(0) + ("" if word.end() < len(name_pattern) else "*"))
+    return terms
+
+# Commands whose mutations are recorded in a journal, so they can be resumed
+JOURNALED_COMMANDS = ("put", "put-spec", "delete-by-name")
+
+def _journal(task_manager, command):
+    if task_manager.journal_dir is None:
+        return None
+    return MutationJournal(
+        os.path.join(task_manager.journal_dir, f"{command}.jsonl"), command
+    )
+
+def _journaled_bulk(
+    task_manager, command, method, items, concurrency=1, progress=None, run=None
+):
+    """_bulk, recorded in the command's write-ahead journal.
+
+    Results are acknowledged a batch at a time, so an interrupted run can be
+    carried on with --resume. Mutations that failed because the API couldn't be
+    reached or kept throttling stay queued for `task-tools flush`, and once a whole
+    batch is queued the rest of the run is queued without being sent. Pass run to
+    carry on with a run from the journal.
+
+    Returns (results of the mutations sent, number of mutations left queued).
+    """
+    journal = _journal(task_manager, command)
+    if journal is None:
+        return _bulk(task_manager, method, items, concurrency, progress), 0
+    if run is None:
+        routes = {}
+        if method != "putTasks" and len(task_manager.task_lists) > 0:
+            routes = task_manager.task_lists
+        run = journal.start(method, items, routes)
+    else:
+        task_manager.routeTasks(run.routes.items())
+    results = []
+    queued = 0
+    chunk_size = task_manager.batch_size * concurrency
+    for start in range(0, len(run.pending), chunk_size):
+        chunk = run.pending[start : start + chunk_size]
+        sent = len(results)
+        chunk_results = _bulk(
+            task_manager,
+            method,
+            [item for _, item in chunk],
+            concurrency,
+            None if progress is None else lambda done: progress(sent + done),
+        )
+        results.extend(chunk_results)
+        acked = []
+        for (seq, _), result in zip(chunk, chunk_results):
+            if isDone(method, result.error) or not isRetryable(result.error):
+                acked.append(seq)
+            else:
+                queued += 1
+        journal.ack(run.run_id, acked)
+        if len(acked) == 0:
+            queued += len(run.pending) - len(results)
+            break
+    if queued == 0:
+        journal.end(run.run_id)
+    else:
+        print(
+            f"QUEUED {queued} of {len(run.pending)} mutations in the journal; "
+            "send them with `task-tools flush`."
+        )
+    return results, queued
+
+def _resume_runs(task_manager, commands, concurrency=1):
+    """Carry on with the unfinished journaled runs of the given commands.
+
+    Returns the number of mutations that failed or are still queued.
+    """
+    if task_manager.journal_dir is None:
+        print("ERROR: resuming needs the mutation journal (drop --no-journal)")
+        exit(1)
+    failed = 0
+    resumed = 0
+    for command in commands:
+        journal = _journal(task_manager, command)
+        for run in journal.openRuns():
+            if not journal.claim(run.run_id):
+                # Another process took it over since openRuns
+                continue
+            resumed += 1
+            print(
+                f"Resuming {command} run from {run.started}: "
+                f"{len(run.pending)} of {run.total} mutations left"
+            )
+            results, _ = _journaled_bulk(
+                task_manager, command, run.method, None, concurrency, run=run
+            )
+            for result in results:
+                if not isDone(run.method, result.error):
+                    failed += 1
+                    print(
+                        f"WARNING: {run.method} failed for {result.item}: "
+                        f"{result.error}"
+                    )
+            failed += len(run.pending) - len(results)
+    if resumed == 0:
+        print("NOTHING TO RESUME")
+    return failed
+
+def _delete_tasks(task_manager, task_ids, concurrency=1):
+    for result in _bulk(task_manager, "deleteTasks", task_ids, concurrency):
+        if result.error is not None:
+            print(f"WARNING: {result.error}")
+
+def _migrate_tasks(task_manager, moves, concurrency=1):
+    """Rename and re-date each (task id, new name, new date) with one patch per task."""
+    for result in _bulk(task_manager, "moveTasks", moves, concurrency):
+        if result.error is not None:
+            print(f"WARNING: {result.error}")
+
+def _run_plan(
+    task_manager, plan, dry_run, concurrency=1, plan_out=None, output_format="text"
+):
+    """Print a grader / clean plan and carry it out.
+
+    Dry runs skip the late task migrations and deletions; P1 / P2 migrations always
+    run. With plan_out the plan is saved there instead and nothing is changed.
+    """
+    execute = plan_out is None
+    mutate = execute and not dry_run
+    if output_format == "text":
+        _print_plan(task_manager, plan, mutate, execute, concurrency)
+    else:
+        _emit_plan(task_manager, plan, mutate, execute, concurrency, output_format)
+    if not execute:
+        plan.write(os.path.expanduser(plan_out))
+        click.echo(
+            f"\nPlan saved to {plan_out}; carry it out with `task-tools apply`.",
+            err=output_format != "text",
+        )
+
+def _print_plan(task_manager, plan, mutate, execute, concurrency):
+    if plan.command == "grader":
+        pending = sorted(action.label for action in plan.byKind(PENDING))
+        if len(pending) > 0:
+            print("PENDING TASKS:")
+            for label in pending:
+                print(f"- {label}")
+        else:
+            print("NO PENDING TASKS")
+        print()
+        late = plan.mostLate(LATE, MIGRATE)
+        if len(late) > 0:
+            print("LATE TASKS:")
+            for action in late:
+                to_migrate = action.kind == MIGRATE
+                print(f"- {action.label}{' [TO MIGRATE]' if to_migrate else ''}")
+            migrate = [action for action in late if action.kind == MIGRATE]
+            if len(migrate) > 0 and mutate:
+                print("\nMigrating applicable late tasks...")
+                _migrate_tasks(task_manager, plan.moves(migrate), concurrency)
+        else:
+            print("NO LATE TASKS")
+    else:
+        migrate = plan.byKind(MIGRATE)
+        if len(migrate) > 0:
+            print("MIGRATABLE TASKS:")
+            for action in migrate:
+                print(f"- {action.name}")
+            if mutate:
+                print("\nMigrating tasks...")
+                _migrate_tasks(task_manager, plan.moves(migrate), concurrency)
+        else:
+            print("NO TASKS TO MIGRATE")
+    print()
+    for kind, heading in (
+        (MIGRATE_P1, "Migrating p1 -> p0:"),
+        (MIGRATE_P2, "Migrating P2 -> p0:"),
+    ):
+        migrate = plan.byKind(kind)
+        if len(migrate) > 0:
+            print(heading)
+            for action in migrate:
+                print(f"- {action.name}")
+            if execute:
+                _migrate_tasks(task_manager, plan.moves(migrate), concurrency)
+        print()
+    failed = plan.mostLate(FAIL)
+    if len(failed) > 0:
+        print("FAILED TASKS:")
+        for action in failed:
+            print(f"- {action.label}")
+        if mutate:
+            print("\nDeleting failed tasks...")
+            _delete_tasks(
+                task_manager, (action.task_id for action in failed), concurrency
+            )
+    else:
+        print("NO FAILED TASKS")
+
+def _emit_plan(task_manager, plan, mutate, execute, concurrency, output_format):
+    """Carry out a plan, writing one record per action once its step has run."""
+    steps = (
+        (plan.byKind(PENDING, LATE), None),
+        (plan.byKind(MIGRATE), "moveTasks" if mutate else None),
+        (plan.byKind(MIGRATE_P1, MIGRATE_P2), "moveTasks" if execute else None),
+        (plan.mostLate(FAIL), "deleteTasks" if mutate else None),
+    )
+    with RecordWriter(output_format, PLAN_FIELDS) as writer:
+        for actions, method in steps:
+            errors = {}
+            if method is not None and len(actions) > 0:
+                if method == "moveTasks":
+                    items = plan.moves(actions)
+                else:
+                    items = [action.task_id for action in actions]
+                for result in _bulk(task_manager, method, items, concurrency):
+                    if result.error is not None:
+                        item = result.item
+                        task_id = item[0] if method == "moveTasks" else item
+                        errors[task_id] = str(result.error)
+            for action in actions:
+                record = action._asdict()
+                if action.new_date is not None:
+                    record["new_date"] = action.new_date.isoformat()
+                record["error"] = errors.get(action.task_id)
+                record["applied"] = method is not None and record["error"] is None
+                writer.write(record)
+
+def _emit_spec_inserts(task_manager, inserts, dry_run, concurrency, output_format):
+    """Create the planned spec tasks, writing one record per task."""
+    results = []
+    if not dry_run and len(inserts) > 0:
+        results, _ = _journaled_bulk(
+            task_manager,
+            "put-spec",
+            "putTasks",
+            ((name, notes, day) for day, name, notes in inserts),
+            concurrency,
+        )
+    # Mutations the journal queued without sending them have no result
+    results = results + [None] * (len(inserts) - len(results))
+    with RecordWriter(output_format, SPEC_FIELDS) as writer:
+        for (day, name, notes), result in zip(inserts, results):
+            error = None
+            if result is not None and result.error is not None:
+                error = str(result.error)
+            elif result is None and not dry_run:
+                error = "queued"
+            writer.write(
+                {
+                    "date": day.isoformat(),
+                    "name": name,
+                    "notes": notes,
+                    "applied": result is not None and error is None,
+                    "error": error,
+                }
+            )
+
+_format_option = click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="text",
+    show_default=True,
+    help="Output format; ndjson, json and tsv write one record per task or action.",
+)
+
+_resume_option = click.option(
+    "--resume",
+    "resume",
+    is_flag=True,
+    help="Carry on with this command's interrupted or queued runs instead.",
+)
+
+_concurrency_option = click.option(
+    "--concurrency",
+    "concurrency",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Requests kept in flight at once; 1 sends mutations as batches instead.",
+)
+
 @click.group()
 @click.pass_context
 @click.option(
@@ -78,7 +427,7 @@ def _first_sunday_of_quarter_after_next(ref_date=None):
     type=str,
     default=TTD.TASK_LIST_ID,
     show_default=True,
-    help="UUID of the Task List to query.",
+    help="UUID of the Task List to query; several comma-separated, or all of them.",
 )
 @click.option(
     "--enable-logging",
@@ -88,24 +437,156 @@ def _first_sunday_of_quarter_after_next(ref_date=None):
     show_default=True,
     help="Whether to enable logging.",
 )
+@click.option(
+    "--mirror/--no-mirror",
+    "use_mirror",
+    default=TTD.USE_MIRROR,
+    show_default=True,
+    help="Answer queries from the incrementally synced local task mirror.",
+)
+@click.option(
+    "--mirror-file",
+    "mirror_file",
+    type=click.Path(),
+    default=TTD.TASK_MIRROR_FILE,
+    show_default=True,
+    help="SQLite file holding the local task mirror.",
+)
+@click.option(
+    "--refresh",
+    "refresh",
+    is_flag=True,
+    help="Rebuild the local task mirror from scratch before querying.",
+)
+@click.option(
+    "--page-cache/--no-page-cache",
+    "use_page_cache",
+    default=TTD.USE_PAGE_CACHE,
+    show_default=True,
+    help="Revalidate live task listings against cached ETags (used with --no-mirror).",
+)
+@click.option(
+    "--journal/--no-journal",
+    "use_journal",
+    default=TTD.USE_JOURNAL,
+    show_default=True,
+    help="Record put / put-spec / delete-by-name mutations in a resumable journal.",
+)
+@click.option(
+    "--journal-dir",
+    "journal_dir",
+    type=click.Path(),
+    default=TTD.JOURNAL_DIR,
+    show_default=True,
+    help="Directory holding the mutation journals.",
+)
+@click.option(
+    "--shard-fetch/--no-shard-fetch",
+    "shard_fetch",
+    default=TTD.SHARD_FETCH,
+    show_default=True,
+    help="Fetch long live listings as parallel date shards; pays off when the rate "
+    "limit lets several requests run at once.",
+)
+@click.option(
+    "--rate-limit",
+    "rate_limit",
+    type=float,
+    default=TTD.RATE_LIMIT,
+    show_default=True,
+    help="Initial API request rate (requests / second).",
+)
+@click.option(
+    "--max-rate-limit",
+    "max_rate_limit",
+    type=float,
+    default=TTD.MAX_RATE_LIMIT,
+    show_default=True,
+    help="Ceiling the request rate may climb to while the API isn't throttling.",
+)
+@click.option(
+    "--rate-burst",
+    "rate_burst",
+    type=int,
+    default=TTD.RATE_BURST,
+    show_default=True,
+    help="Number of requests that may be sent back to back before throttling.",
+)
+@click.option(
+    "--max-retries",
+    "max_retries",
+    type=int,
+    default=TTD.MAX_RETRIES,
+    show_default=True,
+    help="Retries for requests the API rejects as rate limited.",
+)
+@click.option(
+    "--profile",
+    "profile",
+    is_flag=True,
+    help="Print a per-method summary of API calls when the command finishes.",
+)
+@click.option(
+    "--profile-out",
+    "profile_out",
+    type=click.Path(),
+    default=None,
+    help="Also write every API call as a Chrome trace (JSON) to this file.",
+)
 def cli(
     ctx: click.Context,
     task_secrets_file,
     task_refresh_token,
     task_list_id,
     enable_logging,
+    use_mirror,
+    mirror_file,
+    refresh,
+    use_page_cache,
+    use_journal,
+    journal_dir,
+    shard_fetch,
+    rate_limit,
+    max_rate_limit,
+    rate_burst,
+    max_retries,
+    profile,
+    profile_out,
 ):
     """Manage Google Tasks."""
-    try:
-        ctx.obj = TaskManager(
-            task_secrets_file=task_secrets_file,
-            task_refresh_token=task_refresh_token,
-            task_list_id=task_list_id,
-            enable_logging=enable_logging,
-        )
-    except Exception as e:
-        print(f"Program error: {e}")
-        exit(1)
+    if not isinstance(ctx.obj, TaskManager):
+        # A TaskManager passed in by the caller (tests, benchmarks) is used as is
+        try:
+            ctx.obj = TaskManager(
+                task_secrets_file=task_secrets_file,
+                task_refresh_token=task_refresh_token,
+                task_list_id=task_list_id,
+                enable_logging=enable_logging,
+                use_mirror=use_mirror,
+                mirror_file=mirror_file,
+                refresh=refresh,
+                use_page_cache=use_page_cache,
+                use_journal=use_journal,
+                journal_dir=journal_dir,
+                shard_fetch=shard_fetch,
+                rate_limit=rate_limit,
+                max_rate_limit=max_rate_limit,
+                rate_burst=rate_burst,
+                max_retries=max_retries,
+            )
+        except Exception as e:
+            print(f"Program error: {e}")
+            exit(1)
+    if profile or profile_out is not None:
+        ctx.obj.tracer = ApiTracer()
+        ctx.call_on_close(lambda: _report_profile(ctx.obj.tracer, profile_out))
+
+
+def _report_profile(tracer, profile_out):
+    click.echo(tracer.formatSummary(), err=True)
+    if profile_out is not None:
+        tracer.writeChromeTrace(os.path.expanduser(profile_out))
+        click.echo(f"Wrote API trace to {profile_out}", err=True)
 
 
 @cli.command()
@@ -128,44 +609,162 @@ def cli(
     is_flag=True,
     help="Don't show the UUIDs.",
 )
-def list(ctx: click.Context, filter, date, no_ids):
+@click.option(
+    "--limit",
+    "limit",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Show at most this many tasks (the most urgent ones for ranked).",
+)
+@click.option(
+    "--stream",
+    "stream",
+    is_flag=True,
+    help="Print ranked tasks as soon as their rank is final (needs the mirror).",
+)
+@_format_option
+def list(ctx: click.Context, filter, date, no_ids, limit, stream, output_format):
     """List pending tasks according to a filter ∈ [all, p0, p1, p2, p3, late, ranked]."""
-    tasks = ctx.obj.getTasks(date)
+    if stream and not ctx.obj.due_ordered:
+        raise click.UsageError("--stream needs the task mirror (drop --no-mirror).")
+    tasks = ctx.obj.iterTasks(date)
     show_bar = False
     if filter == "all":
         filtered_tasks = tasks
-    elif filter == "p0":
-        filtered_tasks = [
-            task for task in tasks if task.timing == 0 and task.days_late == 0
-        ]
-    elif filter == "p1":
-        filtered_tasks = [
-            task for task in tasks if task.timing == 1 and task.days_late == 0
-        ]
-    elif filter == "p2":
-        filtered_tasks = [
-            task for task in tasks if task.timing == 2 and task.days_late == 0
-        ]
-    elif filter == "p3":
-        filtered_tasks = [
-            task for task in tasks if task.timing == 3 and task.days_late == 0
-        ]
+    elif filter in ("p0", "p1", "p2", "p3"):
+        timing = int(filter[1])
+        filtered_tasks = (
+            task for task in tasks if task.timing == timing and task.days_late == 0
+        )
     elif filter == "late":
-        filtered_tasks = [
+        filtered_tasks = (
             task for task in tasks if task.timing >= 0 and task.days_late > 0
-        ]
+        )
     elif filter == "ranked":
         show_bar = True
-        raw_tasks = [task for task in tasks if task.timing >= 0]
-        filtered_tasks = sorted(raw_tasks, key=lambda t: -t.days_score)
+        raw_tasks = (task for task in tasks if task.timing >= 0)
+        if stream and ctx.obj.due_ordered:
+            filtered_tasks = _rank_due_ordered(raw_tasks)
+        elif limit is not None:
+            filtered_tasks = heapq.nsmallest(
+                limit, raw_tasks, key=lambda t: -t.days_score
+            )
+        else:
+            filtered_tasks = sorted(raw_tasks, key=lambda t: -t.days_score)
     elif filter == "":
         print("ERROR: no list filter provided.")
         exit(1)
     else:
         print(f"ERROR: unrecognized filter provided ({filter})")
         exit(1)
+    if limit is not None:
+        filtered_tasks = itertools.islice(filtered_tasks, limit)
+    if output_format != "text":
+        with RecordWriter(output_format, TASK_FIELDS) as writer:
+            for task in filtered_tasks:
+                writer.write(task.toDict())
+        return
     for task in filtered_tasks:
-        print(f"{task.toString(not no_ids, not show_bar, show_bar)}")
+        line = task.toString(not no_ids, not show_bar, show_bar)
+        if ctx.obj.multiple_lists:
+            line = f"[{ctx.obj.listTitle(task.list_id)}] {line}"
+        print(line, flush=stream)
+
+
+@cli.command()
+@click.pass_context
+@click.argument(
+    "query",
+    type=str,
+    nargs=-1,
+    required=True,
+)
+@click.option(
+    "--priority",
+    "priorities",
+    type=click.Choice(["p0", "p1", "p2", "p3"]),
+    multiple=True,
+    help="Only tasks of this priority (repeatable).",
+)
+@click.option(
+    "--start-date",
+    "start_date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Only tasks due on or after this day.",
+)
+@click.option(
+    "--end-date",
+    "end_date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Only tasks due on or before this day.",
+)
+@click.option(
+    "--no-ids",
+    "no_ids",
+    is_flag=True,
+    help="Don't show the UUIDs.",
+)
+@click.option(
+    "--limit",
+    "limit",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Show at most this many tasks (the earliest due).",
+)
+@click.option(
+    "--sync",
+    "sync",
+    is_flag=True,
+    help="Bring the local mirror up to date first (makes API calls).",
+)
+@_format_option
+def search(
+    ctx: click.Context,
+    query,
+    priorities,
+    start_date,
+    end_date,
+    no_ids,
+    limit,
+    sync,
+    output_format,
+):
+    """Search the titles and notes of mirrored tasks, without API calls.
+
+    Tasks must contain every word of QUERY; a word ending in * (quoted for the
+    shell) matches words starting with it.
+    """
+    if ctx.obj.mirror is None:
+        print("ERROR: searching needs the local task mirror (drop --no-mirror)")
+        exit(1)
+    if not sync and not ctx.obj.mirrorSynced():
+        print("ERROR: the local task mirror hasn't been synced yet; run with --sync")
+        exit(1)
+    tasks = ctx.obj.searchTasks(
+        " ".join(query),
+        start_date,
+        end_date,
+        [int(priority[1]) for priority in priorities] if priorities else None,
+        limit,
+        sync,
+    )
+    if output_format != "text":
+        with RecordWriter(output_format, TASK_FIELDS) as writer:
+            for task in tasks:
+                writer.write(task.toDict())
+        return
+    found = False
+    for task in tasks:
+        found = True
+        line = task.toString(not no_ids)
+        if ctx.obj.multiple_lists:
+            # Titles are only known if they were already fetched
+            line = f"[{ctx.obj.listTitle(task.list_id, fetch=False)}] {line}"
+        print(line)
+    if not found:
+        print("NO MATCHING TASKS")
 
 
 @cli.command()
@@ -187,7 +786,7 @@ def delete(ctx: click.Context, task_id):
 @cli.command()
 @click.pass_context
 @click.argument(
-    "name_substr",
+    "name_pattern",
     type=str,
 )
 @click.option(
@@ -206,21 +805,96 @@ def delete(ctx: click.Context, task_id):
     show_default=True,
     help="Last day of the window.",
 )
-def delete_by_name(ctx: click.Context, name_substr, start_date, end_date):
-    """Delete all tasks in a range by name."""
-    current_date = start_date
-    while current_date <= end_date:
-        print(f"Scanning {current_date}...")
-        tasks = ctx.obj.getTasks(current_date, current_date)
-        for task in tasks:
-            if name_substr in task.name:
-                print(f"  Deleting task {task.name} on date {current_date}")
-                try:
-                    ctx.obj.deleteTask(task.id)
-                except Exception as e:
-                    print(f"Program error: {e}")
-                    exit(1)
-        current_date += datetime.timedelta(days=1)
+@click.option(
+    "--match",
+    "match",
+    type=click.Choice(["substr", "exact", "regex"]),
+    default="substr",
+    show_default=True,
+    help="How NAME_PATTERN is matched against task names.",
+)
+@click.option(
+    "--dry-run",
+    "dry_run",
+    is_flag=True,
+    help="Do a dry run; no task deletions.",
+)
+@click.option(
+    "--use-index",
+    "use_index",
+    is_flag=True,
+    help="Find the tasks with the mirror's search index instead of a window scan.",
+)
+@_concurrency_option
+@_resume_option
+def delete_by_name(
+    ctx: click.Context,
+    name_pattern,
+    start_date,
+    end_date,
+    match,
+    dry_run,
+    use_index,
+    concurrency,
+    resume,
+):
+    """Delete all tasks in a range by name.
+
+    NAME_PATTERN is a substring of the task name by default; --match exact requires
+    the whole name to match and --match regex treats it as a regular expression.
+    """
+    if match == "exact":
+        matches = lambda name: name == name_pattern
+    elif match == "regex":
+        try:
+            matches = re.compile(name_pattern).search
+        except re.error as e:
+            print(f"ERROR: invalid regex ({e})")
+            exit(1)
+    else:
+        matches = lambda name: name_pattern in name
+    if use_index and ctx.obj.mirror is None:
+        print("ERROR: --use-index needs the local task mirror (drop --no-mirror)")
+        exit(1)
+    if resume:
+        if _resume_runs(ctx.obj, ["delete-by-name"], concurrency) > 0:
+            exit(1)
+        return
+    print(f"Scanning {start_date.date()} to {end_date.date()}...")
+    if use_index:
+        # The same due window as the scan, which starts after start_date
+        candidates = ctx.obj.searchTasks(
+            " ".join(_name_pattern_terms(name_pattern, match)),
+            start_date + datetime.timedelta(days=1),
+            end_date + datetime.timedelta(days=1),
+            sync=True,
+        )
+    else:
+        candidates = ctx.obj.iterTasks(end_date, start_date, BRIEF_FIELDS)
+    targets = []
+    for task in candidates:
+        if matches(task.name):
+            print(f"  Deleting task {task.name} (due {task.due})")
+            targets.append(task.id)
+    if len(targets) == 0:
+        print("NO MATCHING TASKS")
+        return
+    if dry_run:
+        return
+    start_time = time.time()
+
+    def progress(done):
+        elapsed = max(time.time() - start_time, 1e-6)
+        print(f"Deleted {done}/{len(targets)} tasks ({done / elapsed:.1f} tasks/s)")
+
+    results, queued = _journaled_bulk(
+        ctx.obj, "delete-by-name", "deleteTasks", targets, concurrency, progress
+    )
+    failures = [result for result in results if result.error is not None]
+    for result in failures:
+        print(f"WARNING: failed to delete {result.item}: {result.error}")
+    if len(failures) > 0 or queued > 0:
+        exit(1)
 
 
 @cli.command()
@@ -256,14 +930,33 @@ def delete_by_name(ctx: click.Context, name_substr, start_date, end_date):
     show_default=True,
     help="Specify an end date if for multiple days.",
 )
-def put(ctx: click.Context, name, notes, date, until):
+@_concurrency_option
+@_resume_option
+def put(ctx: click.Context, name, notes, date, until, concurrency, resume):
     """Upload a task."""
-    current_date = date
+    if resume:
+        if _resume_runs(ctx.obj, ["put"], concurrency) > 0:
+            exit(1)
+        return
     end_date = until if until >= date else date
-    while current_date <= end_date:
-        print(f"{current_date.strftime('%Y-%m-%d')}: {name}")
-        ctx.obj.putTask(name, notes, current_date)
-        current_date += datetime.timedelta(days=1)
+    dates = [
+        date + datetime.timedelta(days=i) for i in range((end_date - date).days + 1)
+    ]
+    results, _ = _journaled_bulk(
+        ctx.obj,
+        "put",
+        "putTasks",
+        ((name, notes, current_date) for current_date in dates),
+        concurrency,
+    )
+    for result in results:
+        current_date = result.item[2]
+        if result.error is None:
+            print(f"{current_date.strftime('%Y-%m-%d')}: {name}")
+        else:
+            print(
+                f"{current_date.strftime('%Y-%m-%d')}: {name} FAILED ({result.error})"
+            )
 
 
 @cli.command()
@@ -298,7 +991,19 @@ def put(ctx: click.Context, name, notes, date, until):
     is_flag=True,
     help="Do a dry run; no task creations.",
 )
-def put_spec(ctx: click.Context, spec_csv, start_date, end_date, dry_run):
+@_concurrency_option
+@_resume_option
+@_format_option
+def put_spec(
+    ctx: click.Context,
+    spec_csv,
+    start_date,
+    end_date,
+    dry_run,
+    concurrency,
+    resume,
+    output_format,
+):
     """Read a CSV of task specifications and idempotently put them on your calendar.
 
     CSV must be pipe-delimited. Example:
@@ -307,91 +1012,58 @@ def put_spec(ctx: click.Context, spec_csv, start_date, end_date, dry_run):
     w | "Weekly Task Name" | "Each Sunday"
     m | "Monthly Task Name" | "First Sunday of each Month"
     q | "Quarterly Task Name" | "First Sunday of each Quarter"
-    """
-    spec_csv = os.path.expanduser(spec_csv)
-
-    daily_task_specs = []
-    all_sundays = []
-    weekly_task_specs = []
-    first_sundays_of_month = []
-    monthly_task_specs = []
-    first_sundays_of_quarter = []
-    quarterly_task_specs = []
-
-    current_date = start_date
-    while current_date.weekday() != 6:
-        current_date += datetime.timedelta(days=1)
 
-    while current_date <= end_date:
-        all_sundays.append(current_date)
-        current_date += datetime.timedelta(days=7)
-
-    month = start_date.month
-    year = start_date.year
-    quarter_months = (1, 4, 7, 10)
-
-    while datetime.datetime(year, month, 1) <= end_date:
-        first_of_month = datetime.datetime(year, month, 1)
-        while first_of_month.weekday() != 6:
-            first_of_month += datetime.timedelta(days=1)
-        if start_date <= first_of_month <= end_date:
-            first_sundays_of_month.append(first_of_month)
-            if month in quarter_months:
-                first_sundays_of_quarter.append(first_of_month)
-        if month == 12:
-            month = 1
-            year += 1
-        else:
-            month += 1
-
-    with open(spec_csv, "r") as csvfile:
-        for specline in csvfile:
-            speclist = specline.split("|")
-            if len(speclist) > 1:
-                rtype = speclist[0]
-                ttitle = speclist[1]
-                tdesc = speclist[2]
-                if rtype.lower() == "d":
-                    daily_task_specs.append((ttitle, tdesc))
-                elif rtype.lower() == "w":
-                    weekly_task_specs.append((ttitle, tdesc))
-                elif rtype.lower() == "m":
-                    monthly_task_specs.append((ttitle, tdesc))
-                elif rtype.lower() == "q":
-                    quarterly_task_specs.append((ttitle, tdesc))
-
-    current_date = start_date
-    while current_date <= end_date:
+    The first column can also be an RRULE-like expression:
+
+    FREQ=DAILY;INTERVAL=3 | "Every Third Day" | ""
+    FREQ=WEEKLY;BYDAY=MO,TH | "Mondays and Thursdays" | ""
+    FREQ=MONTHLY;BYDAY=-1FR | "Last Friday of each Month" | ""
+    FREQ=YEARLY;BYMONTH=4;BYMONTHDAY=15 | "Yearly on April 15" | ""
+    """
+    if resume:
+        if _resume_runs(ctx.obj, ["put-spec"], concurrency) > 0:
+            exit(1)
+        return
+    try:
+        specs = readSpecFile(spec_csv)
+    except ValueError as e:
+        print(f"ERROR: invalid task spec ({e})")
+        exit(1)
+    first_date = start_date.date()
+    last_date = end_date.date()
+    existing = set(
+        (task.created_date, task.name)
+        for task in ctx.obj.iterTasks(
+            end_date, start_date - datetime.timedelta(days=1), BRIEF_FIELDS
+        )
+    )
+    inserts = planSpecInserts(specs, first_date, last_date, existing)
+    if output_format != "text":
+        _emit_spec_inserts(ctx.obj, inserts, dry_run, concurrency, output_format)
+        return
+    planned_dates = {}
+    for day, task_title, _ in inserts:
+        planned_dates.setdefault(day, []).append(task_title)
+    current_date = first_date
+    while current_date <= last_date:
         print(f"Tasks for {current_date.strftime('%Y-%m-%d')}:")
-        existing_ttitles = [
-            task.name
-            for task in ctx.obj.getTasks(date=current_date, start_date=current_date)
-        ]
-        for task_title, task_description in daily_task_specs:
-            if task_title not in existing_ttitles:
-                print(f"  {task_title}")
-                if not dry_run:
-                    ctx.obj.putTask(task_title, task_description, current_date)
-        if current_date in all_sundays:
-            for task_title, task_description in weekly_task_specs:
-                if task_title not in existing_ttitles:
-                    print(f"  {task_title}")
-                    if not dry_run:
-                        ctx.obj.putTask(task_title, task_description, current_date)
-        if current_date in first_sundays_of_month:
-            for task_title, task_description in monthly_task_specs:
-                if task_title not in existing_ttitles:
-                    print(f"  {task_title}")
-                    if not dry_run:
-                        ctx.obj.putTask(task_title, task_description, current_date)
-        if current_date in first_sundays_of_quarter:
-            for task_title, task_description in quarterly_task_specs:
-                if task_title not in existing_ttitles:
-                    print(f"  {task_title}")
-                    if not dry_run:
-                        ctx.obj.putTask(task_title, task_description, current_date)
+        for task_title in planned_dates.get(current_date, []):
+            print(f"  {task_title}")
         current_date += datetime.timedelta(days=1)
-        time.sleep(1.0)
+    if not dry_run and len(inserts) > 0:
+        results, _ = _journaled_bulk(
+            ctx.obj,
+            "put-spec",
+            "putTasks",
+            (
+                (task_title, task_description, day)
+                for day, task_title, task_description in inserts
+            ),
+            concurrency,
+        )
+        for result in results:
+            if result.error is not None:
+                print(f"WARNING: failed to create {result.item[1]}: {result.error}")
 
 
 @cli.command()
@@ -412,6 +1084,14 @@ def put_spec(ctx: click.Context, spec_csv, start_date, end_date, dry_run):
     show_default=True,
     help="Last day of the grading window.",
 )
+@click.option(
+    "--grades-file",
+    "grades_file",
+    type=click.Path(),
+    default=TTD.GRADES_FILE,
+    show_default=True,
+    help="SQLite grade history to record the grades in.",
+)
 @click.option(
     "-o",
     "--out",
@@ -419,7 +1099,13 @@ def put_spec(ctx: click.Context, spec_csv, start_date, end_date, dry_run):
     type=click.Path(),
     default=TTD.GRADER_OUTPUT_FILE,
     show_default=True,
-    help="CSV file to generate the report in.",
+    help="Also append the grades to this pipe-delimited CSV log.",
+)
+@click.option(
+    "--no-out",
+    "no_out",
+    is_flag=True,
+    help="Skip the CSV log; record the grades only in the grade history.",
 )
 @click.option(
     "--dry-run",
@@ -427,8 +1113,31 @@ def put_spec(ctx: click.Context, spec_csv, start_date, end_date, dry_run):
     is_flag=True,
     help="Do a dry run; no task deletions.",
 )
-def grader(ctx: click.Context, start_date, end_date, out_file, dry_run):
-    """Generate a CSV report of how consistently tasks have been completed within the specified window.
+@_concurrency_option
+@click.option(
+    "--plan-out",
+    "plan_out",
+    type=click.Path(),
+    default=None,
+    help="Save the plan to this JSON file for `apply` instead of carrying it out.",
+)
+@_format_option
+def grader(
+    ctx: click.Context,
+    start_date,
+    end_date,
+    grades_file,
+    out_file,
+    no_out,
+    dry_run,
+    concurrency,
+    plan_out,
+    output_format,
+):
+    """Grade how consistently tasks have been completed within the specified window.
+
+    Grades are upserted into the grade history (see `report`), one per task and
+    due date.
 
     Grading criteria:\n
     - P0: ... tasks must be completed same day. They will be carried over day to day until completed.\n
@@ -443,98 +1152,24 @@ def grader(ctx: click.Context, start_date, end_date, out_file, dry_run):
     - P1 tasks get migrated to P0 tasks at the start of next week.\n
     - P2 tasks get migrated to P0 tasks at the start of next month.
     """
-    with open(os.path.expanduser(out_file), "a") as logfile:
-        tasks = ctx.obj.getTasks(
-            end_date, start_date=start_date - datetime.timedelta(days=1)
-        )
-        on_time_tasks = []
-        late_tasks = []
-        migrate_tasks = []
-        migrate_p1_tasks = []
-        migrate_p2_tasks = []
-        failed_tasks = []
-        for task in tasks:
-            if task.timing >= 0:
-                if task.timing == 2: # P2 tasks get migrated to P0 tasks at the start of next month
-                    migrate_p2_tasks.append(task)
-                elif task.timing == 1: # P1 tasks get migrated to P0 tasks at the start of next week
-                    migrate_p1_tasks.append(task)
-                else: # P0 task grading
-                    late = task.days_late > 0
-                    failed = task.autogen and late
-                    logfile.write(
-                        f"{task.id}|{task.due}|{task.name}|{task.days_late}|{failed}\n"
-                    )
-                    if late:
-                        if failed:
-                            failed_tasks.append(
-                                (task.days_late, task.id, task.toString(False))
-                            )
-                        else:
-                            late_tasks.append((task.days_late, task, task.toString(False)))
-                    else:
-                        on_time_tasks.append(task.toString(False))
-        if len(on_time_tasks) > 0:
-            sorted_on_time_tasks = sorted(on_time_tasks)
-            print("PENDING TASKS:")
-            for task in sorted_on_time_tasks:
-                print(f"- {task}")
-        else:
-            print("NO PENDING TASKS")
-        print()
-        if len(late_tasks) > 0:
-            sorted_late_tasks = sorted(late_tasks, key=lambda k: -k[0])
-            print("LATE TASKS:")
-            for _, task, taskname in sorted_late_tasks:
-                to_migrate = task.timing == 0 and not task.autogen
-                print(f"- {taskname}{' [TO MIGRATE]' if to_migrate else ''}")
-                if to_migrate:
-                    migrate_tasks.append(task)
-            if len(migrate_tasks) > 0 and not dry_run:
-                print("\nMigrating applicable late tasks...")
-                for migrate_task in migrate_tasks:
-                    ctx.obj.putTask(migrate_task.name, migrate_task.notes)
-                    ctx.obj.deleteTask(migrate_task.id)
-        else:
-            print("NO LATE TASKS")
-        print()
-        if len(migrate_p1_tasks) > 0:
-            print("Migrating p1 -> p0:")
-            for task in migrate_p1_tasks:
-                print(f"- {task.name}")
-                ctx.obj.putTask(
-                    task.name.replace("P1","P0").replace("p1","P0"),
-                    task.notes,
-                    _get_next_sunday()
-                )
-                ctx.obj.deleteTask(task.id)
-        print()
-        if len(migrate_p2_tasks) > 0:
-            print("Migrating P2 -> p0:")
-            for task in migrate_p2_tasks:
-                print(f"- {task.name}")
-                ctx.obj.putTask(
-                    task.name.replace("P2","P0").replace("p2","P0"),
-                    task.notes,
-                    _get_first_sunday_next_month()
-                )
-                ctx.obj.deleteTask(task.id)
-        print()
-        if len(failed_tasks) > 0:
-            sorted_failed_tasks = sorted(failed_tasks, key=lambda k: -k[0])
-            print("FAILED TASKS:")
-            for _, _, task in sorted_failed_tasks:
-                print(f"- {task}")
-            if not dry_run:
-                print("\nDeleting failed tasks...")
-                for _, task_id, _ in sorted_failed_tasks:
-                    try:
-                        ctx.obj.deleteTask(task_id)
-                    except Exception as e:
-                        print(f"WARNING: {e}")
-                        continue
-        else:
-            print("NO FAILED TASKS")
+    plan = classifyTasks(
+        ctx.obj.iterTasks(
+            end_date, start_date - datetime.timedelta(days=1), BRIEF_FIELDS
+        ),
+        _get_next_sunday(),
+        _get_first_sunday_next_month(),
+        command="grader",
+        task_list_id=",".join(ctx.obj.task_list_ids),
+    )
+    from task_tools.grades import GradeStore
+
+    grades = plan.gradeRows()
+    GradeStore(grades_file).record(grades)
+    if not no_out:
+        with open(os.path.expanduser(out_file), "a") as logfile:
+            for row in grades:
+                logfile.write(f"{'|'.join(str(field) for field in row)}\n")
+    _run_plan(ctx.obj, plan, dry_run, concurrency, plan_out, output_format)
 
 
 @cli.command()
@@ -561,7 +1196,24 @@ def grader(ctx: click.Context, start_date, end_date, out_file, dry_run):
     is_flag=True,
     help="Do a dry run; no task deletions.",
 )
-def clean(ctx: click.Context, start_date, end_date, dry_run):
+@_concurrency_option
+@click.option(
+    "--plan-out",
+    "plan_out",
+    type=click.Path(),
+    default=None,
+    help="Save the plan to this JSON file for `apply` instead of carrying it out.",
+)
+@_format_option
+def clean(
+    ctx: click.Context,
+    start_date,
+    end_date,
+    dry_run,
+    concurrency,
+    plan_out,
+    output_format,
+):
     """Delete / clean up failed timed tasks.
 
     Timing criteria:\n
@@ -578,75 +1230,193 @@ def clean(ctx: click.Context, start_date, end_date, dry_run):
     - P1 tasks get migrated to P0 tasks at the start of next week.\n
     - P2 tasks get migrated to P0 tasks at the start of next month.
     """
-    tasks = ctx.obj.getTasks(
-        end_date, start_date=start_date - datetime.timedelta(days=1)
+    plan = classifyTasks(
+        ctx.obj.iterTasks(
+            end_date, start_date - datetime.timedelta(days=1), BRIEF_FIELDS
+        ),
+        _get_next_sunday(),
+        _get_first_sunday_next_month(),
+        command="clean",
+        task_list_id=",".join(ctx.obj.task_list_ids),
     )
-    failed_tasks = []
-    migrate_tasks = []
-    migrate_p1_tasks = []
-    migrate_p2_tasks = []
-    for task in tasks:
-        if task.timing >= 0:
-            if task.timing == 2: # P2 tasks get migrated to P0 tasks at the start of next month
-                migrate_p2_tasks.append(task)
-            elif task.timing == 1: # P1 tasks get migrated to P0 tasks at the start of next week
-                migrate_p1_tasks.append(task)
-            else: # P0 task grading
-                failed = task.autogen and task.days_late > 0
-                if failed:
-                    failed_tasks.append((task.days_late, task.id, task.toString(False)))
-                migrate = task.days_late > 0 and not task.autogen and task.timing == 0
-                if migrate:
-                    migrate_tasks.append(task)
-    if len(migrate_tasks) > 0:
-        print("MIGRATABLE TASKS:")
-        for task in migrate_tasks:
-            print(f"- {task.name}")
-        if not dry_run:
-            print("\nMigrating tasks...")
-            for migrate_task in migrate_tasks:
-                ctx.obj.putTask(migrate_task.name, migrate_task.notes)
-                ctx.obj.deleteTask(migrate_task.id)
-    else:
-        print("NO TASKS TO MIGRATE")
-    print()
-    if len(migrate_p1_tasks) > 0:
-        print("Migrating p1 -> p0:")
-        for task in migrate_p1_tasks:
-            print(f"- {task.name}")
-            ctx.obj.putTask(
-                task.name.replace("P1","P0").replace("p1","P0"),
-                task.notes,
-                _get_next_sunday()
-            )
-            ctx.obj.deleteTask(task.id)
-    print()
-    if len(migrate_p2_tasks) > 0:
-        print("Migrating P2 -> p0:")
-        for task in migrate_p2_tasks:
-            print(f"- {task.name}")
-            ctx.obj.putTask(
-                task.name.replace("P2","P0").replace("p2","P0"),
-                task.notes,
-                _get_first_sunday_next_month()
-            )
-            ctx.obj.deleteTask(task.id)
-    print()
-    if len(failed_tasks) > 0:
-        sorted_failed_tasks = sorted(failed_tasks, key=lambda k: -k[0])
-        print("FAILED TASKS:")
-        for _, _, task in sorted_failed_tasks:
-            print(f"- {task}")
-        if not dry_run:
-            print("\nDeleting failed tasks...")
-            for _, task_id, _ in sorted_failed_tasks:
-                try:
-                    ctx.obj.deleteTask(task_id)
-                except Exception as e:
-                    print(f"WARNING: {e}")
-                    continue
-    else:
-        print("NO FAILED TASKS")
+    _run_plan(ctx.obj, plan, dry_run, concurrency, plan_out, output_format)
+
+
+@cli.command()
+@click.pass_context
+@click.argument(
+    "plan_file",
+    type=click.Path(exists=True),
+)
+@click.option(
+    "--dry-run",
+    "dry_run",
+    is_flag=True,
+    help="Do a dry run; no late task migrations or deletions.",
+)
+@_concurrency_option
+@_format_option
+def apply(ctx: click.Context, plan_file, dry_run, concurrency, output_format):
+    """Carry out a plan saved by grader / clean --plan-out, without fetching tasks."""
+    try:
+        plan = TaskPlan.read(os.path.expanduser(plan_file))
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"ERROR: invalid plan file ({e})")
+        exit(1)
+    # Send each mutation to the task's own list without switching the manager's
+    # lists; plans from before lists were tagged only name the plan's list
+    plan_list_id = None
+    if plan.task_list_id is not None:
+        plan_list_id = plan.task_list_id.split(",")[0].strip()
+    ctx.obj.routeTasks(
+        (action.task_id, action.list_id or plan_list_id)
+        for action in plan.actions
+        if (action.list_id or plan_list_id) is not None
+    )
+    if output_format == "text":
+        print(f"Applying plan from {plan.created.strftime('%Y-%m-%d %H:%M')}")
+        print()
+    _run_plan(ctx.obj, plan, dry_run, concurrency, output_format=output_format)
+
+
+@cli.command()
+@click.pass_context
+@click.option(
+    "--grades-file",
+    "grades_file",
+    type=click.Path(),
+    default=TTD.GRADES_FILE,
+    show_default=True,
+    help="SQLite grade history written by grader.",
+)
+@click.option(
+    "--weeks",
+    "weeks",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of most recent weeks to report.",
+)
+@click.option(
+    "--import-csv",
+    "import_csv",
+    type=click.Path(exists=True),
+    default=None,
+    help=f"First import a pipe-delimited grader log (e.g. {TTD.GRADER_OUTPUT_FILE}).",
+)
+@_format_option
+def report(ctx: click.Context, grades_file, weeks, import_csv, output_format):
+    """Summarize the grade history by priority and week.
+
+    A task counts as completed if its last grade wasn't late. Failure streaks are
+    runs of consecutive weeks in which tasks of a priority failed.
+    """
+    from task_tools.grades import LATE_BUCKETS, GradeStore
+
+    store = GradeStore(grades_file)
+    if import_csv is not None:
+        count = store.importCsv(import_csv)
+        click.echo(f"Imported {count} grades from {import_csv}", err=True)
+    since = datetime.date.today() - datetime.timedelta(weeks=weeks - 1)
+    rows = []
+    for week in store.weeks(since):
+        monday = datetime.date.fromisoformat(week["week"])
+        record = {
+            "week": f"{monday.isocalendar()[0]}-W{monday.isocalendar()[1]:02d}",
+            "priority": f"P{week['timing']}",
+            "tasks": week["tasks"],
+            "completion_rate": round(week["on_time"] / week["tasks"], 4),
+            "late": week["late"],
+            "failed": week["failed"],
+            "avg_days_late": round(week["days_late_sum"] / max(week["late"], 1), 2),
+            "failure_streak": week["failure_streak"],
+        }
+        for label, _, _ in LATE_BUCKETS:
+            record[label] = week[label]
+        rows.append(record)
+    if output_format != "text":
+        with RecordWriter(output_format, REPORT_FIELDS) as writer:
+            for record in rows:
+                writer.write(record)
+        return
+    if len(rows) == 0:
+        print("NO GRADES")
+        return
+    print(
+        f"{'WEEK':<9} {'PRIO':<4} {'TASKS':>5} {'DONE':>6} {'LATE':>5} {'FAILED':>6} "
+        f"{'AVG':>5} {'1d':>4} {'2-3d':>4} {'4-7d':>4} {'8d+':>4} {'STREAK':>6}"
+    )
+    for record in rows:
+        print(
+            f"{record['week']:<9} {record['priority']:<4} {record['tasks']:>5} "
+            f"{record['completion_rate']:>6.0%} {record['late']:>5} "
+            f"{record['failed']:>6} {record['avg_days_late']:>5.1f} "
+            f"{record['late_1']:>4} {record['late_2_3']:>4} {record['late_4_7']:>4} "
+            f"{record['late_8_plus']:>4} {record['failure_streak']:>6}"
+        )
+
+
+@cli.command()
+@click.pass_context
+@_concurrency_option
+def flush(ctx: click.Context, concurrency):
+    """Send the mutations queued in the journal, and finish interrupted runs.
+
+    Covers every journaled command (put, put-spec and delete-by-name). Mutations
+    whose results were never acknowledged are sent again, so after a crash an
+    insert may be repeated. Runs still being carried out by another task-tools
+    process are skipped.
+    """
+    if _resume_runs(ctx.obj, JOURNALED_COMMANDS, concurrency) > 0:
+        exit(1)
+
+
+@cli.command()
+@click.pass_context
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(),
+    default=os.environ.get("TASK_TOOLS_SOCKET", TTD.DAEMON_SOCKET),
+    show_default=True,
+    help="Unix socket to listen on (clients read TASK_TOOLS_SOCKET).",
+)
+@click.option(
+    "--sync-interval",
+    "sync_interval",
+    type=float,
+    default=TTD.DAEMON_SYNC_INTERVAL,
+    show_default=True,
+    help="Seconds a mirror sync is reused for before a command syncs again.",
+)
+def serve(ctx: click.Context, socket_path, sync_interval):
+    """Keep an authenticated session warm and run the commands clients send.
+
+    While it runs, task-tools commands without group options are executed here
+    instead of starting a new session; set TASK_TOOLS_NO_DAEMON=1 to bypass it.
+    """
+    import signal
+    from task_tools.daemon import TaskDaemon
+
+    if ctx.obj.service is None:
+        print("Program error: could not connect to Google Tasks; check your secrets")
+        if ctx.obj.service_error is not None:
+            print(f"  {ctx.obj.service_error}")
+        exit(1)
+    if ctx.obj.mirror is not None:
+        ctx.obj.syncMirror()
+    daemon = TaskDaemon(socket_path, ctx.obj, sync_interval)
+    try:
+        daemon.bind()
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        exit(1)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    print(f"Serving task-tools on {socket_path}", flush=True)
+    try:
+        daemon.serveForever()
+    except KeyboardInterrupt:
+        daemon.close()
 
 
 def main():
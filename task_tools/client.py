@@ -0,0 +1,78 @@
+import json
+import os
+import socket
+import sys
+
+from task_tools.defaults import TaskToolsDefaults as TTD
+
+# Messages are one JSON object per line. The client sends
+#   {"argv": [...], "cwd": "..."}
+# and the daemon answers with any number of {"stdout": text} / {"stderr": text}
+# followed by {"exit": code}, or with {"decline": reason} to have the client
+# run the command itself.
+
+
+def socketPath():
+    return os.path.expanduser(os.environ.get("TASK_TOOLS_SOCKET", TTD.DAEMON_SOCKET))
+
+
+def sendMessage(sock, message):
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def runRemote(argv, socket_path=None, stdout=None, stderr=None):
+    """Run a task-tools command on the daemon, relaying its output.
+
+    Returns the command's exit code, or None if no daemon is listening or it
+    declined the command.
+    """
+    stdout = stdout if stdout is not None else sys.stdout
+    stderr = stderr if stderr is not None else sys.stderr
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or socketPath())
+    except OSError:
+        sock.close()
+        return None
+    with sock, sock.makefile("r", encoding="utf-8") as replies:
+        sendMessage(sock, {"argv": list(argv), "cwd": os.getcwd()})
+        for line in replies:
+            message = json.loads(line)
+            if "stdout" in message:
+                stdout.write(message["stdout"])
+                stdout.flush()
+            elif "stderr" in message:
+                stderr.write(message["stderr"])
+                stderr.flush()
+            elif "exit" in message:
+                return message["exit"]
+            elif "decline" in message:
+                return None
+    stderr.write("ERROR: lost the connection to the task-tools daemon\n")
+    return 1
+
+
+def main():
+    """task-tools entry point: use a running daemon if there is one, else run in process.
+
+    Commands with group options (e.g. --task-list-id) always run in process,
+    since the daemon's session was set up with its own.
+    """
+    argv = sys.argv[1:]
+    code = None
+    if (
+        len(argv) > 0
+        and not argv[0].startswith("-")
+        and argv[0] != "serve"
+        and not os.environ.get("TASK_TOOLS_NO_DAEMON")
+    ):
+        code = runRemote(argv)
+    if code is None:
+        from task_tools import cli
+
+        cli.main()
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+from datetime import date
+
+import click
+
+from task_tools.client import sendMessage
+
+
+class _SocketWriter(io.RawIOBase):
+    """Binary stream that forwards every write to the client as one message."""
+
+    def __init__(self, sock, name):
+        self.sock = sock
+        self.name = name
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if len(data) > 0:
+            sendMessage(self.sock, {self.name: bytes(data).decode("utf-8", "replace")})
+        return len(data)
+
+
+def _socketStream(sock, name):
+    return io.TextIOWrapper(
+        _SocketWriter(sock, name), encoding="utf-8", write_through=True
+    )
+
+
+class TaskDaemon(object):
+    """Serves task-tools commands over a unix socket from one warm TaskManager.
+
+    The authenticated service, rate limiter and task mirror stay loaded between
+    commands, which run one at a time; anything else a command changes on the
+    TaskManager (its task lists, routing, tracer) is put back after it. The mirror
+    is brought up to date before a command if it was last synced more than
+    sync_interval seconds ago.
+    """
+
+    def __init__(self, socket_path, task_manager, sync_interval=10.0):
+        self.socket_path = os.path.expanduser(socket_path)
+        self.task_manager = task_manager
+        self.sync_interval = sync_interval
+        self.last_sync = 0.0
+        self.loaded_on = date.today()
+        self.cli = importlib.import_module("task_tools.cli").cli
+        self.server = None
+        self.stopping = False
+
+    def _freshCli(self):
+        # Option defaults such as "today" are computed at import; recompute them
+        # when the date changes
+        if date.today() != self.loaded_on:
+            self.cli = importlib.reload(sys.modules["task_tools.cli"]).cli
+            self.loaded_on = date.today()
+        return self.cli
+
+    def bind(self):
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                # Left behind by a daemon that didn't shut down cleanly
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(
+                    f"a daemon is already listening on {self.socket_path}"
+                )
+            finally:
+                probe.close()
+        if os.path.dirname(self.socket_path):
+            os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Created owner-only, with no window where other users could connect
+        umask = os.umask(0o177)
+        try:
+            self.server.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+        self.server.listen(16)
+
+    def serveForever(self):
+        if self.server is None:
+            self.bind()
+        server = self.server
+        try:
+            while not self.stopping:
+                try:
+                    conn, _ = server.accept()
+                except OSError:
+                    # stop() shut the socket down
+                    break
+                with conn:
+                    self.handle(conn)
+        finally:
+            self.close()
+
+    def stop(self):
+        """Make serveForever return, from another thread or a signal handler."""
+        self.stopping = True
+        if self.server is not None:
+            try:
+                self.server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        server, self.server = self.server, None
+        if server is not None:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def handle(self, conn):
+        try:
+            with conn.makefile("r", encoding="utf-8") as requests:
+                request = json.loads(requests.readline())
+            argv = request["argv"]
+            if len(argv) == 0 or argv[0].startswith("-") or argv[0] == "serve":
+                sendMessage(conn, {"decline": "run in process"})
+                return
+            code = self.runCommand(argv, request.get("cwd"), conn)
+            sendMessage(conn, {"exit": code})
+        except (OSError, ValueError, KeyError):
+            # The client went away or sent garbage; nothing to answer
+            pass
+
+    def runCommand(self, argv, cwd, conn):
+        if cwd is not None:
+            os.chdir(cwd)
+        if time.monotonic() - self.last_sync > self.sync_interval:
+            self.task_manager.mirror_synced = False
+            self.last_sync = time.monotonic()
+        stdout = _socketStream(conn, "stdout")
+        stderr = _socketStream(conn, "stderr")
+        state = self.task_manager.commandState()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                self._freshCli().main(
+                    args=argv,
+                    prog_name="task-tools",
+                    obj=self.task_manager,
+                    standalone_mode=False,
+                )
+                return 0
+            except click.exceptions.Exit as e:
+                return e.exit_code
+            except click.ClickException as e:
+                e.show(file=stderr)
+                return e.exit_code
+            except click.Abort:
+                click.echo("Aborted!", file=stderr)
+                return 1
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    return e.code or 0
+                click.echo(e.code, file=stderr)
+                return 1
+            except Exception:
+                traceback.print_exc(file=stderr)
+                return 1
+            finally:
+                self.task_manager.restoreCommandState(state)
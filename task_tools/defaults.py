@@ -5,8 +5,26 @@ class TaskToolsDefaults:
     TASK_SECRETS_FILE = "~/secrets/google/client_secrets.json"
     TASK_REFRESH_TOKEN = "~/secrets/google/refresh.json"
     TASK_LIST_ID = "MDY2MzkyMzI4NTQ1MTA0NDUwODY6MDow"
+    TASK_DISCOVERY_CACHE = "~/.cache/task-tools/tasks-v1-discovery.json"
+    TASK_TOKEN_CACHE = "~/.cache/task-tools/token.json"
     GRADER_OUTPUT_FILE = "~/data/task_grades/log.csv"
+    GRADES_FILE = "~/data/task_grades/grades.db"
     ENABLE_LOGGING = False
+    BATCH_SIZE = 50
+    RATE_LIMIT = 1.0
+    MAX_RATE_LIMIT = 5.0
+    RATE_BURST = 5
+    MAX_RETRIES = 5
+    CONCURRENCY = 4
+    USE_MIRROR = True
+    TASK_MIRROR_FILE = "~/data/task_tools/mirror.db"
+    USE_PAGE_CACHE = True
+    TASK_PAGE_CACHE = "~/.cache/task-tools/pages.db"
+    DAEMON_SOCKET = "~/.cache/task-tools/daemon.sock"
+    DAEMON_SYNC_INTERVAL = 10.0
+    USE_JOURNAL = True
+    SHARD_FETCH = False
+    JOURNAL_DIR = "~/data/task_tools/journal"
 
     @staticmethod
     def getKwargsOrDefault(argname, **kwargs):
@@ -15,6 +33,21 @@ class TaskToolsDefaults:
             "task_refresh_token": TaskToolsDefaults.TASK_REFRESH_TOKEN,
             "enable_logging": TaskToolsDefaults.ENABLE_LOGGING,
             "task_list_id": TaskToolsDefaults.TASK_LIST_ID,
+            "discovery_cache": TaskToolsDefaults.TASK_DISCOVERY_CACHE,
+            "token_cache": TaskToolsDefaults.TASK_TOKEN_CACHE,
+            "batch_size": TaskToolsDefaults.BATCH_SIZE,
+            "rate_limit": TaskToolsDefaults.RATE_LIMIT,
+            "max_rate_limit": TaskToolsDefaults.MAX_RATE_LIMIT,
+            "rate_burst": TaskToolsDefaults.RATE_BURST,
+            "max_retries": TaskToolsDefaults.MAX_RETRIES,
+            "use_mirror": TaskToolsDefaults.USE_MIRROR,
+            "mirror_file": TaskToolsDefaults.TASK_MIRROR_FILE,
+            "use_page_cache": TaskToolsDefaults.USE_PAGE_CACHE,
+            "page_cache_file": TaskToolsDefaults.TASK_PAGE_CACHE,
+            "use_journal": TaskToolsDefaults.USE_JOURNAL,
+            "journal_dir": TaskToolsDefaults.JOURNAL_DIR,
+            "shard_fetch": TaskToolsDefaults.SHARD_FETCH,
+            "refresh": False,
         }
         return (
             kwargs[argname]
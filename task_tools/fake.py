@@ -0,0 +1,416 @@
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from datetime import datetime
+
+DEFAULT_TASK_LIST = "@default"
+
+
+class FakeResponse(dict):
+    """Response headers plus an HTTP status, shaped like httplib2.Response."""
+
+    def __init__(self, status, **headers):
+        super().__init__(**headers)
+        self.status = status
+
+
+class FakeHttpError(Exception):
+    """Stand-in for googleapiclient.errors.HttpError (same resp / content attributes)."""
+
+    def __init__(self, status, reason, retry_after=None):
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.resp = FakeResponse(status, **headers)
+        self.content = json.dumps(
+            {"error": {"code": status, "errors": [{"reason": reason}]}}
+        ).encode("utf-8")
+        super().__init__(f"<FakeHttpError {status} {reason}>")
+
+
+def _parseFields(spec):
+    """Parse a partial-response selector like "etag,items(id,title)" into a dict."""
+    fields = {}
+    name = ""
+    depth = 0
+    start = 0
+    for i, char in enumerate(spec + ","):
+        if char == "(":
+            if depth == 0:
+                name, start = spec[:i].rsplit(",", 1)[-1].strip(), i + 1
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                fields[name] = _parseFields(spec[start:i])
+                name = None
+        elif char == "," and depth == 0:
+            if name is not None:
+                field = spec[start:i].strip()
+                if field:
+                    fields[field] = None
+            name = ""
+            start = i + 1
+    return fields
+
+
+def _project(value, fields):
+    if isinstance(value, list):
+        return [_project(item, fields) for item in value]
+    projected = {}
+    for name, subfields in fields.items():
+        if name in value:
+            if subfields is None:
+                projected[name] = value[name]
+            else:
+                projected[name] = _project(value[name], subfields)
+    return projected
+
+
+class FakeRequest(object):
+    def __init__(self, service, method_id, params, handler):
+        self.service = service
+        self.methodId = method_id
+        self.params = params
+        self.handler = handler
+        self.headers = {}
+
+    def execute(self, http=None, num_retries=0):
+        self.service._roundTrip()
+        return self.service._dispatch(self)
+
+
+class FakeBatchRequest(object):
+    def __init__(self, service, callback=None):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        if request_id is None:
+            request_id = str(len(self.requests))
+        self.requests.append((request_id, request, callback))
+
+    def execute(self, http=None):
+        self.service._roundTrip(method_id="batch")
+        for request_id, request, callback in self.requests:
+            try:
+                response, exception = self.service._dispatch(request), None
+            except FakeHttpError as e:
+                response, exception = None, e
+            for handler in (callback, self.callback):
+                if handler is not None:
+                    handler(request_id, response, exception)
+
+
+class FakeTasksResource(object):
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, tasklist, **params):
+        return FakeRequest(
+            self.service,
+            "tasks.tasks.list",
+            dict(params, tasklist=tasklist),
+            self.service._list,
+        )
+
+    def get(self, tasklist, task):
+        return FakeRequest(
+            self.service,
+            "tasks.tasks.get",
+            {"tasklist": tasklist, "task": task},
+            self.service._get,
+        )
+
+    def insert(self, tasklist, body):
+        return FakeRequest(
+            self.service,
+            "tasks.tasks.insert",
+            {"tasklist": tasklist, "body": body},
+            self.service._insert,
+        )
+
+    def patch(self, tasklist, task, body):
+        return FakeRequest(
+            self.service,
+            "tasks.tasks.patch",
+            {"tasklist": tasklist, "task": task, "body": body},
+            self.service._patch,
+        )
+
+    def delete(self, tasklist, task):
+        return FakeRequest(
+            self.service,
+            "tasks.tasks.delete",
+            {"tasklist": tasklist, "task": task},
+            self.service._delete,
+        )
+
+
+class FakeTaskListsResource(object):
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, **params):
+        return FakeRequest(
+            self.service, "tasks.tasklists.list", params, self.service._listTaskLists
+        )
+
+
+class FakeTasksService(object):
+    """In-memory Google Tasks v1 service that can be handed to TaskManager(service=...).
+
+    Supports tasks list (paging, due / updated filters, show* flags), get, insert,
+    patch and delete, tasklists list, and batch requests, with `fields` partial
+    responses and If-None-Match conditional requests. Every HTTP round trip
+    can be slowed by `latency` seconds; `error_rate` fails that fraction of
+    requests with a 503; and `quota_per_sec` rejects requests beyond that rate
+    with 429 + Retry-After, the way the real API does. Calls and bytes moved are
+    tallied in `stats`.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        error_rate=0.0,
+        quota_per_sec=None,
+        seed=0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota_per_sec = quota_per_sec
+        self.random = random.Random(seed)
+        self.clock = clock
+        self.sleep = sleep
+        self.lists = {DEFAULT_TASK_LIST: {}}
+        self.titles = {DEFAULT_TASK_LIST: "My Tasks"}
+        self.injected_errors = deque()
+        self.recent_requests = deque()
+        self.next_id = 0
+        # Filtered listings, reused across the pages of one listing until a write
+        self.list_cache = {}
+        self.lock = threading.RLock()
+        self.resetStats()
+
+    def resetStats(self):
+        self.stats = {
+            "http_calls": 0,
+            "requests": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            "methods": Counter(),
+        }
+
+    # Seeding and fault injection
+
+    def addTaskList(self, tasklist, title=None):
+        with self.lock:
+            self.lists.setdefault(tasklist, {})
+            self.titles[tasklist] = title if title is not None else tasklist
+
+    def addTasks(self, items, tasklist=DEFAULT_TASK_LIST):
+        """Store task dicts (title, due, notes, ...) without counting them as API traffic."""
+        with self.lock:
+            self.addTaskList(tasklist, self.titles.get(tasklist))
+            return [self._store(tasklist, dict(item)) for item in items]
+
+    def injectError(self, status, reason="backendError", count=1, retry_after=None):
+        """Fail the next `count` requests with the given status."""
+        with self.lock:
+            for _ in range(count):
+                self.injected_errors.append((status, reason, retry_after))
+
+    # Service surface
+
+    def tasks(self):
+        return FakeTasksResource(self)
+
+    def tasklists(self):
+        return FakeTaskListsResource(self)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatchRequest(self, callback)
+
+    # Internals
+
+    def _roundTrip(self, method_id=None):
+        with self.lock:
+            self.stats["http_calls"] += 1
+            if method_id is not None:
+                self.stats["methods"][method_id] += 1
+        if self.latency > 0:
+            self.sleep(self.latency)
+
+    def _admit(self):
+        """Raise the error this request should fail with, if any."""
+        if self.injected_errors:
+            status, reason, retry_after = self.injected_errors.popleft()
+            raise FakeHttpError(status, reason, retry_after)
+        if self.quota_per_sec is not None:
+            now = self.clock()
+            while self.recent_requests and self.recent_requests[0] <= now - 1.0:
+                self.recent_requests.popleft()
+            if len(self.recent_requests) >= self.quota_per_sec:
+                raise FakeHttpError(429, "rateLimitExceeded", retry_after=1)
+            self.recent_requests.append(now)
+        if self.error_rate > 0 and self.random.random() < self.error_rate:
+            raise FakeHttpError(503, "backendError")
+
+    def _dispatch(self, request):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["methods"][request.methodId] += 1
+            body = request.params.get("body")
+            if body is not None:
+                self.stats["bytes_sent"] += len(json.dumps(body))
+            self._admit()
+            response = request.handler(**request.params)
+            if "fields" in request.params and isinstance(response, dict):
+                response = _project(response, _parseFields(request.params["fields"]))
+            etag = response.get("etag") if isinstance(response, dict) else None
+            if etag is not None and request.headers.get("If-None-Match") == etag:
+                raise FakeHttpError(304, "notModified")
+            self.stats["bytes_received"] += len(json.dumps(response))
+            return response
+
+    def _now(self):
+        return f"{datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]}Z"
+
+    def _store(self, tasklist, item):
+        self.list_cache.clear()
+        self.next_id += 1
+        item.setdefault("id", f"FAKE{self.next_id:08d}")
+        item.setdefault("kind", "tasks#task")
+        item.setdefault("status", "needsAction")
+        item.setdefault("position", f"{self.next_id:020d}")
+        item["etag"] = f'"{self.next_id}"'
+        item["updated"] = self._now()
+        self.lists[tasklist][item["id"]] = item
+        return dict(item)
+
+    def _taskList(self, tasklist):
+        if tasklist not in self.lists:
+            raise FakeHttpError(404, "notFound")
+        return self.lists[tasklist]
+
+    def _task(self, tasklist, task):
+        item = self._taskList(tasklist).get(task)
+        if item is None or item.get("deleted"):
+            raise FakeHttpError(404, "notFound")
+        return item
+
+    def _list(
+        self,
+        tasklist,
+        maxResults=20,
+        pageToken=None,
+        dueMin=None,
+        dueMax=None,
+        updatedMin=None,
+        completedMin=None,
+        completedMax=None,
+        showCompleted=True,
+        showDeleted=False,
+        showHidden=False,
+        **unused,
+    ):
+        key = (
+            tasklist,
+            dueMin,
+            dueMax,
+            updatedMin,
+            bool(showCompleted),
+            bool(showDeleted),
+            bool(showHidden),
+        )
+        matches = self.list_cache.get(key)
+        if matches is None:
+            matches = self._filter(tasklist, *key[1:])
+            self.list_cache[key] = matches
+        start = int(pageToken) if pageToken else 0
+        end = start + min(int(maxResults), 100)
+        items = [dict(item) for item in matches[start:end]]
+        etags = "".join(item["etag"] for item in items)
+        response = {
+            "kind": "tasks#tasks",
+            "etag": f'"{zlib.crc32(f"{len(matches)}:{etags}".encode())}"',
+            "items": items,
+        }
+        if end < len(matches):
+            response["nextPageToken"] = str(end)
+        return response
+
+    def _filter(
+        self,
+        tasklist,
+        dueMin,
+        dueMax,
+        updatedMin,
+        showCompleted,
+        showDeleted,
+        showHidden,
+    ):
+        matches = []
+        for item in self._taskList(tasklist).values():
+            if item.get("deleted") and not showDeleted:
+                continue
+            if item.get("hidden") and not showHidden:
+                continue
+            if item.get("status") == "completed" and not showCompleted:
+                continue
+            if dueMin is not None and (item.get("due") is None or item["due"] < dueMin):
+                continue
+            if dueMax is not None and (item.get("due") is None or item["due"] > dueMax):
+                continue
+            if updatedMin is not None and item["updated"] < updatedMin:
+                continue
+            matches.append(item)
+        return matches
+
+    def _get(self, tasklist, task):
+        return dict(self._task(tasklist, task))
+
+    def _insert(self, tasklist, body):
+        self._taskList(tasklist)
+        return self._store(tasklist, dict(body))
+
+    def _patch(self, tasklist, task, body):
+        item = self._task(tasklist, task)
+        self.list_cache.clear()
+        item.update(body)
+        self.next_id += 1
+        item["etag"] = f'"{self.next_id}"'
+        item["updated"] = self._now()
+        return dict(item)
+
+    def _delete(self, tasklist, task):
+        item = self._task(tasklist, task)
+        self.list_cache.clear()
+        # The real API keeps deleted tasks around, flagged, for incremental syncs
+        item["deleted"] = True
+        item["hidden"] = True
+        item["updated"] = self._now()
+        return ""
+
+    def _listTaskLists(self, maxResults=100, pageToken=None, **unused):
+        ids = sorted(self.lists)
+        start = int(pageToken) if pageToken else 0
+        end = start + min(int(maxResults), 100)
+        response = {
+            "kind": "tasks#taskLists",
+            "items": [
+                {
+                    "kind": "tasks#taskList",
+                    "id": tasklist,
+                    "title": self.titles[tasklist],
+                }
+                for tasklist in ids[start:end]
+            ],
+        }
+        if end < len(ids):
+            response["nextPageToken"] = str(end)
+        return response
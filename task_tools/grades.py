@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from task_tools.manage import Task
+
+# Days-late buckets of the lateness distribution, as (label, first day, last day)
+LATE_BUCKETS = (
+    ("late_1", 1, 1),
+    ("late_2_3", 2, 3),
+    ("late_4_7", 4, 7),
+    ("late_8_plus", 8, None),
+)
+AGGREGATE_COLUMNS = ("tasks", "on_time", "late", "failed", "days_late_sum") + tuple(
+    label for label, _, _ in LATE_BUCKETS
+)
+
+
+def weekOf(due):
+    """Monday of the week a YYYY-MM-DD due date falls in."""
+    day = date.fromisoformat(due[:10])
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def _contribution(days_late, failed):
+    values = [1, int(days_late == 0), int(days_late > 0), int(failed), days_late]
+    for _, first, last in LATE_BUCKETS:
+        values.append(int(days_late >= first and (last is None or days_late <= last)))
+    return values
+
+
+class GradeStore(object):
+    """SQLite history of grader results with one row per (task id, due date).
+
+    Re-grading a task replaces its row, and the per-priority, per-week totals in
+    the weekly table are adjusted by the difference, so reports never rescan the
+    history. Grading only ever sees pending tasks, so a task whose last grade
+    wasn't late was completed in its window.
+    """
+
+    def __init__(self, path):
+        path = os.path.expanduser(path)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        aggregates = ",\n".join(
+            f"                {column} INTEGER NOT NULL DEFAULT 0"
+            for column in AGGREGATE_COLUMNS
+        )
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS grades (
+                task_id TEXT NOT NULL,
+                due TEXT NOT NULL,
+                name TEXT NOT NULL,
+                timing INTEGER NOT NULL,
+                week TEXT NOT NULL,
+                days_late INTEGER NOT NULL,
+                failed INTEGER NOT NULL,
+                graded_at TEXT NOT NULL,
+                PRIMARY KEY (task_id, due)
+            );
+            CREATE TABLE IF NOT EXISTS weekly (
+                timing INTEGER NOT NULL,
+                week TEXT NOT NULL,
+{aggregates},
+                PRIMARY KEY (timing, week)
+            );
+            """)
+
+    def _addToWeek(self, timing, week, values, sign):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO weekly (timing, week) VALUES (?, ?)", (timing, week)
+        )
+        self.conn.execute(
+            "UPDATE weekly SET "
+            + ", ".join(f"{column} = {column} + ?" for column in AGGREGATE_COLUMNS)
+            + " WHERE timing = ? AND week = ?",
+            [sign * value for value in values] + [timing, week],
+        )
+
+    def record(self, rows, graded_at=None):
+        """Upsert (task id, due, name, days late, failed) grades; returns the count."""
+        if graded_at is None:
+            graded_at = datetime.now()
+        graded_at = graded_at.isoformat(timespec="seconds")
+        count = 0
+        with self.lock, self.conn:
+            for task_id, due, name, days_late, failed in rows:
+                days_late = int(days_late)
+                failed = bool(failed)
+                old = self.conn.execute(
+                    "SELECT timing, week, days_late, failed FROM grades "
+                    "WHERE task_id = ? AND due = ?",
+                    (task_id, due),
+                ).fetchone()
+                if old is not None:
+                    self._addToWeek(old[0], old[1], _contribution(old[2], old[3]), -1)
+                task_type = Task.task_types.get(name[:3])
+                timing = task_type[0] if task_type is not None else -1
+                week = weekOf(due)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO grades (task_id, due, name, timing, week, "
+                    "days_late, failed, graded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        task_id,
+                        due,
+                        name,
+                        timing,
+                        week,
+                        days_late,
+                        int(failed),
+                        graded_at,
+                    ),
+                )
+                self._addToWeek(timing, week, _contribution(days_late, failed), 1)
+                count += 1
+        return count
+
+    def importCsv(self, path):
+        """Upsert the rows of a pipe-delimited grader log (id|due|name|days late|failed)."""
+
+        def rows(logfile):
+            for line in logfile:
+                fields = line.rstrip("\n").split("|")
+                if len(fields) < 5:
+                    continue
+                yield (
+                    fields[0],
+                    fields[1],
+                    "|".join(fields[2:-2]),
+                    int(fields[-2]),
+                    fields[-1] == "True",
+                )
+
+        with open(os.path.expanduser(path), "r") as logfile:
+            return self.record(rows(logfile))
+
+    def weeks(self, since=None):
+        """Weekly totals per priority as dicts, oldest week first.
+
+        Each also gets failure_streak: the number of consecutive weeks, ending with
+        that one, in which tasks of that priority failed.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT timing, week, {', '.join(AGGREGATE_COLUMNS)} FROM weekly "
+                "WHERE tasks > 0 ORDER BY week, timing"
+            ).fetchall()
+        since_week = weekOf(since.isoformat()) if since is not None else None
+        streaks = {}
+        weeks = []
+        for row in rows:
+            week = dict(zip(("timing", "week") + AGGREGATE_COLUMNS, row))
+            previous_week, streak = streaks.get(week["timing"], (None, 0))
+            monday = date.fromisoformat(week["week"])
+            if week["failed"] == 0:
+                streak = 0
+            elif previous_week == monday - timedelta(days=7):
+                streak += 1
+            else:
+                streak = 1
+            streaks[week["timing"]] = (monday, streak)
+            week["failure_streak"] = streak
+            if since_week is None or week["week"] >= since_week:
+                weeks.append(week)
+        return weeks
@@ -0,0 +1,234 @@
+import json
+import os
+import uuid
+from collections import namedtuple
+from datetime import datetime
+
+from task_tools.ratelimit import httpStatus, isThrottleError
+from task_tools.service import _fileLock
+
+# A bulk run with operations that haven't been acknowledged yet. pending holds
+# (seq, item) pairs, in the order they were planned, and routes the task list of
+# each task id the run touches outside the default list. pid is the process
+# carrying the run out (None in journals from before runs had owners).
+JournalRun = namedtuple(
+    "JournalRun",
+    ["run_id", "command", "started", "method", "total", "pending", "routes", "pid"],
+    defaults=(None,),
+)
+
+
+def encodeItem(method, item):
+    """JSON form of a putTasks / moveTasks / deleteTasks item."""
+    if method == "putTasks":
+        name, notes, date = item
+        return [name, notes, date.strftime("%Y-%m-%d") if date is not None else None]
+    if method == "moveTasks":
+        task_id, name, date = item
+        return [task_id, name, date.strftime("%Y-%m-%d") if date is not None else None]
+    return item
+
+
+def decodeItem(method, item):
+    if method in ("putTasks", "moveTasks"):
+        first, second, date = item
+        if date is not None:
+            date = datetime.strptime(date, "%Y-%m-%d")
+        return (first, second, date)
+    return item
+
+
+def isRetryable(error):
+    """Whether a failed mutation should stay queued rather than be given up on.
+
+    That is throttling, server errors, and errors without an HTTP status (the
+    API couldn't be reached).
+    """
+    status = httpStatus(error)
+    return status is None or status >= 500 or isThrottleError(error)
+
+
+def _ownedElsewhere(pid):
+    """Whether another live process owns a run (and may still be sending it)."""
+    if pid is None or pid == os.getpid():
+        # This process's runs aren't in flight between commands
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def isDone(method, error):
+    """Whether a mutation's outcome means it needs no retry."""
+    if error is None:
+        return True
+    # Deleting a task that is already gone has the effect we wanted
+    return method == "deleteTasks" and httpStatus(error) in (404, 410)
+
+
+class MutationJournal(object):
+    """Append-only JSON-lines record of the mutations of bulk runs of one command.
+
+    A run is written out in full before any of it is sent, and every batch of
+    results is acknowledged as it comes back, so an interrupted run (or one whose
+    requests couldn't get through) can be resumed with only its unacknowledged
+    operations. Records are flushed to disk before the requests they announce.
+
+    Resuming re-sends every unacknowledged operation, so delivery is at least
+    once: an operation whose ack was lost to a crash is sent again, which for an
+    insert means a duplicate task. Processes sharing a journal serialize on a lock
+    file next to it, and a run is only resumable once the process that owns it
+    (that started or last claimed it) has exited.
+    """
+
+    def __init__(self, path, command):
+        self.path = os.path.expanduser(path)
+        self.command = command
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def _append(self, records):
+        with _fileLock(self.path):
+            self._write(records)
+
+    def _write(self, records):
+        """Append records; the caller holds the lock."""
+        with open(self.path, "a") as journal:
+            for record in records:
+                journal.write(json.dumps(record) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _records(self):
+        try:
+            with open(self.path, "r") as journal:
+                for line in journal:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # A record torn by a crash mid-write
+                        continue
+        except FileNotFoundError:
+            return
+
+    def openRuns(self):
+        """Runs that were started but not finished, oldest first.
+
+        Runs owned by another process that is still running are left out.
+        """
+        with _fileLock(self.path):
+            runs = self._unfinishedRuns()
+        return [run for run in runs if not _ownedElsewhere(run.pid)]
+
+    def _unfinishedRuns(self):
+        """Every run without an end record; the caller holds the lock."""
+        runs = {}
+        for record in self._records():
+            run = runs.get(record["run"])
+            if record["type"] == "run":
+                runs[record["run"]] = dict(record, ops={}, acked=set())
+            elif run is None:
+                continue
+            elif record["type"] == "own":
+                run["pid"] = record["pid"]
+            elif record["type"] == "op":
+                run["ops"][record["seq"]] = record["item"]
+            elif record["type"] == "ack":
+                run["acked"].update(record["seqs"])
+            elif record["type"] == "end":
+                del runs[record["run"]]
+        return [
+            JournalRun(
+                run["run"],
+                self.command,
+                run["started"],
+                run["method"],
+                len(run["ops"]),
+                [
+                    (seq, decodeItem(run["method"], item))
+                    for seq, item in sorted(run["ops"].items())
+                    if seq not in run["acked"]
+                ],
+                run.get("routes", {}),
+                run.get("pid"),
+            )
+            for run in runs.values()
+        ]
+
+    def _compact(self):
+        """Drop the records of finished runs; the caller holds the lock."""
+        keep = set(run.run_id for run in self._unfinishedRuns())
+        if not os.path.exists(self.path):
+            return
+        records = [record for record in self._records() if record["run"] in keep]
+        partial = f"{self.path}.tmp"
+        with open(partial, "w") as journal:
+            for record in records:
+                journal.write(json.dumps(record) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(partial, self.path)
+
+    def start(self, method, items, routes=None):
+        """Record a new run of the given mutations; returns it as a JournalRun.
+
+        routes maps task ids to the task lists their mutations go to; only those
+        of the items are kept. The run is owned by this process.
+        """
+        run_id = uuid.uuid4().hex
+        started = datetime.now().isoformat(timespec="seconds")
+        items = [item for item in items]
+        if routes:
+            task_ids = set(item[0] if method == "moveTasks" else item for item in items)
+            routes = {
+                task_id: list_id
+                for task_id, list_id in routes.items()
+                if task_id in task_ids
+            }
+        records = [
+            {
+                "type": "run",
+                "run": run_id,
+                "started": started,
+                "method": method,
+                "routes": routes or {},
+                "pid": os.getpid(),
+            }
+        ]
+        records.extend(
+            {"type": "op", "run": run_id, "seq": seq, "item": encodeItem(method, item)}
+            for seq, item in enumerate(items)
+        )
+        with _fileLock(self.path):
+            self._compact()
+            self._write(records)
+        return JournalRun(
+            run_id,
+            self.command,
+            started,
+            method,
+            len(items),
+            list(enumerate(items)),
+            routes or {},
+            os.getpid(),
+        )
+
+    def claim(self, run_id):
+        """Take a run over for resuming; False if it's finished or owned elsewhere."""
+        with _fileLock(self.path):
+            for run in self._unfinishedRuns():
+                if run.run_id == run_id and not _ownedElsewhere(run.pid):
+                    self._write([{"type": "own", "run": run_id, "pid": os.getpid()}])
+                    return True
+        return False
+
+    def ack(self, run_id, seqs):
+        if len(seqs) > 0:
+            self._append([{"type": "ack", "run": run_id, "seqs": list(seqs)}])
+
+    def end(self, run_id):
+        self._append([{"type": "end", "run": run_id}])
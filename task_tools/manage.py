@@ -1,19 +1,55 @@
+import heapq
+import json
 import logging
 import sys
-from datetime import datetime, timedelta
+import threading
+from collections import namedtuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import chain, repeat
 
-from easy_google_auth.auth import getRateLimitedGoogleService
 from task_tools.defaults import TaskToolsDefaults as TTD
+from task_tools.ratelimit import (
+    TokenBucketLimiter,
+    httpStatus,
+    isThrottleError,
+    retryAfter,
+)
+from task_tools.service import ServiceError, buildTasksService
+from task_tools.shards import MIN_SHARDED_DAYS, ShardPlanner
+from task_tools.trace import requestMethod, requestParams, responseSize
 
 
 def dateTimeToGoogleDate(date_time):
     return f"{date_time.strftime('%Y-%m-%d')}T23:59:59.000Z"
 
 
+def dateTimeToGoogleTimestamp(date_time):
+    return f"{date_time.strftime('%Y-%m-%dT%H:%M:%S')}.000Z"
+
+
 def googleDateToDateTime(google_date):
     return datetime.strptime(google_date.split("T")[0], "%Y-%m-%d")
 
 
+# Task fields requested from tasks().list: everything Task reads, just what the
+# batch commands need, and what the mirror needs to apply an incremental sync
+LIST_FIELDS = ("id", "title", "notes", "due")
+BRIEF_FIELDS = ("id", "title", "due")
+SYNC_FIELDS = LIST_FIELDS + ("updated", "status", "deleted", "hidden")
+
+
+def listFields(task_fields):
+    """Partial-response selector for a tasks().list page with the given task fields."""
+    return f"etag,nextPageToken,items({','.join(task_fields)})"
+
+
+# Outcome of one mutation in a bulk call: the input item, the API response
+# (None on failure) and the exception raised for it (None on success).
+MutationResult = namedtuple("MutationResult", ["item", "response", "error"])
+
+
 class Task(object):
     task_types = {
         # label: (timing id, days of leeway),
@@ -23,24 +59,65 @@ class Task(object):
         "P3:": (3, 90),
     }
 
-    def __init__(self, data):
+    __slots__ = (
+        "id",
+        "name",
+        "timing",
+        "autogen",
+        "created",
+        "today",
+        "raw_notes",
+        "list_id",
+    )
+
+    def __init__(self, data, today=None, list_id=None):
+        """Wrap a task resource; today is the date.toordinal() to score it against.
+
+        Dates are kept as ordinals and everything derived from them is computed on
+        access, so pass the same today to every task of a listing. list_id is the
+        task list the task was fetched from.
+        """
         self.id = data["id"]
         self.name = data["title"]
-        created_date = googleDateToDateTime(data["due"])
-        if self.name[:3] in Task.task_types:
-            self.timing = Task.task_types[self.name[:3]][0]
+        self.created = date.fromisoformat(data["due"][:10]).toordinal()
+        self.today = today if today is not None else datetime.today().toordinal()
+        task_type = Task.task_types.get(self.name[:3])
+        if task_type is not None:
+            self.timing = task_type[0]
             self.autogen = "[T]" in self.name
-            due_date = created_date + timedelta(days=Task.task_types[self.name[:3]][1])
-            self.days_score = (datetime.today() - due_date).days
-            self.due = due_date.strftime("%Y-%m-%d")
-            self.days_late = max(self.days_score, 0)
         else:
             self.timing = -1
             self.autogen = False
-            self.days_score = 0
-            self.due = data["due"].split("T")[0]
-            self.days_late = 0
-        self.notes = data["notes"].replace("\n", "\n    ") if "notes" in data else None
+        self.raw_notes = data.get("notes")
+        self.list_id = list_id
+
+    @property
+    def leeway(self):
+        return Task.task_types[self.name[:3]][1] if self.timing >= 0 else 0
+
+    @property
+    def created_date(self):
+        return date.fromordinal(self.created)
+
+    @property
+    def due(self):
+        return date.fromordinal(self.created + self.leeway).isoformat()
+
+    @property
+    def days_score(self):
+        if self.timing < 0:
+            return 0
+        return self.today - self.created - self.leeway
+
+    @property
+    def days_late(self):
+        return max(self.days_score, 0)
+
+    @property
+    def notes(self):
+        if self.raw_notes is None:
+            return None
+        return self.raw_notes.replace("\n", "\n    ")
 
     def toString(self, show_id=True, show_due=True, show_bar=False):
         if self.timing >= 0 and self.days_late > 0 and show_due:
@@ -53,8 +130,7 @@ class Task(object):
             due_info = ""
         if show_bar and self.timing >= 0:
             normalized_score = 1.0 - (
-                float(max(-self.days_score, 0))
-                / max(float(Task.task_types[self.name[:3]][1]), 1.0)
+                float(max(-self.days_score, 0)) / max(float(self.leeway), 1.0)
             )
             if 0 <= normalized_score < 0.25:
                 bar_info = "🟩🟩🟩🟩 "
@@ -74,6 +150,20 @@ class Task(object):
             id_info = ""
         return f"{bar_info}{due_info}{timed_info}{self.name}{id_info}"
 
+    def toDict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "timing": self.timing,
+            "autogen": self.autogen,
+            "created": self.created_date.isoformat(),
+            "due": self.due,
+            "days_late": self.days_late,
+            "days_score": self.days_score,
+            "notes": self.raw_notes,
+            "list_id": self.list_id,
+        }
+
     def __repr__(self):
         return self.toString()
 
@@ -84,7 +174,7 @@ class TaskManager(object):
             if self.service is None:
                 raise Exception(
                     "Tasks interface not initialized properly; check your secrets"
-                )
+                ) from self.service_error
             return func(self, *args, **kwargs)
 
         return wrapper
@@ -94,71 +184,671 @@ class TaskManager(object):
         if self.enable_logging:
             logging.getLogger().addHandler(logging.StreamHandler(sys.stdout))
         self.task_list_id = TTD.getKwargsOrDefault("task_list_id", **kwargs)
-        self.service = None
+        self.task_list_titles = None
+        self.batch_size = TTD.getKwargsOrDefault("batch_size", **kwargs)
+        self.refresh = TTD.getKwargsOrDefault("refresh", **kwargs)
+        self.mirror_file = (
+            TTD.getKwargsOrDefault("mirror_file", **kwargs)
+            if TTD.getKwargsOrDefault("use_mirror", **kwargs)
+            else None
+        )
+        self._mirror = None
+        self.mirror_synced = False
+        self.page_cache_file = (
+            TTD.getKwargsOrDefault("page_cache_file", **kwargs)
+            if TTD.getKwargsOrDefault("use_page_cache", **kwargs)
+            else None
+        )
+        self._page_cache = None
+        self.shard_planner = (
+            ShardPlanner() if TTD.getKwargsOrDefault("shard_fetch", **kwargs) else None
+        )
+        self.journal_dir = (
+            TTD.getKwargsOrDefault("journal_dir", **kwargs)
+            if TTD.getKwargsOrDefault("use_journal", **kwargs)
+            else None
+        )
+        self.limiter = kwargs.get("limiter")
+        if self.limiter is None:
+            self.limiter = TokenBucketLimiter(
+                rate=TTD.getKwargsOrDefault("rate_limit", **kwargs),
+                burst=TTD.getKwargsOrDefault("rate_burst", **kwargs),
+                max_rate=TTD.getKwargsOrDefault("max_rate_limit", **kwargs),
+                max_retries=TTD.getKwargsOrDefault("max_retries", **kwargs),
+            )
+        self.tracer = kwargs.get("tracer")
+        self.thread_local = threading.local()
+        self.lazy_lock = threading.Lock()
+        # Authentication and service discovery are deferred until the first API call
+        self.service_kwargs = {
+            "task_secrets_file": TTD.getKwargsOrDefault("task_secrets_file", **kwargs),
+            "task_refresh_token": TTD.getKwargsOrDefault(
+                "task_refresh_token", **kwargs
+            ),
+            "discovery_cache": TTD.getKwargsOrDefault("discovery_cache", **kwargs),
+            "token_cache": TTD.getKwargsOrDefault("token_cache", **kwargs),
+        }
+        self.service_built = False
+        self.service_error = None
+        self._service = kwargs.get("service")
+
+    @property
+    def service(self):
+        with self.lazy_lock:
+            if self._service is None and not self.service_built:
+                self.service_built = True
+                try:
+                    self._service = buildTasksService(**self.service_kwargs)
+                except ServiceError as e:
+                    self.service_error = e
+                    if self.enable_logging:
+                        logging.warning(f"Could not build the Tasks service ({e})")
+        return self._service
+
+    @service.setter
+    def service(self, service):
+        self._service = service
+
+    @property
+    def task_list_ids(self):
+        """IDs of the task lists in use; "all" is resolved through tasklists().list."""
+        if self._task_list_ids is None:
+            self._task_list_ids = [list_id for list_id, _ in self.getTaskLists()]
+        return self._task_list_ids
+
+    @property
+    def task_list_id(self):
+        """The first task list in use, which new tasks go to."""
+        return self.task_list_ids[0]
+
+    @task_list_id.setter
+    def task_list_id(self, task_list_id):
+        """Select a task list ID, comma-separated IDs, or "all" of them."""
+        if task_list_id.strip() == "all":
+            self._task_list_ids = None
+        else:
+            self._task_list_ids = [
+                list_id.strip()
+                for list_id in task_list_id.split(",")
+                if list_id.strip()
+            ]
+        # Task list of each task fetched from one of several lists, for mutations
+        self.task_lists = {}
+
+    def listOf(self, task_id):
+        """Task list a fetched (or routed) task belongs to."""
+        return self.task_lists.get(task_id, self.task_list_id)
+
+    def routeTasks(self, task_lists):
+        """Send later mutations of each (task id, task list id) to that list."""
+        for task_id, list_id in task_lists:
+            self.task_lists[task_id] = list_id
+
+    def commandState(self):
+        """The settings a command may change: task lists, task routing and tracer."""
+        return (self._task_list_ids, dict(self.task_lists), self.tracer)
+
+    def restoreCommandState(self, state):
+        """Undo a command's changes to what commandState returned before it."""
+        task_list_ids, task_lists, self.tracer = state
+        self._task_list_ids = task_list_ids
+        self.task_lists = dict(task_lists)
+
+    @property
+    def multiple_lists(self):
+        """Whether tasks may come from several task lists (without resolving "all")."""
+        return self._task_list_ids is None or len(self._task_list_ids) > 1
+
+    def listTitle(self, list_id, fetch=True):
+        """Title of a task list; its ID if unknown and fetch is off."""
+        if self.task_list_titles is None and not fetch:
+            return list_id
+        if self.task_list_titles is None:
+            try:
+                self.task_list_titles = dict(self.getTaskLists())
+            except Exception:
+                self.task_list_titles = {}
+        return self.task_list_titles.get(list_id, list_id)
+
+    @property
+    def mirror(self):
+        with self.lazy_lock:
+            if self._mirror is None and self.mirror_file is not None:
+                # Imported here so that sqlite3 stays off the CLI startup path
+                from task_tools.mirror import TaskMirror
+
+                self._mirror = TaskMirror(self.mirror_file)
+        return self._mirror
+
+    @property
+    def page_cache(self):
+        with self.lazy_lock:
+            if self._page_cache is None and self.page_cache_file is not None:
+                from task_tools.mirror import PageCache
+
+                self._page_cache = PageCache(self.page_cache_file)
+        return self._page_cache
+
+    @property
+    def due_ordered(self):
+        """Whether iterTasks yields tasks in due date order (it does from the mirror)."""
+        return self.mirror_file is not None
+
+    def _threadHttp(self):
+        """A private HTTP transport for worker threads, since httplib2 isn't thread-safe."""
+        credentials = getattr(getattr(self.service, "_http", None), "credentials", None)
+        if credentials is None:
+            return None
+        if not hasattr(self.thread_local, "http"):
+            import google_auth_httplib2
+            import httplib2
+
+            self.thread_local.http = google_auth_httplib2.AuthorizedHttp(
+                credentials, http=httplib2.Http()
+            )
+        return self.thread_local.http
+
+    def _execute(self, request):
+        kwargs = {}
+        if threading.current_thread() is not threading.main_thread():
+            http = self._threadHttp()
+            if http is not None:
+                kwargs["http"] = http
+        if self.tracer is None:
+            return self.limiter.execute(request, **kwargs)
+        stats = {}
+        start = self.tracer.clock()
+        response, error = None, None
         try:
-            self.service = getRateLimitedGoogleService(
-                "tasks",
-                "v1",
-                TTD.getKwargsOrDefault("task_secrets_file", **kwargs),
-                TTD.getKwargsOrDefault("task_refresh_token", **kwargs),
-                headless=True,
-                max_rate_per_sec=1.0,
+            response = self.limiter.execute(request, stats=stats, **kwargs)
+            return response
+        except Exception as e:
+            if httpStatus(e) != 304:
+                error = e
+            raise
+        finally:
+            self.tracer.record(
+                requestMethod(request),
+                requestParams(request),
+                start,
+                self.tracer.clock(),
+                response_bytes=responseSize(response),
+                error=error,
+                **stats,
             )
-        except:
-            pass
+
+    def _executeConditional(self, request, key):
+        """Execute a GET, sending the cached ETag and answering a 304 from the cache."""
+        if self.page_cache is None:
+            return self._execute(request)
+        cached = self.page_cache.get(key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached[0]
+        try:
+            response = self._execute(request)
+        except Exception as e:
+            if cached is not None and httpStatus(e) == 304:
+                return cached[1]
+            raise
+        if response.get("etag") is not None:
+            self.page_cache.put(key, response["etag"], response)
+        return response
+
+    def _listPages(self, conditional=False, **params):
+        """Yield every page of a tasks().list call.
+
+        With conditional, pages are requested with the ETag of the cached copy.
+        """
+        page_token = None
+        while True:
+            if page_token is not None:
+                params["pageToken"] = page_token
+            request = self.service.tasks().list(**params)
+            if conditional:
+                results = self._executeConditional(
+                    request, json.dumps(["tasks.list", params], sort_keys=True)
+                )
+            else:
+                results = self._execute(request)
+            yield results
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+
+    def _listItems(self, conditional=False, **params):
+        """Yield raw task items from every page of a tasks().list call."""
+        for page in self._listPages(conditional, **params):
+            for item in page.get("items", []):
+                yield item
 
     @_check_valid_interface
-    def getTasks(self, date=None, start_date=None):
-        if date is None:
-            date = datetime.today()
-        fdate = dateTimeToGoogleDate(date + timedelta(days=1))
-        if start_date is None:
-            results = (
-                self.service.tasks()
-                .list(
-                    tasklist=self.task_list_id,
-                    maxResults=100,
-                    showCompleted=False,
-                    dueMax=fdate,
+    def getTaskLists(self):
+        """(id, title) of every task list, in the order tasklists().list returns them."""
+        task_lists = []
+        page_token = None
+        while True:
+            params = {"maxResults": 100}
+            if page_token is not None:
+                params["pageToken"] = page_token
+            results = self._execute(self.service.tasklists().list(**params))
+            for item in results.get("items", []):
+                task_lists.append((item["id"], item.get("title", item["id"])))
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+        self.task_list_titles = dict(task_lists)
+        return task_lists
+
+    def _forEachList(self, func):
+        """[func(list id) for each task list in use], fetching lists concurrently.
+
+        The worker threads share the rate limiter, so together they stay within
+        the quota.
+        """
+        list_ids = self.task_list_ids
+        if len(list_ids) == 1:
+            return [func(list_ids[0])]
+        with ThreadPoolExecutor(
+            max_workers=min(len(list_ids), TTD.CONCURRENCY)
+        ) as executor:
+            return list(executor.map(func, list_ids))
+
+    def _shardedItems(self, first_day, last_day, **params):
+        """Yield raw task items due first_day..last_day, fetched as parallel date shards.
+
+        Shards are fetched TTD.CONCURRENCY at a time and yielded in date order, each
+        sorted by due date; each one's size comes from the tasks counted so far.
+        Until there is a count, a single shard is fetched to take it, so no request
+        is spent on probing the window. A task re-dated while its window is being
+        fetched is only yielded once.
+        """
+
+        def fetchShard(shard):
+            shard_params = dict(
+                params,
+                dueMin=dateTimeToGoogleDate(shard[0] - timedelta(days=1)),
+                dueMax=dateTimeToGoogleDate(shard[1]),
+            )
+            return list(self._listItems(conditional=True, **shard_params))
+
+        executor = ThreadPoolExecutor(max_workers=TTD.CONCURRENCY)
+        in_flight = deque()
+        next_day = first_day
+        seen = set()
+        try:
+            while next_day <= last_day or len(in_flight) > 0:
+                parallel = TTD.CONCURRENCY if self.shard_planner.counted() else 1
+                while next_day <= last_day and len(in_flight) < parallel:
+                    shard = self.shard_planner.nextShard(next_day, last_day)
+                    in_flight.append((shard, executor.submit(fetchShard, shard)))
+                    next_day = shard[1] + timedelta(days=1)
+                shard, future = in_flight.popleft()
+                items = future.result()
+                self.shard_planner.observe(
+                    (shard[1] - shard[0]).days + 1,
+                    len(items),
+                    max(1, -(-len(items) // params["maxResults"])),
+                )
+                for item in sorted(items, key=lambda item: item["due"]):
+                    if item["id"] not in seen:
+                        seen.add(item["id"])
+                        yield item
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _windowItems(self, task_list_id, due_max, due_min=None, **params):
+        """Yield raw task items due in (due_min, due_max] from the API.
+
+        With shard_fetch on, a window of MIN_SHARDED_DAYS or more is fetched as
+        date shards, so that its pages come back in parallel.
+        """
+        if due_min is not None and self.shard_planner is not None:
+            first_day = googleDateToDateTime(due_min).date() + timedelta(days=1)
+            last_day = googleDateToDateTime(due_max).date()
+            if (last_day - first_day).days + 1 >= MIN_SHARDED_DAYS:
+                yield from self._shardedItems(
+                    first_day, last_day, tasklist=task_list_id, **params
                 )
-                .execute()
+                return
+        window = dict(params, tasklist=task_list_id, dueMax=due_max)
+        if due_min is not None:
+            window["dueMin"] = due_min
+        yield from self._listItems(conditional=True, **window)
+
+    def _syncList(self, task_list_id, force=False):
+        # Overlap successive syncs slightly so clock skew can't drop an update
+        sync_start = dateTimeToGoogleTimestamp(datetime.utcnow() - timedelta(minutes=1))
+        last_sync = self.mirror.lastSync(task_list_id)
+        params = {
+            "tasklist": task_list_id,
+            "maxResults": 100,
+            "fields": listFields(SYNC_FIELDS),
+        }
+        full = last_sync is None or force or self.refresh
+        if full:
+            params["showCompleted"] = False
+        else:
+            params.update(
+                updatedMin=last_sync,
+                showCompleted=True,
+                showDeleted=True,
+                showHidden=True,
             )
+        # Fetched before touching the mirror, so a failed fetch leaves it intact
+        # and other lists' syncs can use it meanwhile
+        items = list(self._listItems(**params))
+        self.mirror.sync(task_list_id, items, sync_start, full=full)
+
+    @_check_valid_interface
+    def syncMirror(self, force=False):
+        """Bring the local mirror up to date, fetching only tasks updated since the last sync."""
+        if self.mirror_synced and not force:
+            return
+        self._forEachList(lambda task_list_id: self._syncList(task_list_id, force))
+        self.mirror_synced = True
+
+    @_check_valid_interface
+    def iterTasks(self, date=None, start_date=None, fields=LIST_FIELDS):
+        """Yield pending tasks in the window, from the mirror or page by page from the API.
+
+        API pages only carry the given task fields (a subset of LIST_FIELDS; the
+        mirror always has them all) and are revalidated against cached ETags. With
+        several task lists, their tasks are merged into one stream (in due order
+        from the mirror), each tagged with its list_id.
+        """
+        if date is None:
+            date = datetime.today()
+        due_max = dateTimeToGoogleDate(date + timedelta(days=1))
+        due_min = dateTimeToGoogleDate(start_date) if start_date is not None else None
+        list_ids = self.task_list_ids
+        if self.mirror is not None:
+            self.syncMirror()
+            streams = [
+                zip(repeat(list_id), self.mirror.query(list_id, due_max, due_min))
+                for list_id in list_ids
+            ]
+            items = heapq.merge(*streams, key=lambda tagged: tagged[1]["due"])
         else:
-            fmindate = dateTimeToGoogleDate(start_date)  #  - timedelta(days=1))
-            results = (
-                self.service.tasks()
-                .list(
-                    tasklist=self.task_list_id,
-                    maxResults=100,
-                    showCompleted=False,
-                    dueMin=fmindate,
-                    dueMax=fdate,
+            params = {
+                "maxResults": 100,
+                "showCompleted": False,
+                "fields": listFields(fields),
+            }
+            if len(list_ids) == 1:
+                fetched = [self._windowItems(list_ids[0], due_max, due_min, **params)]
+            else:
+                # Whole lists are fetched concurrently, then yielded one by one
+                fetched = self._forEachList(
+                    lambda list_id: list(
+                        self._windowItems(list_id, due_max, due_min, **params)
+                    )
                 )
-                .execute()
+            items = chain.from_iterable(
+                zip(repeat(list_id), list_items)
+                for list_id, list_items in zip(list_ids, fetched)
             )
-        items = results.get("items", [])
-        if not items:
-            if self.enable_logging:
-                logging.warn(f"No tasks found through {date}.")
-            return []
-        return [Task(item) for item in items]
+        found = False
+        today = datetime.today().toordinal()
+        for list_id, item in items:
+            found = True
+            if len(list_ids) > 1:
+                self.task_lists[item["id"]] = list_id
+            yield Task(item, today, list_id)
+        if not found and self.enable_logging:
+            logging.warn(f"No tasks found through {date}.")
 
-    @_check_valid_interface
-    def putTask(self, name, notes, date=None):
+    def mirrorSynced(self):
+        """Whether the mirror has been synced for every task list in use.
+
+        With "all" lists it is enough that any list has been, so telling needs no
+        API call.
+        """
+        if self._task_list_ids is None:
+            return len(self.mirror.syncedLists()) > 0
+        synced = self.mirror.syncedLists()
+        return all(list_id in synced for list_id in self._task_list_ids)
+
+    def searchTasks(
+        self,
+        query,
+        start_date=None,
+        end_date=None,
+        timings=None,
+        limit=None,
+        sync=False,
+    ):
+        """Yield tasks whose title or notes contain every word of query, in due order.
+
+        A word ending in * matches words starting with it. Tasks can be limited to
+        those due start_date..end_date and to priorities (timings 0-3). Only the
+        mirror's search index is read, so no API calls are made unless sync asks
+        for the mirror to be brought up to date first.
+        """
+        from task_tools.mirror import queryTerms
+
+        if self.mirror is None:
+            raise Exception("Searching needs the local task mirror (drop --no-mirror)")
+        if sync:
+            self.syncMirror()
+        items = self.mirror.search(
+            queryTerms(query),
+            # None when searching all lists, so resolving them needs no API call
+            self._task_list_ids,
+            dateTimeToGoogleDate(end_date) if end_date is not None else None,
+            (
+                f"{start_date.strftime('%Y-%m-%d')}T00:00:00.000Z"
+                if start_date is not None
+                else None
+            ),
+            [f"P{timing}:" for timing in timings] if timings is not None else None,
+            limit,
+        )
+        today = datetime.today().toordinal()
+        for item in items:
+            self.task_lists[item["id"]] = item["tasklist"]
+            yield Task(item, today, item["tasklist"])
+
+    def getTasks(self, date=None, start_date=None, fields=LIST_FIELDS):
+        return [task for task in self.iterTasks(date, start_date, fields)]
+
+    def _taskBody(self, name, notes, date=None):
         if date is None:
             date = datetime.today()
         fdate = f"{date.strftime('%Y-%m-%d')}T00:00:00.000Z"
-        body = {
+        if self.enable_logging:
+            logging.info(f"Creating task {name} (due {date})")
+        return {
             "status": "needsAction",
             "kind": "tasks#task",
             "title": name,
             "notes": notes,
             "due": fdate,
         }
+
+    def _moveBody(self, task_id, name, date=None):
+        if date is None:
+            date = datetime.today()
         if self.enable_logging:
-            logging.info(f"Creating task {name} (due {date})")
-        self.service.tasks().insert(tasklist=self.task_list_id, body=body).execute()
+            logging.info(f"Moving task {task_id} to {name} (due {date})")
+        return {"title": name, "due": f"{date.strftime('%Y-%m-%d')}T00:00:00.000Z"}
+
+    def _executeBatch(self, items, make_request, progress=None):
+        """Send one request per item through the batch endpoint, batch_size at a time.
+
+        If given, progress is called with the number of finished items after each batch.
+        """
+        results = []
+        chunk = []
+
+        def flush():
+            pending = dict(enumerate(chunk))
+            outcomes = {}
+            attempt = 0
+            while pending:
+                responses = {}
+
+                def callback(request_id, response, exception):
+                    responses[request_id] = (response, exception)
+
+                batch = self.service.new_batch_http_request(callback=callback)
+                for i, item in pending.items():
+                    batch.add(make_request(item), request_id=str(i))
+                # Every request in a batch counts against the quota separately
+                start = self.tracer.clock() if self.tracer is not None else None
+                limiter_wait = self.limiter.acquire(len(pending))
+                batch_error = None
+                try:
+                    batch.execute()
+                except Exception as e:
+                    # The whole batch failed to go out; attribute it to every item
+                    batch_error = e
+                    for i in pending:
+                        responses.setdefault(str(i), (None, e))
+                if self.tracer is not None:
+                    self.tracer.record(
+                        "batch",
+                        {"size": len(pending)},
+                        start,
+                        self.tracer.clock(),
+                        limiter_wait=limiter_wait,
+                        retries=attempt,
+                        response_bytes=sum(
+                            responseSize(response) for response, _ in responses.values()
+                        ),
+                        requests=len(pending),
+                        error=batch_error,
+                    )
+                throttled = []
+                for i in pending:
+                    response, exception = responses.get(str(i), (None, None))
+                    if (
+                        exception is not None
+                        and isThrottleError(exception)
+                        and attempt < self.limiter.max_retries
+                    ):
+                        throttled.append(exception)
+                        continue
+                    outcomes[i] = (response, exception)
+                pending = {i: item for i, item in pending.items() if i not in outcomes}
+                if throttled:
+                    retry_after = max(retryAfter(e) or 0.0 for e in throttled) or None
+                    self.limiter.onThrottle(retry_after)
+                    start = self.tracer.clock() if self.tracer is not None else None
+                    delay = self.limiter.backoff(attempt, retry_after)
+                    if self.tracer is not None:
+                        self.tracer.record(
+                            "batch.backoff",
+                            {"throttled": len(throttled)},
+                            start,
+                            self.tracer.clock(),
+                            limiter_wait=delay,
+                            requests=0,
+                        )
+                    attempt += 1
+                else:
+                    self.limiter.onSuccess()
+            for i, item in enumerate(chunk):
+                results.append(MutationResult(item, *outcomes[i]))
+            del chunk[:]
+            if progress is not None:
+                progress(len(results))
+
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.batch_size:
+                flush()
+        if chunk:
+            flush()
+        return results
+
+    def _mirrorResponses(self, results):
+        """Apply the task resources a bulk mutation returned to the mirror."""
+        by_list = {}
+        for result in results:
+            if result.response:
+                by_list.setdefault(self.listOf(result.response["id"]), []).append(
+                    result.response
+                )
+        for list_id, responses in by_list.items():
+            self.mirror.apply(list_id, responses)
+
+    @_check_valid_interface
+    def putTask(self, name, notes, date=None):
+        body = self._taskBody(name, notes, date)
+        response = self._execute(
+            self.service.tasks().insert(tasklist=self.task_list_id, body=body)
+        )
+        if self.mirror is not None and response:
+            self.mirror.apply(self.task_list_id, [response])
+        return response
+
+    @_check_valid_interface
+    def putTasks(self, tasks, progress=None):
+        """Insert (name, notes, date) tuples in batches; returns a MutationResult per tuple."""
+        results = self._executeBatch(
+            tasks,
+            lambda task: self.service.tasks().insert(
+                tasklist=self.task_list_id, body=self._taskBody(*task)
+            ),
+            progress,
+        )
+        if self.mirror is not None:
+            self._mirrorResponses(results)
+        return results
+
+    @_check_valid_interface
+    def patchTask(self, task_id, body):
+        """Update only the given fields of a task; returns the updated task resource."""
+        response = self._execute(
+            self.service.tasks().patch(
+                tasklist=self.listOf(task_id), task=task_id, body=body
+            )
+        )
+        if self.mirror is not None and response:
+            self.mirror.apply(self.listOf(task_id), [response])
+        return response
+
+    def moveTask(self, task_id, name, date=None):
+        """Rename a task and set its due date (today by default) in a single call."""
+        return self.patchTask(task_id, self._moveBody(task_id, name, date))
+
+    @_check_valid_interface
+    def moveTasks(self, moves, progress=None):
+        """Apply (task_id, name, date) moves in batches; returns a MutationResult per move."""
+        results = self._executeBatch(
+            moves,
+            lambda move: self.service.tasks().patch(
+                tasklist=self.listOf(move[0]),
+                task=move[0],
+                body=self._moveBody(*move),
+            ),
+            progress,
+        )
+        if self.mirror is not None:
+            self._mirrorResponses(results)
+        return results
 
     @_check_valid_interface
     def deleteTask(self, task_id):
-        self.service.tasks().delete(tasklist=self.task_list_id, task=task_id).execute()
+        response = self._execute(
+            self.service.tasks().delete(tasklist=self.listOf(task_id), task=task_id)
+        )
+        if self.mirror is not None:
+            self.mirror.remove([task_id])
+        return response
+
+    @_check_valid_interface
+    def deleteTasks(self, task_ids, progress=None):
+        """Delete task ids in batches; returns a MutationResult per id."""
+        results = self._executeBatch(
+            task_ids,
+            lambda task_id: self.service.tasks().delete(
+                tasklist=self.listOf(task_id), task=task_id
+            ),
+            progress,
+        )
+        if self.mirror is not None:
+            self.mirror.remove(
+                result.item for result in results if result.error is None
+            )
+        return results
@@ -0,0 +1,271 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Schema version of the mirror; 1 added the search index (task_terms)
+MIRROR_VERSION = 1
+TERM_PATTERN = re.compile(r"\w+")
+
+
+def searchTerms(text):
+    """Lowercased words of a title or notes, as the search index stores them."""
+    if not text:
+        return set()
+    return set(TERM_PATTERN.findall(text.lower()))
+
+
+def queryTerms(query):
+    """Search terms of a query string; a word ending in * stays a prefix term."""
+    return re.findall(r"\w+\*?", query.lower())
+
+
+class TaskMirror(object):
+    """On-disk copy of the pending tasks of one or more task lists.
+
+    Rows hold the raw Google task fields; date-window queries compare the RFC 3339
+    due strings directly, which sort chronologically. The words of each task's
+    title and notes are kept in an inverted index (task_terms), updated along
+    with the tasks, for search. The mirror may be shared between threads; every
+    statement runs under one lock.
+    """
+
+    def __init__(self, path):
+        path = os.path.expanduser(path)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                tasklist TEXT NOT NULL,
+                title TEXT NOT NULL,
+                notes TEXT,
+                due TEXT,
+                updated TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tasks_by_due ON tasks (tasklist, due);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                tasklist TEXT PRIMARY KEY,
+                synced_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS task_terms (
+                term TEXT NOT NULL,
+                id TEXT NOT NULL,
+                PRIMARY KEY (term, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS task_terms_by_id ON task_terms (id);
+            """)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < MIRROR_VERSION:
+            # Index the tasks mirrored before there was an index
+            with self.conn:
+                for task_id, title, notes in self.conn.execute(
+                    "SELECT id, title, notes FROM tasks"
+                ).fetchall():
+                    self._index(task_id, title, notes)
+                self.conn.execute(f"PRAGMA user_version = {MIRROR_VERSION}")
+
+    def _index(self, task_id, title, notes):
+        self.conn.execute("DELETE FROM task_terms WHERE id = ?", (task_id,))
+        self.conn.executemany(
+            "INSERT INTO task_terms (term, id) VALUES (?, ?)",
+            ((term, task_id) for term in searchTerms(title) | searchTerms(notes)),
+        )
+
+    def lastSync(self, tasklist):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT synced_at FROM sync_state WHERE tasklist = ?", (tasklist,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def syncedLists(self):
+        """Task lists that have been synced at least once."""
+        with self.lock:
+            return set(
+                row[0] for row in self.conn.execute("SELECT tasklist FROM sync_state")
+            )
+
+    def apply(self, tasklist, items):
+        """Upsert pending items and drop deleted, hidden or completed ones."""
+        with self.lock, self.conn:
+            self._apply(tasklist, items)
+
+    def sync(self, tasklist, items, synced_at, full=False):
+        """Apply a sync's items and mark the list synced in one transaction.
+
+        A full sync replaces the list's tasks, so readers never see it half-empty.
+        """
+        with self.lock, self.conn:
+            if full:
+                self._clear(tasklist)
+            self._apply(tasklist, items)
+            self._markSynced(tasklist, synced_at)
+
+    def _markSynced(self, tasklist, synced_at):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state (tasklist, synced_at) VALUES (?, ?)",
+            (tasklist, synced_at),
+        )
+
+    def _clear(self, tasklist):
+        self.conn.execute(
+            "DELETE FROM task_terms WHERE id IN "
+            "(SELECT id FROM tasks WHERE tasklist = ?)",
+            (tasklist,),
+        )
+        self.conn.execute("DELETE FROM tasks WHERE tasklist = ?", (tasklist,))
+        self.conn.execute("DELETE FROM sync_state WHERE tasklist = ?", (tasklist,))
+
+    def _apply(self, tasklist, items):
+        for item in items:
+            if (
+                item.get("deleted")
+                or item.get("hidden")
+                or item.get("status") == "completed"
+            ):
+                self.conn.execute("DELETE FROM tasks WHERE id = ?", (item["id"],))
+                self.conn.execute("DELETE FROM task_terms WHERE id = ?", (item["id"],))
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO tasks "
+                    "(id, tasklist, title, notes, due, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        item["id"],
+                        tasklist,
+                        item.get("title", ""),
+                        item.get("notes"),
+                        item.get("due"),
+                        item.get("updated"),
+                    ),
+                )
+                self._index(item["id"], item.get("title", ""), item.get("notes"))
+
+    def remove(self, task_ids):
+        task_ids = [(task_id,) for task_id in task_ids]
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", task_ids)
+            self.conn.executemany("DELETE FROM task_terms WHERE id = ?", task_ids)
+
+    def query(self, tasklist, due_max, due_min=None):
+        """Yield raw task dicts with due_min <= due <= due_max, in due order."""
+        sql = "SELECT id, title, notes, due FROM tasks WHERE tasklist = ? AND due <= ?"
+        args = [tasklist, due_max]
+        if due_min is not None:
+            sql += " AND due >= ?"
+            args.append(due_min)
+        sql += " ORDER BY due, id"
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, args)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for task_id, title, notes, due in rows:
+                item = {"id": task_id, "title": title, "due": due}
+                if notes is not None:
+                    item["notes"] = notes
+                yield item
+
+    def search(
+        self,
+        terms,
+        tasklists=None,
+        due_max=None,
+        due_min=None,
+        prefixes=None,
+        limit=None,
+    ):
+        """Raw task dicts (plus tasklist) with every term in their title or notes.
+
+        A term ending in * matches words starting with it. Results can be limited
+        to some task lists, a due window and titles starting with one of prefixes;
+        they come in due order.
+        """
+        sql = "SELECT id, tasklist, title, notes, due FROM tasks WHERE due IS NOT NULL"
+        args = []
+        for term in terms:
+            term = term.lower()
+            if term.endswith("*") and len(term) > 1:
+                stem = term[:-1]
+                sql += " AND id IN (SELECT id FROM task_terms WHERE term >= ? AND term < ?)"
+                args.extend([stem, stem[:-1] + chr(ord(stem[-1]) + 1)])
+            else:
+                sql += " AND id IN (SELECT id FROM task_terms WHERE term = ?)"
+                args.append(term.rstrip("*"))
+        for column, values in (
+            ("tasklist", tasklists),
+            ("substr(title, 1, 3)", prefixes),
+        ):
+            if values is not None:
+                sql += f" AND {column} IN ({', '.join('?' for _ in values)})"
+                args.extend(values)
+        if due_max is not None:
+            sql += " AND due <= ?"
+            args.append(due_max)
+        if due_min is not None:
+            sql += " AND due >= ?"
+            args.append(due_min)
+        sql += " ORDER BY due, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self.lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        items = []
+        for task_id, tasklist, title, notes, due in rows:
+            item = {"id": task_id, "tasklist": tasklist, "title": title, "due": due}
+            if notes is not None:
+                item["notes"] = notes
+            items.append(item)
+        return items
+
+
+class PageCache(object):
+    """On-disk store of API responses and their ETags, for conditional requests.
+
+    Keys identify a request (method and parameters); a response that comes back
+    304 Not Modified is answered from here.
+    """
+
+    def __init__(self, path, max_age=7 * 24 * 3600):
+        path = os.path.expanduser(path)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                etag TEXT NOT NULL,
+                body TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            );
+            """)
+        # Keys embed the date window, so entries go stale within days
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM pages WHERE stored_at < ?", (time.time() - max_age,)
+            )
+
+    def get(self, key):
+        """Return (etag, response) cached for the key, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, body FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row is not None else None
+
+    def put(self, key, etag, response):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (key, etag, body, stored_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, etag, json.dumps(response), time.time()),
+            )
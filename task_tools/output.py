@@ -0,0 +1,95 @@
+import json
+
+import click
+
+OUTPUT_FORMATS = ("text", "ndjson", "json", "tsv")
+
+# Field names of the records each command emits; keep them stable for consumers
+TASK_FIELDS = (
+    "id",
+    "name",
+    "timing",
+    "autogen",
+    "created",
+    "due",
+    "days_late",
+    "days_score",
+    "notes",
+    "list_id",
+)
+PLAN_FIELDS = (
+    "kind",
+    "task_id",
+    "name",
+    "due",
+    "days_late",
+    "new_name",
+    "new_date",
+    "applied",
+    "error",
+    "list_id",
+)
+SPEC_FIELDS = ("date", "name", "notes", "applied", "error")
+REPORT_FIELDS = (
+    "week",
+    "priority",
+    "tasks",
+    "completion_rate",
+    "late",
+    "failed",
+    "avg_days_late",
+    "late_1",
+    "late_2_3",
+    "late_4_7",
+    "late_8_plus",
+    "failure_streak",
+)
+
+TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _tsvValue(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).translate(TSV_ESCAPES)
+
+
+class RecordWriter(object):
+    """Writes records to stdout one at a time as NDJSON, a JSON array or TSV.
+
+    Each record is a dict with the given fields; nothing is buffered, so large
+    outputs stream. Use as a context manager so a JSON array gets closed.
+    """
+
+    def __init__(self, output_format, fields):
+        if output_format not in OUTPUT_FORMATS[1:]:
+            raise ValueError(f"unsupported output format ({output_format})")
+        self.output_format = output_format
+        self.fields = fields
+        self.count = 0
+
+    def write(self, record):
+        if self.output_format == "tsv":
+            if self.count == 0:
+                click.echo("\t".join(self.fields))
+            click.echo("\t".join(_tsvValue(record.get(key)) for key in self.fields))
+        else:
+            line = json.dumps({key: record.get(key) for key in self.fields})
+            if self.output_format == "json":
+                line = ("[" if self.count == 0 else ",") + line
+            click.echo(line)
+        self.count += 1
+
+    def close(self):
+        if self.output_format == "json":
+            click.echo("]" if self.count > 0 else "[]")
+        elif self.output_format == "tsv" and self.count == 0:
+            click.echo("\t".join(self.fields))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
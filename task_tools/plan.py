@@ -0,0 +1,163 @@
+import json
+from collections import namedtuple
+from datetime import date, datetime
+
+PLAN_VERSION = 1
+
+# Action kinds, in the order grader / clean render them
+PENDING = "pending"  # P0 / P3 task that isn't late yet
+LATE = "late"  # late task that is only reported
+MIGRATE = "migrate"  # late manual P0 task, carried over to the day the plan runs
+MIGRATE_P1 = "migrate_p1"  # P1 task, rescheduled as P0 for next Sunday
+MIGRATE_P2 = "migrate_p2"  # P2 task, rescheduled as P0 for next month's first Sunday
+FAIL = "fail"  # late autogenerated task, deleted
+ACTION_KINDS = (PENDING, LATE, MIGRATE, MIGRATE_P1, MIGRATE_P2, FAIL)
+
+# One classified task. label is the rendered task line and due the graded due
+# date; new_name / new_date are only set for migrations (new_date None = today).
+# list_id is the task list the task came from (None in plans from before lists).
+PlanAction = namedtuple(
+    "PlanAction",
+    [
+        "kind",
+        "task_id",
+        "name",
+        "label",
+        "due",
+        "days_late",
+        "new_name",
+        "new_date",
+        "list_id",
+    ],
+    defaults=(None,),
+)
+
+
+def classifyTasks(
+    tasks, next_sunday, first_sunday_next_month, command=None, task_list_id=None
+):
+    """Sort timed tasks into a TaskPlan in a single pass over them."""
+    actions = []
+    for task in tasks:
+        if task.timing < 0:
+            continue
+        new_name = None
+        new_date = None
+        if task.timing == 2:
+            kind = MIGRATE_P2
+            new_name = task.name.replace("P2", "P0").replace("p2", "P0")
+            new_date = first_sunday_next_month
+        elif task.timing == 1:
+            kind = MIGRATE_P1
+            new_name = task.name.replace("P1", "P0").replace("p1", "P0")
+            new_date = next_sunday
+        elif task.days_late == 0:
+            kind = PENDING
+        elif task.autogen:
+            kind = FAIL
+        elif task.timing == 0:
+            kind = MIGRATE
+            new_name = task.name
+        else:
+            kind = LATE
+        actions.append(
+            PlanAction(
+                kind,
+                task.id,
+                task.name,
+                task.toString(False),
+                task.due,
+                task.days_late,
+                new_name,
+                new_date,
+                task.list_id,
+            )
+        )
+    return TaskPlan(actions, command, task_list_id)
+
+
+class TaskPlan(object):
+    """The actions grader / clean take on a window of tasks, in fetch order.
+
+    command names the command (grader / clean) whose output the plan renders
+    like. A plan can be written to JSON and read back to run it later without
+    fetching the tasks again.
+    """
+
+    def __init__(self, actions, command=None, task_list_id=None, created=None):
+        self.actions = actions
+        self.command = command
+        self.task_list_id = task_list_id
+        self.created = created if created is not None else datetime.now()
+
+    def byKind(self, *kinds):
+        return [action for action in self.actions if action.kind in kinds]
+
+    def mostLate(self, *kinds):
+        return sorted(self.byKind(*kinds), key=lambda action: -action.days_late)
+
+    def gradeRows(self):
+        """(task id, due, name, days late, failed) grades of the P0 / P3 tasks."""
+        return [
+            (
+                action.task_id,
+                action.due,
+                action.name,
+                action.days_late,
+                action.kind == FAIL,
+            )
+            for action in self.actions
+            if action.kind not in (MIGRATE_P1, MIGRATE_P2)
+        ]
+
+    @staticmethod
+    def moves(actions):
+        return [
+            (action.task_id, action.new_name, action.new_date) for action in actions
+        ]
+
+    def toDict(self):
+        return {
+            "version": PLAN_VERSION,
+            "created": self.created.isoformat(timespec="seconds"),
+            "command": self.command,
+            "task_list_id": self.task_list_id,
+            "actions": [
+                dict(
+                    action._asdict(),
+                    new_date=(
+                        action.new_date.isoformat()
+                        if action.new_date is not None
+                        else None
+                    ),
+                )
+                for action in self.actions
+            ],
+        }
+
+    @staticmethod
+    def fromDict(data):
+        if data.get("version") != PLAN_VERSION:
+            raise ValueError(f"unsupported plan version ({data.get('version')})")
+        actions = []
+        for item in data["actions"]:
+            if item["kind"] not in ACTION_KINDS:
+                raise ValueError(f"unknown plan action ({item['kind']})")
+            if item["new_date"] is not None:
+                item = dict(item, new_date=date.fromisoformat(item["new_date"]))
+            actions.append(PlanAction(**item))
+        return TaskPlan(
+            actions,
+            data.get("command"),
+            data.get("task_list_id"),
+            datetime.fromisoformat(data["created"]),
+        )
+
+    def write(self, path):
+        with open(path, "w") as planfile:
+            json.dump(self.toDict(), planfile, indent=2)
+
+    @staticmethod
+    def read(path):
+        with open(path, "r") as planfile:
+            return TaskPlan.fromDict(json.load(planfile))
@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+
+THROTTLE_STATUSES = (429,)
+THROTTLE_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+
+def httpStatus(error):
+    """Return the HTTP status of an API error (googleapiclient HttpError or lookalike)."""
+    return getattr(getattr(error, "resp", None), "status", None)
+
+
+def isThrottleError(error):
+    status = httpStatus(error)
+    if status in THROTTLE_STATUSES:
+        return True
+    if status == 403:
+        content = getattr(error, "content", b"") or b""
+        if isinstance(content, bytes):
+            content = content.decode("utf-8", "replace")
+        return any(reason in content for reason in THROTTLE_REASONS)
+    return False
+
+
+def retryAfter(error):
+    """Seconds the server asked us to wait, if it sent a numeric Retry-After header."""
+    resp = getattr(error, "resp", None)
+    if resp is None or not hasattr(resp, "get"):
+        return None
+    try:
+        return max(float(resp.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucketLimiter(object):
+    """Thread-safe token bucket whose refill rate adapts to server throttling (AIMD).
+
+    Each success adds `increase` req/s up to max_rate; each throttling response
+    multiplies the rate by `decrease` down to min_rate. Throttled requests are
+    retried with jittered exponential backoff, waiting at least as long as the
+    server's Retry-After.
+    """
+
+    def __init__(
+        self,
+        rate=1.0,
+        burst=1,
+        max_rate=None,
+        min_rate=0.1,
+        increase=0.05,
+        decrease=0.5,
+        max_retries=5,
+        backoff_base=1.0,
+        backoff_max=64.0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self.max_rate = float(max_rate) if max_rate is not None else self.rate
+        self.min_rate = min(float(min_rate), self.rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self.last_refill = clock()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.last_refill) * self.rate
+        )
+        self.last_refill = now
+
+    def acquire(self, tokens=1):
+        """Take tokens from the bucket, sleeping until they are available; returns the wait."""
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            # Let the bucket go into debt so requests larger than the burst still pass
+            self.tokens -= tokens
+            wait = max(-self.tokens / self.rate, self.blocked_until - now, 0.0)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def onSuccess(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def onThrottle(self, retry_after=None):
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def backoff(self, attempt, retry_after=None):
+        """Sleep for the jittered exponential backoff of the given retry attempt."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        self.sleep(delay)
+        return delay
+
+    def execute(self, request, tokens=1, stats=None, **kwargs):
+        """Execute an API request under the limiter, retrying throttled attempts.
+
+        If a stats dict is given, it receives the number of retries and the seconds
+        spent waiting on the bucket and on backoff.
+        """
+        attempt = 0
+        wait = 0.0
+        try:
+            while True:
+                wait += self.acquire(tokens)
+                try:
+                    response = request.execute(**kwargs)
+                except Exception as e:
+                    if not isThrottleError(e) or attempt >= self.max_retries:
+                        raise
+                    self.onThrottle(retryAfter(e))
+                    wait += self.backoff(attempt, retryAfter(e))
+                    attempt += 1
+                    continue
+                self.onSuccess()
+                return response
+        finally:
+            if stats is not None:
+                stats["retries"] = attempt
+                stats["limiter_wait"] = wait
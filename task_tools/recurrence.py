@@ -0,0 +1,199 @@
+import calendar
+from datetime import date
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+# INTERVAL counts days / weeks / months / years from here unless DTSTART is given
+DEFAULT_ANCHOR = date(1, 1, 1)
+
+# The original put_spec codes, as rules
+LEGACY_RULES = {
+    "d": "FREQ=DAILY",
+    "w": "FREQ=WEEKLY;BYDAY=SU",
+    "m": "FREQ=MONTHLY;BYDAY=1SU",
+    "q": "FREQ=MONTHLY;INTERVAL=3;BYDAY=1SU",
+}
+
+
+def _parseWeekday(text):
+    """Parse an RRULE BYDAY entry (SU, 2TU, -1FR) into (nth or None, weekday)."""
+    text = text.strip().upper()
+    if text[-2:] not in WEEKDAYS:
+        raise ValueError(f"unknown weekday ({text})")
+    nth = None
+    if len(text) > 2:
+        nth = int(text[:-2])
+        if nth == 0 or abs(nth) > 53:
+            raise ValueError(f"weekday position out of range ({text})")
+    return nth, WEEKDAYS.index(text[-2:])
+
+
+def _parseInts(text, high):
+    """Parse comma-separated nonzero ints within +-high (negative counts from the end)."""
+    values = []
+    for part in text.split(","):
+        value = int(part)
+        if value == 0 or abs(value) > high:
+            raise ValueError(f"value out of range ({part})")
+        values.append(value)
+    return values
+
+
+class Recurrence(object):
+    """A recurrence rule in a subset of iCalendar RRULE syntax.
+
+    FREQ=DAILY|WEEKLY|MONTHLY|YEARLY, with INTERVAL=N (every Nth period, counted
+    from DTSTART=YYYYMMDD), BYDAY=MO,WE for weekdays (with MONTHLY / YEARLY also
+    2TU for the second Tuesday or -1FR for the last Friday), BYMONTHDAY=1,-1 and
+    BYMONTH=1,7. YEARLY picks days within BYMONTH; without it, BYDAY spans the
+    whole year (20MO is the year's 20th Monday) and BYMONTHDAY the DTSTART
+    month. Without BYDAY / BYMONTHDAY MONTHLY and YEARLY recur on DTSTART's day
+    of the month. Nothing recurs before DTSTART. The put_spec codes d / w / m / q
+    are accepted too.
+
+    Occurrences over a window are computed arithmetically, period by period,
+    without visiting every day of it.
+    """
+
+    def __init__(self, text):
+        self.text = text.strip()
+        rule = LEGACY_RULES.get(self.text.lower(), self.text)
+        parts = {}
+        for part in rule.split(";"):
+            if "=" not in part:
+                raise ValueError(f"malformed rule part ({part})")
+            key, value = part.split("=", 1)
+            parts[key.strip().upper()] = value.strip()
+        self.freq = parts.pop("FREQ", "").upper()
+        if self.freq not in FREQUENCIES:
+            raise ValueError(f"unsupported FREQ ({self.freq or 'missing'})")
+        self.interval = int(parts.pop("INTERVAL", "1"))
+        if self.interval < 1:
+            raise ValueError(f"INTERVAL must be positive ({self.interval})")
+        anchor = parts.pop("DTSTART", None)
+        self.anchor = (
+            date(int(anchor[:4]), int(anchor[4:6]), int(anchor[6:8]))
+            if anchor is not None
+            else DEFAULT_ANCHOR
+        )
+        self.by_day = [
+            _parseWeekday(day) for day in parts.pop("BYDAY", "").split(",") if day
+        ]
+        self.by_month_day = (
+            _parseInts(parts.pop("BYMONTHDAY"), 31) if "BYMONTHDAY" in parts else []
+        )
+        self.by_month = (
+            _parseInts(parts.pop("BYMONTH"), 12) if "BYMONTH" in parts else []
+        )
+        if len(parts) > 0:
+            raise ValueError(f"unsupported rule parts ({', '.join(sorted(parts))})")
+        if self.freq in ("DAILY", "WEEKLY") and any(
+            nth is not None for nth, _ in self.by_day
+        ):
+            raise ValueError("numbered weekdays need FREQ=MONTHLY or YEARLY")
+        if any(month < 0 for month in self.by_month):
+            raise ValueError("BYMONTH must be positive")
+        if self.freq == "YEARLY" and not self.by_month:
+            if self.by_day and self.by_month_day:
+                raise ValueError("YEARLY BYDAY with BYMONTHDAY needs BYMONTH")
+        elif any(nth is not None and abs(nth) > 5 for nth, _ in self.by_day):
+            raise ValueError("weekday position out of range within a month")
+
+    def _spanDays(self, first, length):
+        """The BYDAY days among length days from first, nth counted within them."""
+        days = set()
+        for nth, weekday in self.by_day:
+            offsets = range((weekday - first.weekday()) % 7, length, 7)
+            if nth is not None:
+                if nth > len(offsets) or -nth > len(offsets):
+                    continue
+                offsets = [offsets[nth - 1 if nth > 0 else nth]]
+            days.update(
+                date.fromordinal(first.toordinal() + offset) for offset in offsets
+            )
+        return days
+
+    def _monthDays(self, year, month):
+        """Days of a month selected by BYMONTHDAY / BYDAY (the anchor's day if neither)."""
+        length = calendar.monthrange(year, month)[1]
+        days = set()
+        for month_day in self.by_month_day:
+            day = month_day if month_day > 0 else length + month_day + 1
+            if 1 <= day <= length:
+                days.add(date(year, month, day))
+        days.update(self._spanDays(date(year, month, 1), length))
+        if not self.by_month_day and not self.by_day and self.anchor.day <= length:
+            days.add(date(year, month, self.anchor.day))
+        return days
+
+    def dates(self, start_date, end_date):
+        """The set of dates in [start_date, end_date] the rule recurs on."""
+        # DTSTART is the rule's first possible occurrence
+        start_date = max(start_date, self.anchor)
+        if end_date < start_date:
+            return set()
+        if self.freq == "DAILY":
+            first = start_date.toordinal()
+            first += (self.anchor.toordinal() - first) % self.interval
+            return set(
+                date.fromordinal(day)
+                for day in range(first, end_date.toordinal() + 1, self.interval)
+            )
+        if self.freq == "WEEKLY":
+            weekdays = [weekday for _, weekday in self.by_day] or [
+                self.anchor.weekday()
+            ]
+            anchor_monday = self.anchor.toordinal() - self.anchor.weekday()
+            dates = set()
+            for weekday in weekdays:
+                first = start_date.toordinal()
+                first += (weekday - start_date.weekday()) % 7
+                # Step to the first week the interval selects
+                weeks = (first - anchor_monday) // 7
+                first += 7 * ((-weeks) % self.interval)
+                dates.update(
+                    date.fromordinal(day)
+                    for day in range(first, end_date.toordinal() + 1, 7 * self.interval)
+                )
+            return dates
+        dates = set()
+        if self.freq == "YEARLY" and not self.by_month and self.by_day:
+            first_year = start_date.year
+            first_year += (self.anchor.year - first_year) % self.interval
+            for year in range(first_year, end_date.year + 1, self.interval):
+                dates.update(
+                    day
+                    for day in self._spanDays(
+                        date(year, 1, 1), 366 if calendar.isleap(year) else 365
+                    )
+                    if start_date <= day <= end_date
+                )
+            return dates
+        if self.freq == "MONTHLY":
+            anchor_month = self.anchor.year * 12 + self.anchor.month - 1
+            first_month = start_date.year * 12 + start_date.month - 1
+            first_month += (anchor_month - first_month) % self.interval
+            months = range(
+                first_month, end_date.year * 12 + end_date.month, self.interval
+            )
+            months = (
+                (month // 12, month % 12 + 1)
+                for month in months
+                if not self.by_month or month % 12 + 1 in self.by_month
+            )
+        else:
+            first_year = start_date.year
+            first_year += (self.anchor.year - first_year) % self.interval
+            by_month = self.by_month or [self.anchor.month]
+            months = (
+                (year, month)
+                for year in range(first_year, end_date.year + 1, self.interval)
+                for month in by_month
+            )
+        for year, month in months:
+            dates.update(
+                day
+                for day in self._monthDays(year, month)
+                if start_date <= day <= end_date
+            )
+        return dates
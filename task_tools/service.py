@@ -0,0 +1,159 @@
+import contextlib
+import fcntl
+import json
+import os
+from datetime import datetime
+
+# Refresh a cached access token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+
+class ServiceError(Exception):
+    """The Tasks service couldn't be built; the underlying error is chained."""
+
+
+def _setupErrors():
+    """Exception types meaning bad secrets, missing libraries or no connectivity."""
+    errors = (OSError, ValueError, KeyError, ImportError)
+    try:
+        from google.auth.exceptions import GoogleAuthError
+        from googleapiclient.errors import Error as ApiClientError
+        from httplib2 import HttpLib2Error
+    except ImportError:
+        return errors
+    return errors + (GoogleAuthError, ApiClientError, HttpLib2Error)
+
+
+@contextlib.contextmanager
+def _fileLock(path):
+    """Hold an exclusive lock on path + ".lock" (blocking) for the duration."""
+    with open(f"{path}.lock", "a") as lockfile:
+        fcntl.flock(lockfile, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lockfile, fcntl.LOCK_UN)
+
+
+def _readTokenCache(token_cache, source):
+    """Credentials from the cache, or None if it's missing, foreign or near expiry."""
+    from google.oauth2.credentials import Credentials
+
+    try:
+        with open(token_cache, "r") as cachefile:
+            cached = json.load(cachefile)
+        expiry = datetime.fromisoformat(cached["expiry"])
+        if cached["source"] != source:
+            return None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if (expiry - datetime.utcnow()).total_seconds() < TOKEN_REFRESH_MARGIN:
+        return None
+    return Credentials(
+        cached["token"],
+        refresh_token=cached.get("refresh_token"),
+        token_uri=cached.get("token_uri"),
+        client_id=cached.get("client_id"),
+        client_secret=cached.get("client_secret"),
+        scopes=cached.get("scopes"),
+        expiry=expiry,
+    )
+
+
+def _writeTokenCache(token_cache, source, credentials):
+    cached = {
+        "source": source,
+        "token": credentials.token,
+        "expiry": credentials.expiry.isoformat(),
+        "refresh_token": getattr(credentials, "refresh_token", None),
+        "token_uri": getattr(credentials, "token_uri", None),
+        "client_id": getattr(credentials, "client_id", None),
+        "client_secret": getattr(credentials, "client_secret", None),
+        "scopes": list(getattr(credentials, "scopes", None) or []) or None,
+    }
+    # The cache holds secrets; create it readable by the owner only
+    partial = f"{token_cache}.{os.getpid()}.tmp"
+    with os.fdopen(
+        os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w"
+    ) as cachefile:
+        json.dump(cached, cachefile)
+    os.replace(partial, token_cache)
+
+
+def loadCredentials(task_secrets_file, task_refresh_token, token_cache=None):
+    """Google credentials, reusing a cached access token until it's near expiry.
+
+    Concurrent processes serialize on a lock file next to token_cache, so only
+    one of them refreshes an expiring token and the rest read the new one.
+    """
+    if not os.path.isfile(os.path.expanduser(task_secrets_file)):
+        raise FileNotFoundError(f"no secrets file at {task_secrets_file}")
+    from easy_google_auth.auth import getGoogleCreds
+
+    if token_cache is None:
+        return getGoogleCreds(task_secrets_file, task_refresh_token, headless=True)
+    token_cache = os.path.expanduser(token_cache)
+    if os.path.dirname(token_cache):
+        os.makedirs(os.path.dirname(token_cache), exist_ok=True)
+    source = [
+        os.path.abspath(os.path.expanduser(task_secrets_file)),
+        os.path.abspath(os.path.expanduser(task_refresh_token)),
+    ]
+    with _fileLock(token_cache):
+        credentials = _readTokenCache(token_cache, source)
+        if credentials is not None:
+            return credentials
+        credentials = getGoogleCreds(
+            task_secrets_file, task_refresh_token, headless=True
+        )
+        if credentials.token is None or credentials.expiry is None:
+            import google_auth_httplib2
+            import httplib2
+
+            credentials.refresh(google_auth_httplib2.Request(httplib2.Http()))
+        if credentials.expiry is not None:
+            _writeTokenCache(token_cache, source, credentials)
+        return credentials
+
+
+def buildTasksService(
+    task_secrets_file, task_refresh_token, discovery_cache=None, token_cache=None
+):
+    """Authenticate and build the Google Tasks v1 service.
+
+    The Google client libraries are imported here rather than at module level so
+    that commands which never reach the API don't pay for them. If discovery_cache
+    is given, the discovery document is read from (or saved to) that file instead
+    of being downloaded on every run; likewise token_cache for the access token.
+    Raises ServiceError for failures to authenticate or reach the API; anything
+    else (a programming error) propagates as is.
+    """
+    try:
+        return _buildTasksService(
+            task_secrets_file, task_refresh_token, discovery_cache, token_cache
+        )
+    except _setupErrors() as e:
+        raise ServiceError(f"{type(e).__name__}: {e}") from e
+
+
+def _buildTasksService(
+    task_secrets_file, task_refresh_token, discovery_cache, token_cache
+):
+    from googleapiclient.discovery import build, build_from_document
+
+    credentials = loadCredentials(task_secrets_file, task_refresh_token, token_cache)
+    if discovery_cache is None:
+        return build("tasks", "v1", credentials=credentials, cache_discovery=False)
+    discovery_cache = os.path.expanduser(discovery_cache)
+    try:
+        with open(discovery_cache, "r") as cachefile:
+            return build_from_document(json.load(cachefile), credentials=credentials)
+    except (OSError, ValueError):
+        # Missing or unreadable cache; download the document and rewrite it
+        pass
+    service = build("tasks", "v1", credentials=credentials, cache_discovery=False)
+    if os.path.dirname(discovery_cache):
+        os.makedirs(os.path.dirname(discovery_cache), exist_ok=True)
+    with open(discovery_cache, "w") as cachefile:
+        json.dump(service._rootDesc, cachefile)
+    return service
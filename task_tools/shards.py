@@ -0,0 +1,76 @@
+import threading
+from datetime import date
+
+# Shard lengths in days; powers of two, so a window's shards line up the same
+# way from one run to the next and their pages stay revalidatable by ETag
+SHARD_DAYS = (4, 8, 16, 32, 64, 128, 256)
+# Windows shorter than this are fetched as one listing
+MIN_SHARDED_DAYS = 64
+
+
+def shardEnd(first_day, last_day, shard_days):
+    """Last day of the shard of the window first_day..last_day that starts first_day.
+
+    Shards end on multiples of shard_days counted from day 1, so of a window's
+    shards only the first and last are clipped.
+    """
+    end = (first_day.toordinal() // shard_days + 1) * shard_days - 1
+    return min(date.fromordinal(end), last_day)
+
+
+class ShardPlanner(object):
+    """Sizes the date shards of a window fetch from the page counts seen so far.
+
+    Shards aim at target_pages pages each: long enough that the per-request
+    overhead doesn't dominate, short enough that a window splits into shards
+    that can be fetched in parallel. Until tasks have been counted, shards are
+    initial_days long.
+    """
+
+    def __init__(self, page_size=100, target_pages=8, initial_days=8):
+        self.page_size = page_size
+        self.target_pages = target_pages
+        self.initial_days = initial_days
+        self.days = 0
+        self.tasks = 0
+        self.pages = 0
+        self.lock = threading.Lock()
+
+    def observe(self, days, tasks, pages):
+        """Record that a shard of this many days held this many tasks and pages."""
+        with self.lock:
+            self.days += days
+            self.tasks += tasks
+            self.pages += pages
+
+    def counted(self):
+        """Whether any shard has been observed yet."""
+        with self.lock:
+            return self.days > 0
+
+    def _tasksPerDay(self):
+        with self.lock:
+            # Sized by the tasks counted rather than the pages, which round up
+            return self.tasks / self.days if self.days > 0 else None
+
+    def shardDays(self):
+        tasks_per_day = self._tasksPerDay()
+        if tasks_per_day is None:
+            return self.initial_days
+        budget = self.target_pages * self.page_size
+        fitting = [days for days in SHARD_DAYS if days * tasks_per_day <= budget]
+        return fitting[-1] if len(fitting) > 0 else SHARD_DAYS[0]
+
+    def nextShard(self, first_day, last_day):
+        """(first_day, last day) of the next shard to fetch of the window.
+
+        The rest of the window is one shard if its tasks should fit on one page.
+        """
+        tasks_per_day = self._tasksPerDay()
+        remaining_days = (last_day - first_day).days + 1
+        if (
+            tasks_per_day is not None
+            and remaining_days * tasks_per_day < self.page_size
+        ):
+            return first_day, last_day
+        return first_day, shardEnd(first_day, last_day, self.shardDays())
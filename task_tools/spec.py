@@ -0,0 +1,60 @@
+import os
+
+from task_tools.recurrence import Recurrence
+
+SPEC_TYPES = ("d", "w", "m", "q")
+
+
+def readSpecFile(spec_csv):
+    """Parse a pipe-delimited spec file into {rule: [(title, description), ...]}.
+
+    A rule is one of the types d / w / m / q or an RRULE-like expression such as
+    FREQ=MONTHLY;BYDAY=-1FR (see Recurrence); lines with anything else in the first
+    column are skipped. Raises ValueError for an expression that doesn't parse.
+    """
+    specs = {spec_type: [] for spec_type in SPEC_TYPES}
+    with open(os.path.expanduser(spec_csv), "r") as csvfile:
+        for specline in csvfile:
+            speclist = specline.split("|")
+            if len(speclist) > 1:
+                rtype = speclist[0].strip()
+                if rtype.lower() in SPEC_TYPES:
+                    rtype = rtype.lower()
+                elif "=" in rtype:
+                    Recurrence(rtype)
+                else:
+                    continue
+                specs.setdefault(rtype, []).append((speclist[1], speclist[2]))
+    return specs
+
+
+def recurrenceDates(start_date, end_date, rules=SPEC_TYPES):
+    """Map each rule to the set of dates in [start_date, end_date] it recurs on.
+
+    d: every day; w: every Sunday; m: the first Sunday of each month;
+    q: the first Sunday of each quarter.
+    """
+    return {rule: Recurrence(rule).dates(start_date, end_date) for rule in rules}
+
+
+def planSpecInserts(specs, start_date, end_date, existing):
+    """Return the (date, title, description) inserts missing from existing, in date order.
+
+    existing is a set of (date, title) pairs for the tasks already on the calendar.
+    Tasks due the same day come in the order of their rules in specs.
+    """
+    plan = []
+    dates = recurrenceDates(
+        start_date, end_date, [rule for rule, rule_specs in specs.items() if rule_specs]
+    )
+    for rank, (rule, rule_specs) in enumerate(specs.items()):
+        for day in dates.get(rule, ()):
+            for task_title, task_description in rule_specs:
+                if (day, task_title) not in existing:
+                    plan.append((day, rank, task_title, task_description))
+    # Stable, so a rule's tasks keep their order within each day
+    plan.sort(key=lambda insert: (insert[0], insert[1]))
+    return [
+        (day, task_title, task_description)
+        for day, _, task_title, task_description in plan
+    ]
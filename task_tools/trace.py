@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+from urllib.parse import parse_qsl, urlparse
+
+
+def requestMethod(request):
+    return getattr(request, "methodId", None) or type(request).__name__
+
+
+def requestParams(request):
+    """Query parameters of an API request, without the body."""
+    params = getattr(request, "params", None)
+    if params is not None:
+        return {key: value for key, value in params.items() if key != "body"}
+    uri = getattr(request, "uri", None)
+    if uri is None:
+        return {}
+    return dict(parse_qsl(urlparse(uri).query))
+
+
+def responseSize(response):
+    if response is None:
+        return 0
+    if isinstance(response, (bytes, str)):
+        return len(response)
+    return len(json.dumps(response))
+
+
+class ApiTracer(object):
+    """Records one span per API call: latency, limiter wait, retries and response size."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.start = clock()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def record(
+        self,
+        method,
+        params,
+        start,
+        end,
+        limiter_wait=0.0,
+        retries=0,
+        response_bytes=0,
+        requests=1,
+        error=None,
+    ):
+        span = {
+            "method": method,
+            "params": params,
+            "start": start - self.start,
+            "duration": end - start,
+            "limiter_wait": limiter_wait,
+            "retries": retries,
+            "response_bytes": response_bytes,
+            "requests": requests,
+            "error": str(error) if error is not None else None,
+            "thread": threading.get_ident(),
+        }
+        with self.lock:
+            self.spans.append(span)
+
+    def summary(self):
+        """Aggregate the spans per method, slowest total first."""
+        methods = {}
+        for span in self.spans:
+            row = methods.setdefault(
+                span["method"],
+                {
+                    "method": span["method"],
+                    "calls": 0,
+                    "requests": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "total": 0.0,
+                    "limiter_wait": 0.0,
+                    "max": 0.0,
+                    "response_bytes": 0,
+                },
+            )
+            row["calls"] += 1
+            row["requests"] += span["requests"]
+            row["errors"] += span["error"] is not None
+            row["retries"] += span["retries"]
+            row["total"] += span["duration"]
+            row["limiter_wait"] += span["limiter_wait"]
+            row["max"] = max(row["max"], span["duration"])
+            row["response_bytes"] += span["response_bytes"]
+        return sorted(methods.values(), key=lambda row: -row["total"])
+
+    def formatSummary(self):
+        wall = self.clock() - self.start
+        rows = self.summary()
+        lines = [
+            f"{'method':<24} {'calls':>6} {'reqs':>6} {'errs':>5} {'retry':>5} "
+            f"{'total s':>8} {'wait s':>8} {'net s':>8} {'max s':>7} {'KiB':>9}"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row['method']:<24} {row['calls']:>6} {row['requests']:>6} "
+                f"{row['errors']:>5} {row['retries']:>5} {row['total']:>8.3f} "
+                f"{row['limiter_wait']:>8.3f} "
+                f"{row['total'] - row['limiter_wait']:>8.3f} {row['max']:>7.3f} "
+                f"{row['response_bytes'] / 1024.0:>9.1f}"
+            )
+        api_time = sum(row["total"] for row in rows)
+        wait_time = sum(row["limiter_wait"] for row in rows)
+        lines.append(
+            f"wall {wall:.3f} s = throttled {wait_time:.3f} s"
+            f" + network {api_time - wait_time:.3f} s"
+            f" + local {max(wall - api_time, 0.0):.3f} s"
+        )
+        return "\n".join(lines)
+
+    def writeChromeTrace(self, path):
+        """Write the spans in Chrome trace-event format (chrome://tracing, Perfetto)."""
+        events = []
+        for span in self.spans:
+            events.append(
+                {
+                    "name": span["method"],
+                    "cat": "api",
+                    "ph": "X",
+                    "ts": span["start"] * 1e6,
+                    "dur": span["duration"] * 1e6,
+                    "pid": 1,
+                    "tid": span["thread"],
+                    "args": {
+                        key: span[key]
+                        for key in (
+                            "params",
+                            "limiter_wait",
+                            "retries",
+                            "response_bytes",
+                            "requests",
+                            "error",
+                        )
+                    },
+                }
+            )
+        with open(path, "w") as tracefile:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, tracefile)
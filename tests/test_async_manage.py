@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+import threading
+import time
+from task_tools.async_manage import AsyncTaskManager
+from tests.test_manage import MutationRequest, PagedService, makeManager, mockTask
+
+
+class SlowRequest:
+    def __init__(self, service, request):
+        self.service = service
+        self.request = request
+
+    def execute(self):
+        with self.service.lock:
+            self.service.in_flight += 1
+            self.service.max_in_flight = max(
+                self.service.max_in_flight, self.service.in_flight
+            )
+        try:
+            time.sleep(0.05)
+            return self.request.execute()
+        finally:
+            with self.service.lock:
+                self.service.in_flight -= 1
+
+
+class SlowService(PagedService):
+    """Holds each delete open for a moment and records how many overlap."""
+
+    def __init__(self, pages):
+        super().__init__(pages)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def delete(self, **kwargs):
+        return SlowRequest(self, MutationRequest("delete", **kwargs))
+
+
+class TestAsyncTaskManager:
+    def test_bulk_calls_run_concurrently(self):
+        manager = makeManager([[mockTask(0)]])
+        manager.service = SlowService([[mockTask(0)]])
+        async_manager = AsyncTaskManager(manager, concurrency=3)
+        progress = []
+        results = asyncio.run(
+            async_manager.deleteTasks(["FAKEID0", "BADID", "FAKEID1"], progress.append)
+        )
+        async_manager.close()
+        assert [result.item for result in results] == ["FAKEID0", "BADID", "FAKEID1"]
+        assert [result.error is None for result in results] == [True, False, True]
+        assert progress[-1] == 3
+        assert manager.service.max_in_flight > 1
+
+    def test_get_tasks(self):
+        manager = makeManager([[mockTask(0)], [mockTask(1)]])
+        async_manager = AsyncTaskManager(manager, concurrency=2)
+        tasks = asyncio.run(async_manager.getTasks())
+        async_manager.close()
+        assert [task.id for task in tasks] == ["FAKEID0", "FAKEID1"]
@@ -0,0 +1,86 @@
+import io
+import os
+import pytest
+import stat
+import threading
+from click.testing import CliRunner
+from task_tools.cli import cli
+from task_tools.client import runRemote
+from task_tools.daemon import TaskDaemon
+from task_tools.fake import FakeTasksService
+from tests.test_fake import makeFakeManager, seedTasks
+from tests.test_plan import dueDaysAgo
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    service = FakeTasksService()
+    seedTasks(service, 120)
+    daemon = TaskDaemon(str(tmp_path / "daemon.sock"), makeFakeManager(service))
+    daemon.bind()
+    thread = threading.Thread(target=daemon.serveForever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.stop()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def remote(daemon, *argv):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = runRemote(argv, daemon.socket_path, stdout, stderr)
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+class TestTaskDaemon:
+    def test_runs_commands_like_in_process(self, daemon):
+        service = FakeTasksService()
+        seedTasks(service, 120)
+        local = CliRunner().invoke(
+            cli, ["list", "all", "--format", "ndjson"], obj=makeFakeManager(service)
+        )
+        assert remote(daemon, "list", "all", "--format", "ndjson") == (
+            0,
+            local.output,
+            "",
+        )
+        code, stdout, _ = remote(daemon, "list", "bogus")
+        assert (code, stdout) == (1, "ERROR: unrecognized filter provided (bogus)\n")
+        code, _, stderr = remote(daemon, "no-such-command")
+        assert code == 2 and "No such command" in stderr
+
+    def test_falls_back_when_unavailable(self, daemon, tmp_path):
+        assert remote(daemon, "--task-list-id", "other", "list", "all")[0] is None
+        assert remote(daemon, "serve")[0] is None
+        assert runRemote(["list", "all"], str(tmp_path / "missing.sock")) is None
+
+    def test_commands_dont_leak_state(self, daemon, tmp_path):
+        service = daemon.task_manager.service
+        service.addTasks(
+            [{"title": "P0: Work item", "due": dueDaysAgo(2)}], tasklist="work"
+        )
+        plan_file = str(tmp_path / "plan.json")
+        result = CliRunner().invoke(
+            cli,
+            ["clean", "--plan-out", plan_file],
+            obj=makeFakeManager(service, task_list_id="work"),
+        )
+        assert result.exit_code == 0
+        before = remote(daemon, "list", "all", "--format", "ndjson")
+        state = daemon.task_manager.commandState()
+        assert remote(daemon, "apply", "--dry-run", plan_file)[0] == 0
+        assert daemon.task_manager.commandState() == state
+        assert remote(daemon, "list", "all", "--format", "ndjson") == before
+
+    def test_socket_is_owner_only(self, tmp_path):
+        umask = os.umask(0o022)
+        daemon = TaskDaemon(
+            str(tmp_path / "owner.sock"), makeFakeManager(FakeTasksService())
+        )
+        try:
+            daemon.bind()
+            assert stat.S_IMODE(os.stat(daemon.socket_path).st_mode) == 0o600
+            assert os.umask(0o022) == 0o022
+        finally:
+            daemon.close()
+            os.umask(umask)
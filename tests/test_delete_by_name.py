@@ -0,0 +1,77 @@
+from click.testing import CliRunner
+from task_tools.cli import cli
+from task_tools.fake import DEFAULT_TASK_LIST, FakeHttpError, FakeTasksService
+from tests.test_fake import makeFakeManager
+
+
+def namedService(titles):
+    service = FakeTasksService()
+    service.addTasks(
+        {"title": title, "due": "2024-01-02T00:00:00.000Z"} for title in titles
+    )
+    return service
+
+
+def liveTitles(service):
+    return sorted(
+        item["title"]
+        for item in service.lists[DEFAULT_TASK_LIST].values()
+        if not item.get("deleted")
+    )
+
+
+def deleteByName(service, *args):
+    return CliRunner().invoke(
+        cli,
+        ["delete-by-name", *args, "--start-date", "2024-01-01"],
+        obj=makeFakeManager(service),
+    )
+
+
+class TestDeleteByName:
+    titles = ["P0: Clean", "P0: Clean desk", "P1: Clean", "P0: Cleaner"]
+
+    def test_exact_match(self):
+        service = namedService(TestDeleteByName.titles)
+        result = deleteByName(service, "P0: Clean", "--match", "exact")
+        assert result.exit_code == 0
+        assert liveTitles(service) == ["P0: Clean desk", "P0: Cleaner", "P1: Clean"]
+
+    def test_regex_match(self):
+        service = namedService(TestDeleteByName.titles)
+        result = deleteByName(service, r"^P0: Clean\w*$", "--match", "regex")
+        assert result.exit_code == 0
+        assert liveTitles(service) == ["P0: Clean desk", "P1: Clean"]
+
+    def test_invalid_regex(self):
+        service = namedService(TestDeleteByName.titles)
+        result = deleteByName(service, "Clean(", "--match", "regex")
+        assert result.exit_code == 1
+        assert "ERROR: invalid regex" in result.output
+        assert service.stats["requests"] == 0
+
+    def test_progress_output(self):
+        service = namedService(f"P0: Task {i}" for i in range(120))
+        result = deleteByName(service, "Task")
+        assert result.exit_code == 0
+        progress = [
+            line for line in result.output.splitlines() if line.startswith("Deleted ")
+        ]
+        assert len(progress) > 1
+        assert progress[-1].startswith("Deleted 120/120 tasks (")
+        assert liveTitles(service) == []
+
+    def test_failed_deletes_exit_nonzero(self, monkeypatch):
+        service = namedService(TestDeleteByName.titles)
+        delete = service._delete
+
+        def failingDelete(tasklist, task):
+            if service.lists[tasklist][task]["title"] == "P0: Cleaner":
+                raise FakeHttpError(403, "forbidden")
+            return delete(tasklist, task)
+
+        monkeypatch.setattr(service, "_delete", failingDelete)
+        result = deleteByName(service, "P0: Clean")
+        assert result.exit_code == 1
+        assert "WARNING: failed to delete" in result.output
+        assert liveTitles(service) == ["P0: Cleaner", "P1: Clean"]
@@ -0,0 +1,130 @@
+import pytest
+from datetime import datetime
+from task_tools.fake import FakeTasksService, DEFAULT_TASK_LIST
+from task_tools.manage import BRIEF_FIELDS, TaskManager
+from task_tools.ratelimit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def makeFakeManager(service, limiter=None, **overrides):
+    """A TaskManager on service that touches nothing outside the test's tmp_path.
+
+    Passing mirror_file, page_cache_file or journal_dir turns that store on.
+    """
+    options = dict(
+        task_list_id=DEFAULT_TASK_LIST,
+        use_mirror="mirror_file" in overrides,
+        use_page_cache="page_cache_file" in overrides,
+        use_journal="journal_dir" in overrides,
+        shard_fetch=False,
+    )
+    options.update(overrides)
+    return TaskManager(
+        service=service,
+        limiter=limiter or TokenBucketLimiter(rate=1000.0, burst=1000),
+        **options,
+    )
+
+
+def seedTasks(service, count, due="2024-01-01T00:00:00.000Z"):
+    return service.addTasks(
+        {"title": f"P0: Task {i}", "due": due} for i in range(count)
+    )
+
+
+class TestFakeTasksService:
+    def test_list_pages_and_filters(self):
+        service = FakeTasksService()
+        seedTasks(service, 250)
+        seedTasks(service, 10, due="2024-03-01T00:00:00.000Z")
+        manager = makeFakeManager(service)
+        assert len(manager.getTasks(datetime(2024, 1, 1))) == 250
+        assert service.stats["methods"]["tasks.tasks.list"] == 3
+        assert len(manager.getTasks(datetime(2024, 3, 1), datetime(2024, 2, 1))) == 10
+
+    def test_mutations_and_batches(self):
+        service = FakeTasksService()
+        manager = makeFakeManager(service)
+        results = manager.putTasks(
+            (f"P0: Task {i}", "", datetime(2024, 1, 1)) for i in range(120)
+        )
+        assert all(result.error is None for result in results)
+        assert service.stats["methods"]["batch"] == 3
+        manager.deleteTask(results[0].response["id"])
+        assert len(manager.getTasks(datetime(2024, 1, 1))) == 119
+        with pytest.raises(Exception):
+            manager.deleteTask(results[0].response["id"])
+
+    def test_quota_is_retried_by_the_limiter(self):
+        clock = FakeClock()
+        service = FakeTasksService(quota_per_sec=2, clock=clock, sleep=clock.sleep)
+        seedTasks(service, 1)
+        limiter = TokenBucketLimiter(
+            rate=100.0, burst=100, backoff_base=0.01, clock=clock, sleep=clock.sleep
+        )
+        manager = makeFakeManager(service, limiter)
+        for _ in range(4):
+            assert len(manager.getTasks(datetime(2024, 1, 1))) == 1
+        assert service.stats["requests"] > 4
+        assert limiter.rate < 100.0
+
+    def test_injected_errors(self):
+        service = FakeTasksService()
+        service.injectError(404, "notFound")
+        manager = makeFakeManager(service)
+        results = manager.deleteTasks(["A", "B"])
+        assert results[0].error.resp.status == 404
+        assert results[1].error.resp.status == 404
+
+    def test_move_tasks_patch_in_place(self):
+        service = FakeTasksService()
+        (task,) = seedTasks(service, 1)
+        manager = makeFakeManager(service)
+        results = manager.moveTasks([(task["id"], "P0: Moved", datetime(2024, 2, 4))])
+        assert results[0].error is None
+        moved = manager.getTasks(datetime(2024, 2, 4))
+        assert [(t.id, t.name, t.due) for t in moved] == [
+            (task["id"], "P0: Moved", "2024-02-04")
+        ]
+        assert service.stats["methods"]["tasks.tasks.patch"] == 1
+        assert service.stats["methods"]["tasks.tasks.insert"] == 0
+
+    def test_projected_and_conditional_listing(self, tmp_path):
+        service = FakeTasksService()
+        seedTasks(service, 150)
+        service.addTasks(
+            [
+                {
+                    "title": "P0: Last",
+                    "notes": "Long notes " * 50,
+                    "due": "2024-01-01T00:00:00.000Z",
+                }
+            ]
+        )
+        manager = makeFakeManager(service, page_cache_file=str(tmp_path / "pages.db"))
+        brief = manager.getTasks(datetime(2024, 1, 1), fields=BRIEF_FIELDS)
+        assert len(brief) == 151
+        assert brief[-1].raw_notes is None
+        full_bytes = service.stats["bytes_received"]
+        full = makeFakeManager(service).getTasks(datetime(2024, 1, 1))
+        assert full[-1].raw_notes == "Long notes " * 50
+        service.resetStats()
+        again = manager.getTasks(datetime(2024, 1, 1), fields=BRIEF_FIELDS)
+        assert [task.id for task in again] == [task.id for task in brief]
+        assert service.stats["requests"] == 2
+        assert service.stats["bytes_received"] == 0
+        service._patch(DEFAULT_TASK_LIST, brief[-1].id, {"title": "P0: Renamed"})
+        service.resetStats()
+        renamed = manager.getTasks(datetime(2024, 1, 1), fields=BRIEF_FIELDS)
+        assert renamed[-1].name == "P0: Renamed"
+        assert 0 < service.stats["bytes_received"] < full_bytes
@@ -0,0 +1,74 @@
+import pytest
+from click.testing import CliRunner
+from datetime import date
+from task_tools.cli import cli
+from task_tools.fake import FakeTasksService
+from task_tools.grades import GradeStore
+from tests.test_fake import makeFakeManager
+from tests.test_plan import dueDaysAgo
+
+
+class TestGradeStore:
+    def test_regrading_replaces_the_row(self, tmp_path):
+        store = GradeStore(str(tmp_path / "grades.db"))
+        store.record([("a", "2024-01-02", "P0: A", 0, False)])
+        store.record(
+            [
+                ("a", "2024-01-02", "P0: A", 3, False),
+                ("b", "2024-01-03", "P0: [T] B", 1, True),
+                ("c", "2024-01-03", "P3: C", 0, False),
+            ]
+        )
+        weeks = store.weeks()
+        assert [(week["week"], week["timing"]) for week in weeks] == [
+            ("2024-01-01", 0),
+            ("2024-01-01", 3),
+        ]
+        p0 = weeks[0]
+        assert (p0["tasks"], p0["on_time"], p0["late"], p0["failed"]) == (2, 0, 2, 1)
+        assert (p0["late_1"], p0["late_2_3"], p0["failure_streak"]) == (1, 1, 1)
+
+    def test_failure_streaks(self, tmp_path):
+        store = GradeStore(str(tmp_path / "grades.db"))
+        store.record(
+            (f"t{day}", f"2024-01-{day:02d}", "P0: [T] Daily", 1, True)
+            for day in (1, 8, 15, 29)
+        )
+        assert [week["failure_streak"] for week in store.weeks()] == [1, 2, 3, 1]
+        since = store.weeks(date(2024, 1, 20))
+        assert [week["failure_streak"] for week in since] == [3, 1]
+
+    def test_import_csv_and_report(self, tmp_path):
+        log = tmp_path / "log.csv"
+        log.write_text(
+            "a|2024-01-02|P0: A|0|False\n"
+            "a|2024-01-02|P0: A|2|False\n"
+            "b|2024-01-02|P0: [T] B|1|True\n"
+        )
+        grades_file = str(tmp_path / "grades.db")
+        result = CliRunner().invoke(
+            cli,
+            ["report", "--grades-file", grades_file, "--import-csv", str(log)],
+            obj=makeFakeManager(FakeTasksService()),
+        )
+        assert result.exit_code == 0
+        assert "Imported 3 grades" in result.stderr
+        assert GradeStore(grades_file).weeks()[0]["tasks"] == 2
+
+    def test_grader_records_grades(self, tmp_path):
+        service = FakeTasksService()
+        service.addTasks([{"title": "P0: [T] Auto", "due": dueDaysAgo(2)}])
+        grades_file = str(tmp_path / "grades.db")
+        log = tmp_path / "log.csv"
+        for out_args in (["--out", str(log)], ["--no-out"]):
+            result = CliRunner().invoke(
+                cli,
+                ["grader", "--dry-run", "--grades-file", grades_file, *out_args],
+                obj=makeFakeManager(service),
+            )
+            assert result.exit_code == 0
+        weeks = GradeStore(grades_file).weeks()
+        assert [(week["tasks"], week["failed"]) for week in weeks] == [(1, 1)]
+        assert [line.split("|")[-2:] for line in log.read_text().splitlines()] == [
+            ["2", "True"]
+        ]
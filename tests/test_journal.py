@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import threading
+from click.testing import CliRunner
+from task_tools.cli import cli
+from task_tools.fake import DEFAULT_TASK_LIST, FakeTasksService
+from task_tools.journal import MutationJournal
+from tests.test_fake import makeFakeManager, seedTasks
+
+
+def makeJournaledManager(service, journal_dir):
+    return makeFakeManager(service, batch_size=2, journal_dir=journal_dir)
+
+
+def liveTitles(service):
+    return sorted(
+        item["title"]
+        for item in service.lists[DEFAULT_TASK_LIST].values()
+        if not item.get("deleted")
+    )
+
+
+class TestMutationJournal:
+    def test_unreachable_api_queues_until_flush(self, tmp_path):
+        service = FakeTasksService()
+        journal_dir = str(tmp_path / "journal")
+        service.injectError(503, count=2)
+        result = CliRunner().invoke(
+            cli,
+            ["put", "--name", "P0: Daily", "--date", "2024-01-01"]
+            + ["--until", "2024-01-05"],
+            obj=makeJournaledManager(service, journal_dir),
+        )
+        assert "QUEUED 5 of 5 mutations" in result.output
+        # The first batch failed, so the rest were queued without being sent
+        assert service.stats["methods"]["batch"] == 1
+        assert liveTitles(service) == []
+        result = CliRunner().invoke(
+            cli, ["flush"], obj=makeJournaledManager(service, journal_dir)
+        )
+        assert result.exit_code == 0
+        assert "5 of 5 mutations left" in result.output
+        assert liveTitles(service) == ["P0: Daily"] * 5
+        result = CliRunner().invoke(
+            cli, ["flush"], obj=makeJournaledManager(service, journal_dir)
+        )
+        assert "NOTHING TO RESUME" in result.output
+
+    def test_resume_skips_acknowledged_work(self, tmp_path):
+        service = FakeTasksService()
+        task_ids = [item["id"] for item in seedTasks(service, 4)]
+        journal_dir = tmp_path / "journal"
+        journal = MutationJournal(
+            journal_dir / "delete-by-name.jsonl", "delete-by-name"
+        )
+        run = journal.start("deleteTasks", task_ids)
+        # Interrupted after the first two deletions were acknowledged
+        journal.ack(run.run_id, [0, 1])
+        service.resetStats()
+        result = CliRunner().invoke(
+            cli,
+            ["delete-by-name", "Task", "--resume"],
+            obj=makeJournaledManager(service, str(journal_dir)),
+        )
+        assert result.exit_code == 0
+        assert "2 of 4 mutations left" in result.output
+        assert service.stats["methods"]["tasks.tasks.list"] == 0
+        assert liveTitles(service) == ["P0: Task 0", "P0: Task 1"]
+        assert journal.openRuns() == []
+
+    def test_runs_owned_by_live_processes_are_skipped(self, tmp_path):
+        journal = MutationJournal(tmp_path / "put.jsonl", "put")
+        run = journal.start("deleteTasks", ["A", "B"])
+        # This process's own runs are never in flight between commands
+        assert [open_run.run_id for open_run in journal.openRuns()] == [run.run_id]
+        owner = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            journal._append([{"type": "own", "run": run.run_id, "pid": owner.pid}])
+            assert journal.openRuns() == []
+            assert not journal.claim(run.run_id)
+        finally:
+            owner.kill()
+            owner.wait()
+        assert journal.claim(run.run_id)
+        assert journal.openRuns()[0].pid == os.getpid()
+
+    def test_concurrent_writers_keep_every_record(self, tmp_path):
+        path = tmp_path / "put.jsonl"
+
+        def writer(worker):
+            journal = MutationJournal(path, "put")
+            for i in range(20):
+                run = journal.start("deleteTasks", [f"{worker}-{i}"])
+                if i % 2 == 0:
+                    journal.end(run.run_id)
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        pending = MutationJournal(path, "put").openRuns()
+        assert sorted(item for run in pending for _, item in run.pending) == sorted(
+            f"{worker}-{i}" for worker in range(6) for i in range(1, 20, 2)
+        )
@@ -0,0 +1,51 @@
+import pytest
+import random
+from click.testing import CliRunner
+from datetime import date, timedelta
+from task_tools.cli import cli
+from task_tools.fake import FakeTasksService
+from tests.test_fake import makeFakeManager, seedTasks
+
+
+def seededManager(mirror_file, count=300):
+    rng = random.Random(0)
+    service = FakeTasksService()
+    service.addTasks(
+        {
+            "title": f"{rng.choice(['P0:', 'P1:', 'P2:', 'P3:', ''])} Task {i}".strip(),
+            "due": f"{date.today() - timedelta(days=rng.randrange(120))}T00:00:00.000Z",
+        }
+        for i in range(count)
+    )
+    return makeFakeManager(service, mirror_file=mirror_file)
+
+
+class TestListRanked:
+    def listRanked(self, tmp_path, *args):
+        result = CliRunner().invoke(
+            cli,
+            ["list", "ranked", *args],
+            obj=seededManager(str(tmp_path / f"mirror{'-'.join(args)}.db")),
+        )
+        assert result.exit_code == 0
+        return result.output.splitlines()
+
+    def test_limit_is_top_of_full_ranking(self, tmp_path):
+        ranked = self.listRanked(tmp_path)
+        assert len(ranked) > 10
+        assert self.listRanked(tmp_path, "--limit", "10") == ranked[:10]
+
+    def test_stream_matches_full_ranking(self, tmp_path):
+        ranked = self.listRanked(tmp_path)
+        assert self.listRanked(tmp_path, "--stream") == ranked
+        assert self.listRanked(tmp_path, "--stream", "--limit", "5") == ranked[:5]
+
+    def test_stream_needs_the_mirror(self):
+        service = FakeTasksService()
+        seedTasks(service, 3)
+        result = CliRunner().invoke(
+            cli, ["list", "ranked", "--stream"], obj=makeFakeManager(service)
+        )
+        assert result.exit_code == 2
+        assert "--stream needs the task mirror" in result.output
+        assert service.stats["requests"] == 0
@@ -0,0 +1,91 @@
+from click.testing import CliRunner
+from task_tools.cli import cli
+from task_tools.fake import DEFAULT_TASK_LIST, FakeTasksService
+from tests.test_fake import makeFakeManager
+from tests.test_plan import dueDaysAgo
+
+
+def twoListService():
+    service = FakeTasksService()
+    service.addTaskList("work", "Work")
+    service.addTasks(
+        [
+            {"title": "P0: Home chore", "due": dueDaysAgo(1)},
+            {"title": "P0: [T] Home auto", "due": dueDaysAgo(3)},
+        ]
+    )
+    service.addTasks(
+        [
+            {"title": "P0: Work item", "due": dueDaysAgo(2)},
+            {"title": "P0: [T] Work auto", "due": dueDaysAgo(3)},
+        ],
+        tasklist="work",
+    )
+    return service
+
+
+def liveTasks(service):
+    return sorted(
+        (tasklist, item["title"], item["due"][:10])
+        for tasklist, items in service.lists.items()
+        for item in items.values()
+        if not item.get("deleted")
+    )
+
+
+class TestMultipleLists:
+    def test_all_lists_merge_in_due_order(self, tmp_path):
+        service = twoListService()
+        manager = makeFakeManager(
+            service, task_list_id="all", mirror_file=str(tmp_path / "mirror.db")
+        )
+        tasks = manager.getTasks()
+        assert manager.task_list_ids == [DEFAULT_TASK_LIST, "work"]
+        assert [(task.list_id, task.name) for task in tasks] == [
+            (DEFAULT_TASK_LIST, "P0: [T] Home auto"),
+            ("work", "P0: [T] Work auto"),
+            ("work", "P0: Work item"),
+            (DEFAULT_TASK_LIST, "P0: Home chore"),
+        ]
+        result = CliRunner().invoke(
+            cli,
+            ["list", "all", "--no-ids"],
+            obj=makeFakeManager(service, task_list_id="all"),
+        )
+        assert f"[My Tasks] (Due {dueDaysAgo(1)[:10]}) " in result.output
+        assert "[Work] " in result.output
+
+    def test_clean_routes_mutations_to_each_list(self):
+        service = twoListService()
+        result = CliRunner().invoke(
+            cli,
+            ["clean"],
+            obj=makeFakeManager(service, task_list_id=f"{DEFAULT_TASK_LIST},work"),
+        )
+        assert result.exit_code == 0
+        assert "WARNING" not in result.output
+        today = dueDaysAgo(0)[:10]
+        assert liveTasks(service) == [
+            (DEFAULT_TASK_LIST, "P0: Home chore", today),
+            ("work", "P0: Work item", today),
+        ]
+
+    def test_apply_keeps_the_managers_lists(self, tmp_path):
+        service = twoListService()
+        plan_file = str(tmp_path / "plan.json")
+        result = CliRunner().invoke(
+            cli,
+            ["clean", "--plan-out", plan_file],
+            obj=makeFakeManager(service, task_list_id="work"),
+        )
+        assert result.exit_code == 0
+        manager = makeFakeManager(service)
+        result = CliRunner().invoke(cli, ["apply", plan_file], obj=manager)
+        assert result.exit_code == 0
+        assert manager.task_list_ids == [DEFAULT_TASK_LIST]
+        today = dueDaysAgo(0)[:10]
+        assert liveTasks(service) == [
+            (DEFAULT_TASK_LIST, "P0: Home chore", dueDaysAgo(1)[:10]),
+            (DEFAULT_TASK_LIST, "P0: [T] Home auto", dueDaysAgo(3)[:10]),
+            ("work", "P0: Work item", today),
+        ]
@@ -0,0 +1,163 @@
+import pytest
+from datetime import datetime
+from task_tools.manage import TaskManager
+from task_tools.ratelimit import TokenBucketLimiter
+
+
+class PagedListRequest:
+    def __init__(self, pages, calls, pageToken=None, **kwargs):
+        self.pages = pages
+        self.calls = calls
+        self.index = 0 if pageToken is None else int(pageToken)
+
+    def execute(self):
+        self.calls.append(self.index)
+        result = {"items": self.pages[self.index]}
+        if self.index + 1 < len(self.pages):
+            result["nextPageToken"] = str(self.index + 1)
+        return result
+
+
+class MutationRequest:
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        self.kwargs = kwargs
+
+    def execute(self):
+        if self.kwargs.get("task") == "BADID":
+            raise Exception("not found")
+        return {"kind": self.kind}
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append(len(self.requests))
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+class PagedService:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+        self.batches = []
+        self.params = []
+
+    def tasks(self):
+        return self
+
+    def list(self, **kwargs):
+        self.params.append(dict(kwargs))
+        return PagedListRequest(self.pages, self.calls, **kwargs)
+
+    def insert(self, **kwargs):
+        return MutationRequest("insert", **kwargs)
+
+    def delete(self, **kwargs):
+        return MutationRequest("delete", **kwargs)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+
+def mockTask(i):
+    return {
+        "id": f"FAKEID{i}",
+        "title": f"P0: Task {i}",
+        "due": "2024-01-01T00:00:00.000Z",
+    }
+
+
+def makeManager(pages, **kwargs):
+    kwargs.setdefault("use_mirror", False)
+    kwargs.setdefault("use_page_cache", False)
+    kwargs.setdefault("use_journal", False)
+    kwargs.setdefault("limiter", TokenBucketLimiter(rate=1000.0, burst=1000))
+    manager = TaskManager(batch_size=2, **kwargs)
+    manager.service = PagedService(pages)
+    return manager
+
+
+class TestTaskManager:
+
+    def test_get_tasks_follows_pages(self):
+        pages = [[mockTask(i) for i in range(100)], [mockTask(100), mockTask(101)]]
+        manager = makeManager(pages)
+        tasks = manager.getTasks()
+        assert len(tasks) == 102
+        assert tasks[-1].id == "FAKEID101"
+        assert manager.service.calls == [0, 1]
+
+    def test_iter_tasks_is_lazy(self):
+        pages = [[mockTask(0)], [mockTask(1)]]
+        manager = makeManager(pages)
+        tasks = manager.iterTasks()
+        assert next(tasks).id == "FAKEID0"
+        assert manager.service.calls == [0]
+
+    def test_put_tasks_batches(self):
+        manager = makeManager([])
+        results = manager.putTasks((f"P0: Task {i}", "", None) for i in range(5))
+        assert manager.service.batches == [2, 2, 1]
+        assert [result.error for result in results] == [None] * 5
+        assert results[4].item[0] == "P0: Task 4"
+
+    def test_delete_tasks_reports_failures(self):
+        manager = makeManager([])
+        results = manager.deleteTasks(["FAKEID0", "BADID", "FAKEID1"])
+        assert [result.item for result in results] == ["FAKEID0", "BADID", "FAKEID1"]
+        assert results[0].error is None
+        assert str(results[1].error) == "not found"
+
+    def test_mirror_syncs_incrementally(self, tmp_path):
+        mirror_file = str(tmp_path / "mirror.db")
+        manager = makeManager(
+            [[mockTask(0), mockTask(1)]], use_mirror=True, mirror_file=mirror_file
+        )
+        assert [task.id for task in manager.getTasks()] == ["FAKEID0", "FAKEID1"]
+        assert "updatedMin" not in manager.service.params[0]
+
+        deleted = dict(mockTask(0), deleted=True)
+        manager = makeManager([[deleted]], use_mirror=True, mirror_file=mirror_file)
+        assert [task.id for task in manager.getTasks()] == ["FAKEID1"]
+        assert manager.service.params[0]["showDeleted"]
+        assert "updatedMin" in manager.service.params[0]
+
+    def test_failed_full_sync_keeps_the_mirror(self, tmp_path):
+        mirror_file = str(tmp_path / "mirror.db")
+        manager = makeManager(
+            [[mockTask(0), mockTask(1)]], use_mirror=True, mirror_file=mirror_file
+        )
+        manager.syncMirror()
+        # No pages to serve, so the forced re-fetch fails on its first request
+        manager.service.pages = []
+        with pytest.raises(IndexError):
+            manager.syncMirror(force=True)
+        assert manager.mirror.lastSync(manager.task_list_id) is not None
+        assert [task.id for task in manager.getTasks()] == ["FAKEID0", "FAKEID1"]
+
+    def test_mirror_answers_date_windows(self, tmp_path):
+        early = dict(mockTask(0), due="2023-06-01T00:00:00.000Z")
+        manager = makeManager(
+            [[early, mockTask(1)]],
+            use_mirror=True,
+            mirror_file=str(tmp_path / "mirror.db"),
+        )
+        tasks = manager.getTasks(
+            datetime(2023, 12, 30), start_date=datetime(2023, 5, 1)
+        )
+        assert [task.id for task in tasks] == ["FAKEID0"]
+        manager.deleteTask("FAKEID1")
+        assert [task.id for task in manager.getTasks()] == ["FAKEID0"]
+        assert len(manager.service.params) == 1
@@ -0,0 +1,57 @@
+import json
+import pytest
+from click.testing import CliRunner
+from task_tools.cli import cli
+from task_tools.fake import FakeTasksService
+from task_tools.output import PLAN_FIELDS, TASK_FIELDS
+from tests.test_fake import makeFakeManager, seedTasks
+from tests.test_plan import dueDaysAgo
+
+
+def invoke(service, *args):
+    result = CliRunner().invoke(cli, args, obj=makeFakeManager(service))
+    assert result.exit_code == 0
+    return result.output
+
+
+class TestOutputFormats:
+    def test_list_formats(self):
+        service = FakeTasksService()
+        seedTasks(service, 3)
+        service.addTasks([{"title": "Tab\there", "due": "2024-01-01T00:00:00.000Z"}])
+        lines = invoke(service, "list", "all", "--format", "ndjson").splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [sorted(record) for record in records] == [sorted(TASK_FIELDS)] * 4
+        assert records[0]["due"] == "2024-01-01"
+        assert json.loads(invoke(service, "list", "all", "--format", "json")) == records
+        rows = invoke(service, "list", "all", "--format", "tsv").splitlines()
+        assert rows[0].split("\t") == list(TASK_FIELDS)
+        assert rows[4].split("\t")[1] == "Tab\\there"
+
+    def test_empty_json_is_an_array(self):
+        assert (
+            json.loads(invoke(FakeTasksService(), "list", "p0", "--format", "json"))
+            == []
+        )
+
+    def test_clean_records(self):
+        service = FakeTasksService()
+        service.addTasks(
+            [
+                {"title": "P0: Manual", "due": dueDaysAgo(2)},
+                {"title": "P0: [T] Auto", "due": dueDaysAgo(2)},
+            ]
+        )
+        output = invoke(service, "clean", "--dry-run", "--format", "ndjson")
+        records = [json.loads(line) for line in output.splitlines()]
+        assert [sorted(record) for record in records] == [sorted(PLAN_FIELDS)] * 2
+        assert [(r["kind"], r["applied"]) for r in records] == [
+            ("migrate", False),
+            ("fail", False),
+        ]
+        output = invoke(service, "clean", "--format", "ndjson")
+        records = [json.loads(line) for line in output.splitlines()]
+        assert [(r["kind"], r["applied"]) for r in records] == [
+            ("migrate", True),
+            ("fail", True),
+        ]
@@ -0,0 +1,75 @@
+import pytest
+from click.testing import CliRunner
+from datetime import date, timedelta
+from task_tools.cli import cli
+from task_tools.fake import FakeTasksService
+from task_tools.manage import Task
+from task_tools.plan import (
+    FAIL,
+    LATE,
+    MIGRATE,
+    MIGRATE_P1,
+    PENDING,
+    TaskPlan,
+    classifyTasks,
+)
+from tests.test_fake import makeFakeManager
+
+
+def dueDaysAgo(days):
+    return f"{date.today() - timedelta(days=days)}T00:00:00.000Z"
+
+
+class TestTaskPlan:
+    def test_classify_and_round_trip(self, tmp_path):
+        tasks = [
+            Task({"id": "a", "title": "P0: Today", "due": dueDaysAgo(0)}),
+            Task({"id": "b", "title": "P0: Manual", "due": dueDaysAgo(2)}),
+            Task({"id": "c", "title": "P0: [T] Auto", "due": dueDaysAgo(2)}),
+            Task({"id": "d", "title": "P1: Weekly", "due": dueDaysAgo(1)}),
+            Task({"id": "e", "title": "P3: Slow", "due": dueDaysAgo(95)}),
+            Task({"id": "f", "title": "Untimed", "due": dueDaysAgo(5)}),
+        ]
+        sunday = date(2024, 1, 7)
+        plan = classifyTasks(tasks, sunday, date(2024, 2, 4), command="clean")
+        assert [action.kind for action in plan.actions] == [
+            PENDING,
+            MIGRATE,
+            FAIL,
+            MIGRATE_P1,
+            LATE,
+        ]
+        assert plan.moves(plan.byKind(MIGRATE_P1)) == [("d", "P0: Weekly", sunday)]
+        assert len(plan.gradeRows()) == 4
+        plan.write(tmp_path / "plan.json")
+        replayed = TaskPlan.read(tmp_path / "plan.json")
+        assert replayed.actions == plan.actions
+        assert replayed.command == "clean"
+
+    def test_plan_out_then_apply(self, tmp_path):
+        service = FakeTasksService()
+        service.addTasks(
+            [
+                {"title": "P0: Manual", "due": dueDaysAgo(2)},
+                {"title": "P0: [T] Auto", "due": dueDaysAgo(2)},
+            ]
+        )
+        plan_file = str(tmp_path / "plan.json")
+        result = CliRunner().invoke(
+            cli, ["clean", "--plan-out", plan_file], obj=makeFakeManager(service)
+        )
+        assert result.exit_code == 0
+        assert "FAILED TASKS:" in result.output
+        assert service.stats["methods"]["batch"] == 0
+        service.resetStats()
+        result = CliRunner().invoke(
+            cli, ["apply", plan_file], obj=makeFakeManager(service)
+        )
+        assert result.exit_code == 0
+        assert service.stats["methods"]["tasks.tasks.list"] == 0
+        remaining = [
+            (item["title"], item["due"][:10])
+            for item in service.lists["@default"].values()
+            if not item.get("deleted")
+        ]
+        assert remaining == [("P0: Manual", str(date.today()))]
@@ -0,0 +1,80 @@
+import pytest
+from task_tools.ratelimit import TokenBucketLimiter, isThrottleError, retryAfter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse(dict):
+    def __init__(self, status, **headers):
+        super().__init__(**headers)
+        self.status = status
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status, content=b"", **headers):
+        self.resp = FakeResponse(status, **headers)
+        self.content = content
+
+
+class FlakyRequest:
+    def __init__(self, errors):
+        self.errors = errors
+        self.attempts = 0
+
+    def execute(self):
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+
+class TestTokenBucketLimiter:
+    def makeLimiter(self, **kwargs):
+        clock = FakeClock()
+        return clock, TokenBucketLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+    def test_burst_then_rate(self):
+        clock, limiter = self.makeLimiter(rate=2.0, burst=3)
+        for _ in range(3):
+            assert limiter.acquire() == 0
+        assert limiter.acquire() == pytest.approx(0.5)
+
+    def test_throttle_classification(self):
+        assert isThrottleError(FakeHttpError(429))
+        assert isThrottleError(FakeHttpError(403, b'{"reason": "rateLimitExceeded"}'))
+        assert not isThrottleError(FakeHttpError(403, b"forbidden"))
+        assert not isThrottleError(FakeHttpError(404))
+        assert retryAfter(FakeHttpError(429, **{"retry-after": "7"})) == 7.0
+
+    def test_retries_and_backs_off(self):
+        clock, limiter = self.makeLimiter(rate=4.0, burst=1, max_rate=8.0)
+        request = FlakyRequest([FakeHttpError(429, **{"retry-after": "3"})])
+        assert limiter.execute(request) == {"ok": True}
+        assert request.attempts == 2
+        assert max(clock.sleeps) >= 3.0
+        assert limiter.rate == pytest.approx(2.0 + limiter.increase)
+
+    def test_gives_up_after_max_retries(self):
+        clock, limiter = self.makeLimiter(max_retries=2)
+        request = FlakyRequest([FakeHttpError(429) for _ in range(3)])
+        with pytest.raises(FakeHttpError):
+            limiter.execute(request)
+        assert request.attempts == 3
+
+    def test_non_throttle_errors_raise_immediately(self):
+        clock, limiter = self.makeLimiter()
+        request = FlakyRequest([FakeHttpError(404)])
+        with pytest.raises(FakeHttpError):
+            limiter.execute(request)
+        assert request.attempts == 1
@@ -0,0 +1,101 @@
+from click.testing import CliRunner
+from task_tools.cli import _name_pattern_terms, cli
+from task_tools.fake import FakeTasksService
+from tests.test_fake import makeFakeManager
+
+
+def notesService():
+    service = FakeTasksService()
+    service.addTasks(
+        [
+            {
+                "title": "P0: Buy groceries",
+                "notes": "milk, eggs",
+                "due": "2024-03-01T00:00:00.000Z",
+            },
+            {"title": "P1: Grocery budget", "due": "2024-03-02T00:00:00.000Z"},
+            {
+                "title": "P0: Call plumber",
+                "notes": "about the groceries shelf",
+                "due": "2024-03-03T00:00:00.000Z",
+            },
+            {"title": "P0: Cleanup 1", "due": "2024-03-04T00:00:00.000Z"},
+            {"title": "P0: Cleanup 12", "due": "2024-03-05T00:00:00.000Z"},
+        ]
+    )
+    return service
+
+
+class TestSearch:
+    def test_search_reads_only_the_index(self, tmp_path):
+        service = notesService()
+        mirror_file = str(tmp_path / "mirror.db")
+        makeFakeManager(service, mirror_file=mirror_file).syncMirror()
+        service.resetStats()
+
+        def search(*args):
+            result = CliRunner().invoke(
+                cli,
+                ["search", "--no-ids", *args],
+                obj=makeFakeManager(service, mirror_file=mirror_file),
+            )
+            assert result.exit_code == 0
+            return [line.split("] ")[-1] for line in result.output.splitlines()]
+
+        assert len(search("groc*")) == 3
+        assert search("groceries", "--priority", "p0", "--end-date", "2024-03-02") == [
+            "P0: Buy groceries"
+        ]
+        assert search("MILK") == ["P0: Buy groceries"]
+        assert search("eggs", "plumber") == ["NO MATCHING TASKS"]
+        assert service.stats["requests"] == 0
+
+    def test_index_follows_updates(self, tmp_path):
+        service = notesService()
+        manager = makeFakeManager(service, mirror_file=str(tmp_path / "mirror.db"))
+        task = [task for task in manager.searchTasks("plumber", sync=True)][0]
+        manager.moveTask(task.id, "P0: Call electrician")
+        assert [task for task in manager.searchTasks("plumber")] == []
+        assert [task.id for task in manager.searchTasks("electric*")] == [task.id]
+
+    def test_delete_by_name_with_index(self, tmp_path):
+        assert _name_pattern_terms("Task 1", "substr") == ["1*"]
+        assert _name_pattern_terms("P0: Cleanup", "exact") == ["p0", "cleanup"]
+        assert _name_pattern_terms("Clean.*", "regex") == []
+        service = notesService()
+        result = CliRunner().invoke(
+            cli,
+            ["delete-by-name", "Cleanup 1", "--start-date", "2024-01-01"]
+            + ["--use-index"],
+            obj=makeFakeManager(service, mirror_file=str(tmp_path / "mirror.db")),
+        )
+        assert result.exit_code == 0
+        assert "Deleting task P0: Cleanup 1 " in result.output
+        assert "Deleting task P0: Cleanup 12 " in result.output
+        assert "groceries" not in result.output
+
+    def test_index_needs_a_synced_mirror(self, tmp_path):
+        service = notesService()
+        result = CliRunner().invoke(
+            cli,
+            ["delete-by-name", "Cleanup", "--use-index"],
+            obj=makeFakeManager(service),
+        )
+        assert result.exit_code == 1
+        assert "ERROR: --use-index needs the local task mirror" in result.output
+        mirror_file = str(tmp_path / "mirror.db")
+        result = CliRunner().invoke(
+            cli,
+            ["search", "groceries"],
+            obj=makeFakeManager(service, mirror_file=mirror_file),
+        )
+        assert result.exit_code == 1
+        assert "run with --sync" in result.output
+        result = CliRunner().invoke(
+            cli,
+            ["search", "groceries", "--sync"],
+            obj=makeFakeManager(service, mirror_file=mirror_file),
+        )
+        assert result.exit_code == 0
+        assert "P0: Buy groceries" in result.output
+        assert service.stats["methods"]["tasks.tasks.delete"] == 0
@@ -0,0 +1,87 @@
+import inspect
+import os
+import pytest
+from datetime import datetime, timedelta
+from task_tools import service
+from task_tools.manage import TaskManager
+from task_tools.service import (
+    ServiceError,
+    _readTokenCache,
+    _writeTokenCache,
+    buildTasksService,
+)
+
+
+def makeCredentials(expires_in):
+    from google.oauth2 import credentials as google_credentials
+
+    return google_credentials.Credentials(
+        "ACCESS",
+        refresh_token="REFRESH",
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id="CLIENT",
+        client_secret="SECRET",
+        expiry=datetime.utcnow() + timedelta(seconds=expires_in),
+    )
+
+
+class TestTokenCache:
+    source = ["/secrets.json", "/refresh.json"]
+
+    @pytest.fixture(autouse=True)
+    def needsGoogleAuth(self):
+        pytest.importorskip("google.oauth2.credentials")
+
+    def test_round_trip(self, tmp_path):
+        token_cache = str(tmp_path / "token.json")
+        _writeTokenCache(token_cache, TestTokenCache.source, makeCredentials(3600))
+        assert os.stat(token_cache).st_mode & 0o777 == 0o600
+        credentials = _readTokenCache(token_cache, TestTokenCache.source)
+        assert credentials.token == "ACCESS"
+        assert credentials.refresh_token == "REFRESH"
+        assert credentials.valid
+
+    def test_near_expiry_or_foreign_is_ignored(self, tmp_path):
+        token_cache = str(tmp_path / "token.json")
+        assert _readTokenCache(token_cache, TestTokenCache.source) is None
+        _writeTokenCache(token_cache, TestTokenCache.source, makeCredentials(60))
+        assert _readTokenCache(token_cache, TestTokenCache.source) is None
+        _writeTokenCache(token_cache, TestTokenCache.source, makeCredentials(3600))
+        assert _readTokenCache(token_cache, ["/other.json", "/refresh.json"]) is None
+
+
+class TestBuildService:
+    def test_setup_failures_are_chained(self, tmp_path):
+        missing = str(tmp_path / "missing.json")
+        with pytest.raises(ServiceError) as error:
+            buildTasksService(missing, missing)
+        assert error.value.__cause__ is not None
+        manager = TaskManager(
+            task_secrets_file=missing,
+            task_refresh_token=missing,
+            token_cache=None,
+            discovery_cache=None,
+            use_mirror=False,
+            use_page_cache=False,
+            use_journal=False,
+        )
+        assert manager.service is None
+        assert isinstance(manager.service_error, ServiceError)
+        with pytest.raises(Exception, match="check your secrets") as error:
+            manager.getTasks()
+        assert error.value.__cause__ is manager.service_error
+
+    def test_programming_errors_propagate(self, monkeypatch):
+        def broken(*args):
+            raise TypeError("unexpected argument")
+
+        monkeypatch.setattr(service, "loadCredentials", broken)
+        pytest.importorskip("googleapiclient.discovery")
+        with pytest.raises(TypeError):
+            buildTasksService("secrets.json", "refresh.json")
+
+    def test_easy_google_auth_api(self):
+        auth = pytest.importorskip("easy_google_auth.auth")
+        inspect.signature(auth.getGoogleCreds).bind(
+            "secrets.json", "refresh.json", headless=True
+        )
@@ -0,0 +1,55 @@
+import random
+from datetime import date, datetime, timedelta
+from task_tools.fake import FakeTasksService
+from task_tools.shards import ShardPlanner, shardEnd
+from tests.test_fake import makeFakeManager
+
+
+def spreadService(count, first_day, num_days):
+    rng = random.Random(0)
+    service = FakeTasksService()
+    service.addTasks(
+        {
+            "title": f"P0: Task {i}",
+            "due": f"{first_day + timedelta(days=rng.randrange(num_days))}T00:00:00.000Z",
+        }
+        for i in range(count)
+    )
+    return service
+
+
+class TestShardedFetch:
+    def test_shards_align_and_adapt(self):
+        assert shardEnd(date(2024, 1, 1), date(2024, 12, 31), 32) == date(2024, 1, 26)
+        assert shardEnd(date(2024, 1, 27), date(2024, 12, 31), 32) == date(2024, 2, 27)
+        assert shardEnd(date(2024, 1, 27), date(2024, 2, 10), 32) == date(2024, 2, 10)
+        planner = ShardPlanner()
+        assert not planner.counted()
+        assert planner.nextShard(date(2024, 1, 1), date(2024, 12, 31)) == (
+            date(2024, 1, 1),
+            date(2024, 1, 2),
+        )
+        planner.observe(32, 32 * 50, 16)
+        assert planner.shardDays() == 16
+        planner.observe(256 * 10, 0, 10)
+        assert planner.shardDays() == 256
+        # The rest of a sparse window fits on a page, so it's fetched in one go
+        assert planner.nextShard(date(2024, 6, 1), date(2024, 8, 31)) == (
+            date(2024, 6, 1),
+            date(2024, 8, 31),
+        )
+
+    def test_long_window_matches_sequential_fetch(self):
+        service = spreadService(1500, date(2023, 1, 1), 730)
+        end, start = datetime(2024, 12, 31), datetime(2022, 12, 31)
+        sequential = makeFakeManager(service).getTasks(end, start)
+        service.resetStats()
+        sharded = makeFakeManager(service, shard_fetch=True).getTasks(end, start)
+        assert service.stats["methods"]["tasks.tasks.list"] > 16
+        assert len(sharded) == 1500
+        assert sorted(task.id for task in sharded) == sorted(
+            task.id for task in sequential
+        )
+        assert [task.created for task in sharded] == sorted(
+            task.created for task in sharded
+        )
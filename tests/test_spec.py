@@ -0,0 +1,88 @@
+import pytest
+from datetime import date
+from task_tools.recurrence import Recurrence
+from task_tools.spec import planSpecInserts, readSpecFile, recurrenceDates
+
+
+class TestSpec:
+    specs = {
+        "d": [("Daily", "")],
+        "w": [("Weekly", "")],
+        "m": [("Monthly", "")],
+        "q": [("Quarterly", "")],
+    }
+
+    def test_recurrence_dates(self):
+        dates = recurrenceDates(date(2024, 3, 25), date(2024, 4, 30))
+        assert len(dates["d"]) == 37
+        assert sorted(dates["w"])[0] == date(2024, 3, 31)
+        assert dates["m"] == {date(2024, 4, 7)}
+        assert dates["q"] == {date(2024, 4, 7)}
+
+    def test_plan_skips_existing(self):
+        existing = {(date(2024, 4, 7), "Daily"), (date(2024, 4, 7), "Monthly")}
+        plan = planSpecInserts(
+            TestSpec.specs, date(2024, 4, 6), date(2024, 4, 7), existing
+        )
+        assert plan == [
+            (date(2024, 4, 6), "Daily", ""),
+            (date(2024, 4, 7), "Weekly", ""),
+            (date(2024, 4, 7), "Quarterly", ""),
+        ]
+
+    def test_recurrence_rules(self):
+        def dates(rule, start, end):
+            return sorted(Recurrence(rule).dates(start, end))
+
+        assert dates(
+            "FREQ=MONTHLY;BYDAY=-1FR", date(2024, 1, 1), date(2024, 3, 31)
+        ) == [
+            date(2024, 1, 26),
+            date(2024, 2, 23),
+            date(2024, 3, 29),
+        ]
+        assert dates(
+            "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO;DTSTART=20240101",
+            date(2024, 1, 2),
+            date(2024, 2, 5),
+        ) == [date(2024, 1, 15), date(2024, 1, 29)]
+        assert dates(
+            "FREQ=YEARLY;BYMONTH=11;BYDAY=4TH", date(2024, 1, 1), date(2025, 12, 31)
+        ) == [date(2024, 11, 28), date(2025, 11, 27)]
+        assert dates(
+            "FREQ=MONTHLY;BYMONTHDAY=-1", date(2024, 1, 15), date(2024, 3, 15)
+        ) == [date(2024, 1, 31), date(2024, 2, 29)]
+        assert dates(
+            "FREQ=MONTHLY;BYMONTHDAY=1;DTSTART=20240315",
+            date(2024, 1, 1),
+            date(2024, 6, 30),
+        ) == [date(2024, 4, 1), date(2024, 5, 1), date(2024, 6, 1)]
+        assert dates(
+            "FREQ=YEARLY;BYDAY=20MO", date(2024, 1, 1), date(2025, 12, 31)
+        ) == [
+            date(2024, 5, 13),
+            date(2025, 5, 19),
+        ]
+        assert dates(
+            "FREQ=YEARLY;BYDAY=-1FR", date(2024, 1, 1), date(2024, 12, 31)
+        ) == [date(2024, 12, 27)]
+        for rule in (
+            "FREQ=WEEKLY;BYDAY=2MO",
+            "FREQ=MONTHLY;BYDAY=6MO",
+            "FREQ=YEARLY;BYDAY=1MO;BYMONTHDAY=1",
+        ):
+            with pytest.raises(ValueError):
+                Recurrence(rule)
+
+    def test_spec_file_with_rules(self, tmp_path):
+        spec_csv = tmp_path / "spec.csv"
+        spec_csv.write_text(
+            "FREQ=MONTHLY;BYDAY=1MO|Bills|Pay\nd|Daily|\n# comment|ignored|\n"
+        )
+        specs = readSpecFile(str(spec_csv))
+        plan = planSpecInserts(specs, date(2024, 4, 1), date(2024, 4, 2), set())
+        assert plan == [
+            (date(2024, 4, 1), "Daily", "\n"),
+            (date(2024, 4, 1), "Bills", "Pay\n"),
+            (date(2024, 4, 2), "Daily", "\n"),
+        ]
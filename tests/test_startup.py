@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+
+# Cold-start target for `task-tools --help`, in seconds; the test allows
+# HELP_SLACK times that so a busy machine doesn't fail it
+HELP_BUDGET = 0.15
+HELP_SLACK = 3
+HEAVY_MODULES = (
+    "asyncio",
+    "easy_google_auth",
+    "google",
+    "googleapiclient",
+    "httplib2",
+    "sqlite3",
+    "task_tools.grades",
+    "task_tools.mirror",
+)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def runPython(*args):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+class TestStartup:
+    def test_cli_import_is_light(self):
+        result = runPython(
+            "-c",
+            "import sys, task_tools.cli; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        )
+        assert result.stdout.strip() == ""
+
+    def test_client_import_skips_cli(self):
+        result = runPython(
+            "-c",
+            "import sys, task_tools.client; "
+            "print(' '.join(m for m in ('click', 'task_tools.cli') if m in sys.modules))",
+        )
+        assert result.stdout.strip() == ""
+
+    def test_help_skips_heavy_modules(self):
+        result = runPython(
+            "-c",
+            "import sys, task_tools.cli\n"
+            "try:\n"
+            "    task_tools.cli.cli.main(['--help'], prog_name='task-tools')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        )
+        assert "Usage: task-tools" in result.stdout
+        assert result.stdout.splitlines()[-1].strip() == ""
+
+    @pytest.mark.skipif(
+        "CI" in os.environ, reason="wall-clock budget is unreliable on shared runners"
+    )
+    def test_help_timing(self):
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            runPython("-m", "task_tools.cli", "--help")
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        assert (
+            best < HELP_BUDGET * HELP_SLACK
+        ), f"--help took {best * 1000:.0f} ms (target {HELP_BUDGET * 1000:.0f} ms)"
@@ -1,4 +1,5 @@
 import pytest
+from datetime import date
 from task_tools.manage import Task
 
 
@@ -14,3 +15,11 @@ class TestTask:
         task = Task(TestTask.mockdatap0)
         assert task.due == "2024-01-01"
         assert task.timing == Task.task_types["P0:"][0]
+
+    def test_scores_against_given_day(self):
+        task = Task(TestTask.mockdatap0, today=date(2024, 1, 4).toordinal())
+        assert task.days_late == 3
+        assert task.created_date == date(2024, 1, 1)
+        assert task.notes == "Some notes."
+        with pytest.raises(AttributeError):
+            task.extra = True
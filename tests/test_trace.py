@@ -0,0 +1,33 @@
+import json
+import pytest
+from click.testing import CliRunner
+from task_tools.cli import cli
+from task_tools.fake import FakeTasksService
+from tests.test_fake import makeFakeManager, seedTasks
+
+
+class TestApiTracer:
+    def test_profile_records_every_call(self, tmp_path):
+        service = FakeTasksService()
+        seedTasks(service, 150)
+        manager = makeFakeManager(service)
+        trace_file = tmp_path / "trace.json"
+        result = CliRunner().invoke(
+            cli,
+            [
+                "--profile-out",
+                str(trace_file),
+                "delete-by-name",
+                "Task 1",
+                "--start-date",
+                "2023-01-01",
+            ],
+            obj=manager,
+        )
+        assert result.exit_code == 0
+        assert "tasks.tasks.list" in result.stderr
+        events = json.loads(trace_file.read_text())["traceEvents"]
+        assert [event["name"] for event in events].count("tasks.tasks.list") == 2
+        assert events[0]["args"]["params"]["maxResults"] == 100
+        batches = [event for event in events if event["name"] == "batch"]
+        assert sum(event["args"]["requests"] for event in batches) == 61